@@ -0,0 +1,94 @@
+"""Benchmark betiklerinin ortak yardımcıları
+
+Sentetik prompt üretimi, gecikme yüzdelikleri ve commitler arasında
+karşılaştırılabilen JSON sonuç belgesi.
+"""
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+
+VOCABULARY = [
+    "please", "write", "a", "detailed", "summary", "of", "the", "following",
+    "article", "focusing", "on", "key", "points", "and", "important", "details",
+    "make", "sure", "to", "include", "relevant", "examples", "explanation",
+    "concise", "clear", "language", "for", "beginners", "technical", "audience"
+]
+
+def make_prompt(num_words: int, seed: int) -> str:
+    """Belirli uzunlukta sentetik prompt üret"""
+    rng = random.Random(seed)
+    words = [rng.choice(VOCABULARY) for _ in range(num_words)]
+    sentences = [" ".join(words[i:i + 12]) for i in range(0, num_words, 12)]
+    return ". ".join(sentences) + "."
+
+def percentile(samples: List[float], q: float) -> float:
+    """En yakın sıra yöntemiyle yüzdelik (q: 0-100)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+def summarize(seconds: List[float]) -> Dict:
+    """Saniye cinsinden örnekleri milisaniye özetine çevir"""
+    if not seconds:
+        return {"count": 0}
+    return {
+        "count": len(seconds),
+        "mean_ms": round(sum(seconds) / len(seconds) * 1000, 3),
+        "p50_ms": round(percentile(seconds, 50) * 1000, 3),
+        "p95_ms": round(percentile(seconds, 95) * 1000, 3),
+        "p99_ms": round(percentile(seconds, 99) * 1000, 3),
+        "max_ms": round(max(seconds) * 1000, 3)
+    }
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def metadata() -> Dict:
+    """Sonuçların hangi commit ve ortamda üretildiği"""
+    status = _git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(status) if status is not None else None,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count()
+    }
+
+def write_results(benchmark: str, config: Dict, results: List[Dict], output: Optional[str]) -> Dict:
+    """Sonuç belgesini oluştur; `output` verilmişse JSON olarak yaz
+
+    Her satırın `name` alanı, `benchmarks.compare` ile eşleştirme anahtarıdır.
+    """
+    document = {
+        "benchmark": benchmark,
+        "meta": metadata(),
+        "config": config,
+        "results": results
+    }
+    if output:
+        directory = os.path.dirname(output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2, ensure_ascii=False)
+    return document
+
+def print_table(results: List[Dict], columns: List[str]) -> None:
+    """Sonuç satırlarını hizalı tablo olarak yazdır"""
+    print(" | ".join(f"{column:>14}" for column in columns))
+    for row in results:
+        print(" | ".join(f"{str(row.get(column, '-')):>14}" for column in columns))
@@ -0,0 +1,76 @@
+"""İki benchmark sonuç dosyasını karşılaştırır
+
+Satırlar `name` alanıyla eşleştirilir. `*_ms` alanlarında artış,
+`ops_per_sec`/`rps`/`texts_per_sec` alanlarında düşüş gerileme sayılır;
+değişim `--tolerance` oranını aşarsa çıkış kodu 1 olur.
+
+Kullanım:
+    python -m benchmarks.compare base.json head.json --tolerance 0.10
+"""
+from typing import Dict, List
+import argparse
+import json
+import sys
+
+HIGHER_IS_BETTER = {"ops_per_sec", "rps", "texts_per_sec"}
+LOWER_IS_BETTER = {"mean_ms", "p50_ms", "p95_ms", "p99_ms"}
+
+def load(path: str) -> Dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def compare(base: Dict, head: Dict, tolerance: float) -> List[Dict]:
+    """Ortak satırların ölçümlerini karşılaştır"""
+    if base["benchmark"] != head["benchmark"]:
+        raise ValueError(f"Farklı benchmarklar: {base['benchmark']} / {head['benchmark']}")
+
+    base_rows = {row["name"]: row for row in base["results"]}
+    changes = []
+    for row in head["results"]:
+        previous = base_rows.get(row["name"])
+        if previous is None:
+            continue
+        for metric in sorted((HIGHER_IS_BETTER | LOWER_IS_BETTER) & set(row) & set(previous)):
+            old, new = previous[metric], row[metric]
+            if not old:
+                continue
+            change = (new - old) / old
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            changes.append({
+                "name": row["name"],
+                "metric": metric,
+                "base": old,
+                "head": new,
+                "change": round(change, 4),
+                "regression": worse > tolerance
+            })
+    return changes
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="İzin verilen göreli kötüleşme")
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON olarak yazdır")
+    args = parser.parse_args()
+
+    base, head = load(args.base), load(args.head)
+    changes = compare(base, head, args.tolerance)
+    regressions = [change for change in changes if change["regression"]]
+    if args.json:
+        print(json.dumps({
+            "base": base["meta"].get("commit"),
+            "head": head["meta"].get("commit"),
+            "changes": changes
+        }, indent=2))
+    else:
+        print(f"{base['meta'].get('commit')} -> {head['meta'].get('commit')}")
+        for change in changes:
+            marker = "GERİLEME" if change["regression"] else ""
+            print(f"{change['name']:>28} {change['metric']:>14} {change['base']:>12} -> "
+                  f"{change['head']:>12} ({change['change']:+.1%}) {marker}")
+        print(f"{len(regressions)} gerileme (tolerans {args.tolerance:.0%})")
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Bileşen bazında verim ölçümü
+
+LIME toplu skorlayıcısı (`BatchScorer`), `analyze_prompt`, tiktoken
+token sayımı ve text_processing fonksiyonları farklı prompt uzunluklarında
+ölçülür. Her bileşen en az `--seconds` süre boyunca tekrar çalıştırılır.
+NLTK verileri ve tiktoken kodlaması yerelde kurulu olmalıdır
+(`python -m benchmarks.load --provision`).
+
+Kullanım:
+    python -m benchmarks.components --words 50 200 --seconds 1.0 --output bench/components.json
+"""
+from typing import Callable, Dict, List, Optional
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from src.models import token_counter
+from src.models.batch_scorer import BatchScorer
+from src.models.lime_analyzer import LIMEAnalyzer
+from src.utils import text_processing
+from .common import make_prompt, print_table, summarize, write_results
+
+def measure(fn: Callable[[], object], min_seconds: float, min_iterations: int = 3) -> Dict:
+    """Fonksiyonu süre ve tekrar alt sınırına ulaşana dek çalıştır"""
+    samples: List[float] = []
+    started = time.perf_counter()
+    while len(samples) < min_iterations or time.perf_counter() - started < min_seconds:
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {
+        "ops_per_sec": round(len(samples) / sum(samples), 2),
+        **summarize(samples)
+    }
+
+def perturbations(num_words: int, count: int, seed: int) -> np.ndarray:
+    """LIME örneklemesine benzer şekilde rastgele tokenları silinmiş ikili matris"""
+    rng = np.random.RandomState(seed)
+    return (rng.rand(count, num_words) > 0.3).astype(np.int64)
+
+def build_cases(analyzer: LIMEAnalyzer, text: str, batch_size: int) -> Dict[str, Callable[[], object]]:
+    """Ölçülecek bileşenler (ad -> argümansız çağrı)"""
+    optimized = " ".join(text.split()[::2]) + "."
+    tokens = text_processing.tokenize_text(text)
+    indexed_string = analyzer._index_text(text)
+    batch = perturbations(indexed_string.num_words(), batch_size, seed=len(tokens))
+    loop = asyncio.new_event_loop()
+    return {
+        "batch_scorer": lambda: BatchScorer(indexed_string).score(batch),
+        "analyze_prompt": lambda: loop.run_until_complete(analyzer.analyze_prompt(text, optimized)),
+        "count_tokens": lambda: token_counter.count_tokens(text),
+        "preprocess_text": lambda: text_processing.preprocess_text(text),
+        "tokenize_text": lambda: text_processing.tokenize_text(text),
+        "remove_stopwords": lambda: text_processing.remove_stopwords(tokens),
+        "split_sentences": lambda: text_processing.split_sentences(text),
+        "extract_key_phrases": lambda: text_processing.extract_key_phrases(text),
+        "calculate_similarity": lambda: text_processing.calculate_similarity(text, optimized),
+        "analyze_prompt_structure": lambda: text_processing.analyze_prompt_structure(text)
+    }
+
+def run(lengths: List[int], min_seconds: float, batch_size: int, only: Optional[List[str]]) -> List[Dict]:
+    text_processing.ensure_nltk_data()
+    analyzer = LIMEAnalyzer()
+    results = []
+
+    for num_words in lengths:
+        text = make_prompt(num_words, seed=num_words)
+        for component, fn in build_cases(analyzer, text, batch_size).items():
+            if only and component not in only:
+                continue
+            row = {"name": f"{component}[{num_words}]", "component": component, "words": num_words}
+            try:
+                # İlk çağrı (önbellek, kodlayıcı yükleme) ölçüme dahil edilmez
+                fn()
+                row.update(measure(fn, min_seconds))
+            except Exception as e:
+                row["error"] = str(e)
+            if component == "batch_scorer" and "ops_per_sec" in row:
+                row["texts_per_sec"] = round(row["ops_per_sec"] * batch_size, 1)
+            results.append(row)
+
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, nargs="+", default=[50, 200, 800])
+    parser.add_argument("--seconds", type=float, default=1.0, help="Bileşen başına en az ölçüm süresi")
+    parser.add_argument("--batch-size", type=int, default=100, help="BatchScorer çağrısı başına pertürbasyon")
+    parser.add_argument("--only", nargs="+", default=None, help="Yalnızca bu bileşenleri ölç")
+    parser.add_argument("--output", default=None, help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON olarak yazdır")
+    args = parser.parse_args()
+
+    config = {"words": args.words, "seconds": args.seconds, "batch_size": args.batch_size, "only": args.only}
+    results = run(args.words, args.seconds, args.batch_size, args.only)
+    document = write_results("components", config, results, args.output)
+    if args.json:
+        print(json.dumps(document, indent=2, ensure_ascii=False))
+        return
+
+    print_table(results, ["component", "words", "ops_per_sec", "p50_ms", "p95_ms", "p99_ms"])
+    for row in results:
+        if "error" in row:
+            print(f"{row['name']}: {row['error']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""LIME ve occlusion açıklayıcılarının gecikme ve uyum karşılaştırması
+
+Kullanım:
+    python -m benchmarks.explainers --lengths 50 200 800 --repeats 3
+"""
+from typing import Dict, List
+import argparse
+import json
+import time
+
+import numpy as np
+from scipy.stats import spearmanr
+
+from src.models.lime_analyzer import LIMEAnalyzer
+from .common import make_prompt
+
+def top_k_overlap(a: np.ndarray, b: np.ndarray, k: int) -> float:
+    """İki ağırlık vektörünün en önemli k pozisyonundaki örtüşme oranı"""
+    k = min(k, len(a))
+    if k == 0:
+        return 1.0
+    top_a = set(np.argsort(-np.abs(a), kind="stable")[:k])
+    top_b = set(np.argsort(-np.abs(b), kind="stable")[:k])
+    return len(top_a & top_b) / k
+
+def run(lengths: List[int], repeats: int, top_k: int, window: int) -> List[Dict]:
+    analyzer = LIMEAnalyzer()
+    analyzer.occlusion_explainer.window = window
+    results = []
+
+    for num_words in lengths:
+        text = make_prompt(num_words, seed=num_words)
+        indexed_string = analyzer._index_text(text)
+        num_features = indexed_string.num_words()
+
+        lime_times, occlusion_times = [], []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            lime_exp = analyzer._explain_instance(
+                text,
+                num_features=num_features,
+                num_samples=analyzer.settings.num_samples
+            )
+            lime_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            occlusion_exp = analyzer.occlusion_explainer.explain_instance(indexed_string)
+            occlusion_times.append(time.perf_counter() - start)
+
+        # Karşılaştırma LIME'ın seçtiği sınıf üzerinden, token pozisyonu bazında yapılır
+        label = lime_exp.top_labels[0]
+        lime_weights = np.zeros(num_features)
+        for feature, weight in lime_exp.local_exp[label]:
+            lime_weights[feature] = weight
+        occlusion_weights = occlusion_exp.weights if label == 1 else -occlusion_exp.weights
+
+        results.append({
+            "words": num_words,
+            "features": num_features,
+            "lime_ms": round(float(np.median(lime_times)) * 1000, 3),
+            "occlusion_ms": round(float(np.median(occlusion_times)) * 1000, 3),
+            "speedup": round(float(np.median(lime_times) / np.median(occlusion_times)), 1),
+            "spearman": round(float(spearmanr(lime_weights, occlusion_weights).correlation), 4),
+            f"top{top_k}_overlap": round(top_k_overlap(lime_weights, occlusion_weights, top_k), 4),
+            "sign_agreement": round(float(np.mean(
+                np.sign(lime_weights) == np.sign(occlusion_weights)
+            )), 4)
+        })
+
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[25, 100, 400, 1000])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--window", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON olarak yazdır")
+    args = parser.parse_args()
+
+    results = run(args.lengths, args.repeats, args.top_k, args.window)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    headers = list(results[0].keys())
+    print(" | ".join(f"{h:>14}" for h in headers))
+    for row in results:
+        print(" | ".join(f"{row[h]:>14}" for h in headers))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""OpenAI uyumlu sahte sohbet tamamlama sunucusu
+
+Ağ erişimi ve API anahtarı gerektirmeden `LLMClient` çağrılarını yanıtlar.
+Gecikme, sapma, yanıt uzunluğu, akış parça aralığı ve hata oranı
+ayarlanabilir. Uygulama `OPENAI_BASE_URL` ile bu sunucuya yönlendirilir.
+
+Kullanım:
+    python -m benchmarks.fake_openai --port 8100 --latency 0.2 --jitter 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=sk-fake uvicorn src.api.main:app
+"""
+from typing import AsyncIterator, Dict, List, Optional
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+import uvicorn
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+def estimate_tokens(text: str) -> int:
+    """tiktoken olmadan yaklaşık token sayısı (kelime ve noktalama)"""
+    return len(TOKEN_PATTERN.findall(text))
+
+def make_completion(prompt: str, max_words: int) -> str:
+    """Promptun son mesajından kısaltılmış bir 'optimize' metin üret
+
+    Gerçek bir optimizasyona benzesin diye tekrar eden kelimeler atılır;
+    böylece benzerlik ve token azalması skorları anlamlı kalır.
+    """
+    words: List[str] = []
+    seen = set()
+    for word in prompt.split():
+        key = word.lower().strip(".,;:!?")
+        if key in seen:
+            continue
+        seen.add(key)
+        words.append(word)
+        if len(words) >= max_words:
+            break
+    return " ".join(words) or "OK"
+
+def create_app(
+    latency: float = 0.2,
+    jitter: float = 0.05,
+    completion_words: int = 40,
+    chunk_delay: float = 0.005,
+    error_rate: float = 0.0,
+    seed: int = 0
+) -> FastAPI:
+    """Ayarlanan davranışla sahte OpenAI uygulamasını oluştur"""
+    app = FastAPI(title="Fake OpenAI")
+    rng = random.Random(seed)
+    stats = {"requests": 0, "streamed": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+    async def wait() -> None:
+        await asyncio.sleep(max(0.0, rng.gauss(latency, jitter)))
+
+    def chunk(completion_id: str, model: str, delta: Dict, finish_reason=None) -> str:
+        payload = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+        }
+        return f"data: {json.dumps(payload)}\n\n"
+
+    async def stream(completion_id: str, model: str, text: str, usage: Optional[Dict]) -> AsyncIterator[str]:
+        yield chunk(completion_id, model, {"role": "assistant", "content": ""})
+        for index, word in enumerate(text.split(" ")):
+            await asyncio.sleep(chunk_delay)
+            yield chunk(completion_id, model, {"content": word if index == 0 else " " + word})
+        yield chunk(completion_id, model, {}, finish_reason="stop")
+        if usage is not None:
+            # stream_options.include_usage: seçeneksiz son parçada kullanım
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [],
+                "usage": usage
+            }
+            yield f"data: {json.dumps(payload)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        model = body.get("model", "gpt-3.5-turbo")
+        prompt = body["messages"][-1]["content"]
+        await wait()
+
+        if error_rate and rng.random() < error_rate:
+            stats["errors"] += 1
+            return JSONResponse(status_code=500, content={"error": {
+                "message": "Sahte sunucu hatası",
+                "type": "server_error",
+                "code": None
+            }})
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        text = make_completion(prompt, completion_words)
+        prompt_tokens = estimate_tokens(prompt)
+        completion_tokens = estimate_tokens(text)
+        stats["prompt_tokens"] += prompt_tokens
+        stats["completion_tokens"] += completion_tokens
+
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+        if body.get("stream"):
+            stats["streamed"] += 1
+            include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+            return StreamingResponse(
+                stream(completion_id, model, text, usage if include_usage else None),
+                media_type="text/event-stream"
+            )
+
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop"
+            }],
+            "usage": usage
+        }
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [
+            {"id": name, "object": "model", "owned_by": "fake"} for name in ("gpt-3.5-turbo", "gpt-4")
+        ]}
+
+    @app.get("/stats")
+    async def get_stats():
+        """Sunucunun aldığı istek ve ürettiği token sayıları"""
+        return stats
+
+    return app
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.2, help="Ortalama yanıt gecikmesi (saniye)")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Gecikmenin standart sapması (saniye)")
+    parser.add_argument("--completion-words", type=int, default=40, help="Yanıttaki en fazla kelime")
+    parser.add_argument("--chunk-delay", type=float, default=0.005, help="Akış parçaları arası bekleme (saniye)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500 dönen isteklerin oranı (0-1)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    app = create_app(
+        latency=args.latency,
+        jitter=args.jitter,
+        completion_words=args.completion_words,
+        chunk_delay=args.chunk_delay,
+        error_rate=args.error_rate,
+        seed=args.seed
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
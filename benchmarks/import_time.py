@@ -0,0 +1,103 @@
+"""Uygulama modülünün soğuk içe aktarma süresi ve ağır bağımlılık kontrolü
+
+Her ölçüm yeni bir Python sürecinde yapılır. Ağır ML/görselleştirme
+paketleri (NLTK, LIME, scikit-learn, OpenAI SDK) içe aktarma sırasında
+yüklenmemeli; eşik aşılırsa ya da biri yüklenirse çıkış kodu 1 olur.
+
+Kullanım:
+    python -m benchmarks.import_time --repeats 5 --threshold 1.0
+"""
+from typing import Dict, List
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Uygulamadan bağımsız çerçeve maliyeti (karşılaştırma için)
+FRAMEWORK_MODULES = "fastapi, pydantic_settings"
+
+HEAVY_MODULES = ["nltk", "lime", "sklearn", "scipy", "plotly", "matplotlib", "openai"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def measure(module: str) -> Dict:
+    """Modülü yeni bir süreçte içe aktar ve süreyi ölç"""
+    env = {**os.environ, "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "sk-benchmark")}
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def top_imports(module: str, limit: int) -> List[Dict]:
+    """-X importtime çıktısından kümülatif süresi en yüksek modüller"""
+    stderr = subprocess.run(
+        [sys.executable, "-W", "ignore", "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "sk-benchmark")}
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append({"module": name.strip(), "cumulative_ms": round(int(cumulative) / 1000, 1)})
+    rows.sort(key=lambda row: -row["cumulative_ms"])
+    return rows[:limit]
+
+def run(module: str, repeats: int, threshold: float, top: int) -> Dict:
+    samples = [measure(module) for _ in range(repeats)]
+    seconds = [sample["seconds"] for sample in samples]
+    loaded = sorted({name for sample in samples for name in sample["loaded"]})
+    median = statistics.median(seconds)
+    framework = statistics.median(measure(FRAMEWORK_MODULES)["seconds"] for _ in range(repeats))
+    return {
+        "module": module,
+        "repeats": repeats,
+        "median_ms": round(median * 1000, 1),
+        "min_ms": round(min(seconds) * 1000, 1),
+        "max_ms": round(max(seconds) * 1000, 1),
+        "threshold_ms": round(threshold * 1000, 1),
+        "framework_ms": round(framework * 1000, 1),
+        "app_ms": round((median - framework) * 1000, 1),
+        "heavy_modules_loaded": loaded,
+        "passed": median < threshold and not loaded,
+        "top_imports": top_imports(module, top)
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="src.api.main")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=1.0, help="Medyan için üst sınır (saniye)")
+    parser.add_argument("--top", type=int, default=10, help="Raporlanacak en yavaş modül sayısı")
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON olarak yazdır")
+    args = parser.parse_args()
+
+    result = run(args.module, args.repeats, args.threshold, args.top)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{result['module']}: medyan {result['median_ms']} ms "
+              f"(min {result['min_ms']}, max {result['max_ms']}, eşik {result['threshold_ms']})")
+        print(f"Çerçeve: {result['framework_ms']} ms, uygulama: {result['app_ms']} ms")
+        print(f"Yüklenen ağır modüller: {', '.join(result['heavy_modules_loaded']) or 'yok'}")
+        for row in result["top_imports"]:
+            print(f"{row['cumulative_ms']:>10} ms  {row['module']}")
+        print("BAŞARILI" if result["passed"] else "BAŞARISIZ")
+    sys.exit(0 if result["passed"] else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""FastAPI uygulamasına eşzamanlı yük uygulayan sürücü
+
+Varsayılan olarak sahte OpenAI sunucusu (`benchmarks.fake_openai`) ve
+uygulama (`MONGODB_BACKEND=memory`) alt süreçlerde başlatılır; API anahtarı
+ya da MongoDB gerekmez. `--url` ile çalışan bir sunucu da hedeflenebilir.
+Senaryo başına p50/p95/p99 gecikme, istek hızı ve hata sayısı raporlanır.
+
+Ağsız çalıştırmak için NLTK verileri (`python -m src.utils.nltk_setup`) ve
+tiktoken `cl100k_base` kodlaması (`TIKTOKEN_CACHE_DIR`) önceden, ağ erişimi
+olan bir ortamda kurulmalıdır; eksikse ısınma adımları "failed" olur ve
+ilgili istekler hata verir.
+
+Kullanım:
+    TIKTOKEN_CACHE_DIR=.tiktoken python -m benchmarks.load --provision
+    python -m benchmarks.load --concurrency 16 --duration 20 --output bench/load.json
+    python -m benchmarks.load --mix optimize=1 --app-env LLM_CACHE_ENABLED=false
+"""
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+from .common import make_prompt, print_table, summarize, write_results
+
+SCENARIOS = ("create", "optimize", "metrics", "list", "iterations", "tokens")
+# Isınması başarısız olursa yükün anlamsızlaştığı bileşenler
+OFFLINE_DATA = {
+    "nltk": "python -m src.utils.nltk_setup",
+    "tokenizers": "TIKTOKEN_CACHE_DIR=<dizin> python -m benchmarks.load --provision"
+}
+DEFAULT_MIX = "create=2,optimize=1,metrics=3,list=2,iterations=1,tokens=1"
+
+def parse_pairs(value: str) -> Dict[str, str]:
+    """"a=1,b=2" biçimini sözlüğe çevir"""
+    pairs = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        key, _, val = item.partition("=")
+        pairs[key] = val
+    return pairs
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_until(check, timeout: float, interval: float = 0.2):
+    """`check` None dışında bir değer döndürene dek bekle"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            result = check()
+            if result is not None:
+                return result
+        except httpx.HTTPError:
+            pass
+        time.sleep(interval)
+    raise TimeoutError("Sunucu zamanında hazır olmadı")
+
+def app_ready(url: str) -> Optional[Dict]:
+    """Isınma bittiyse bileşen durumlarını döndür
+
+    Başarısız bir ısınma adımı (ör. çevrimdışı tiktoken indirmesi) yükü
+    engellemez; durum sonuç dosyasına yazılır.
+    """
+    response = httpx.get(f"{url}/ready", timeout=2)
+    components = response.json()["components"]
+    if response.status_code == 200 or all(state in ("ready", "failed") for state in components.values()):
+        return components
+    return None
+
+def provision() -> bool:
+    """NLTK verilerini ve tiktoken kodlamasını yerel önbelleğe indir (ağ gerekir)"""
+    import tiktoken
+    from src.models.token_counter import DEFAULT_ENCODING
+    from src.utils.nltk_setup import provision as provision_nltk
+
+    results = provision_nltk()
+    for resource, ok in results.items():
+        print(f"{resource}: {'tamam' if ok else 'indirilemedi'}")
+
+    cache_dir = os.environ.get("TIKTOKEN_CACHE_DIR", "varsayılan geçici dizin")
+    try:
+        tiktoken.get_encoding(DEFAULT_ENCODING)
+        print(f"tiktoken {DEFAULT_ENCODING}: tamam ({cache_dir})")
+    except Exception as e:
+        print(f"tiktoken {DEFAULT_ENCODING}: indirilemedi ({str(e)})")
+        return False
+    return all(results.values())
+
+def warn_missing_data(warmup: Dict) -> None:
+    """Çevrimdışı veri eksikliğinden başarısız olan ısınma adımlarını bildir"""
+    for component, command in OFFLINE_DATA.items():
+        if warmup.get(component) == "failed":
+            print(f"Uyarı: {component} ısınması başarısız; veriler eksik olabilir: {command}", file=sys.stderr)
+
+@contextmanager
+def local_servers(args: argparse.Namespace) -> Iterator[Tuple[str, Dict]]:
+    """Sahte OpenAI sunucusunu ve uygulamayı alt süreçlerde başlat"""
+    processes: List[subprocess.Popen] = []
+    try:
+        openai_port = free_port()
+        processes.append(subprocess.Popen([
+            sys.executable, "-m", "benchmarks.fake_openai",
+            "--port", str(openai_port),
+            "--latency", str(args.llm_latency),
+            "--jitter", str(args.llm_jitter),
+            "--error-rate", str(args.llm_error_rate)
+        ]))
+        openai_url = f"http://127.0.0.1:{openai_port}"
+        wait_until(lambda: httpx.get(f"{openai_url}/v1/models", timeout=2).json(), timeout=30)
+
+        app_port = free_port()
+        env = {
+            **os.environ,
+            "OPENAI_API_KEY": "sk-fake",
+            "OPENAI_BASE_URL": f"{openai_url}/v1",
+            "MONGODB_BACKEND": "memory",
+            **dict(item.partition("=")[::2] for item in args.app_env)
+        }
+        processes.append(subprocess.Popen([
+            sys.executable, "-m", "uvicorn", "src.api.main:app",
+            "--port", str(app_port),
+            "--log-level", "warning"
+        ], env=env))
+        app_url = f"http://127.0.0.1:{app_port}"
+        warmup = wait_until(lambda: app_ready(app_url), timeout=args.startup_timeout)
+        warn_missing_data(warmup)
+        yield app_url, {"warmup": warmup, "openai_url": openai_url}
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+class LoadDriver:
+    """Ağırlıklı senaryo karışımını sabit eşzamanlılıkla çalıştırır"""
+
+    def __init__(self, client: httpx.AsyncClient, mix: Dict[str, float], words: int, seed: int):
+        unknown = set(mix) - set(SCENARIOS)
+        if unknown:
+            raise ValueError(f"Bilinmeyen senaryolar: {sorted(unknown)}")
+        self.client = client
+        self.mix = mix
+        self.words = words
+        self.rng = random.Random(seed)
+        self.prompt_ids: List[str] = []
+        # Senaryo -> [(süre, başarılı mı)]
+        self.samples: Dict[str, List[Tuple[float, bool]]] = {name: [] for name in mix}
+        self.requests = {
+            "create": self.create,
+            "optimize": self.optimize,
+            "metrics": self.metrics,
+            "list": self.list_prompts,
+            "iterations": self.iterations,
+            "tokens": self.tokens
+        }
+
+    def _text(self) -> str:
+        return make_prompt(self.words, seed=self.rng.randrange(1_000_000))
+
+    async def create(self) -> httpx.Response:
+        response = await self.client.post("/api/v1/prompts/prompt", json={"text": self._text()})
+        if response.status_code == 200:
+            self.prompt_ids.append(response.json()["prompt_id"])
+        return response
+
+    async def optimize(self) -> httpx.Response:
+        return await self.client.post(f"/api/v1/prompts/optimize/{self.rng.choice(self.prompt_ids)}")
+
+    async def metrics(self) -> httpx.Response:
+        return await self.client.get(f"/api/v1/prompts/metrics/{self.rng.choice(self.prompt_ids)}")
+
+    async def list_prompts(self) -> httpx.Response:
+        return await self.client.get("/api/v1/prompts", params={"limit": 20})
+
+    async def iterations(self) -> httpx.Response:
+        return await self.client.get(f"/api/v1/prompts/{self.rng.choice(self.prompt_ids)}/iterations")
+
+    async def tokens(self) -> httpx.Response:
+        return await self.client.post("/api/v1/tokens/count", json={"texts": [self._text() for _ in range(8)]})
+
+    async def seed(self, count: int) -> None:
+        """Okuma senaryoları için ölçüm dışı başlangıç verisi"""
+        for _ in range(count):
+            response = await self.create()
+            response.raise_for_status()
+
+    async def _worker(self, deadline: float) -> None:
+        names = list(self.mix)
+        weights = [float(self.mix[name]) for name in names]
+        while time.monotonic() < deadline:
+            name = self.rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                response = await self.requests[name]()
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            self.samples[name].append((time.perf_counter() - start, ok))
+
+    async def run(self, concurrency: int, duration: float) -> float:
+        deadline = time.monotonic() + duration
+        start = time.perf_counter()
+        await asyncio.gather(*(self._worker(deadline) for _ in range(concurrency)))
+        return time.perf_counter() - start
+
+    def report(self, elapsed: float) -> List[Dict]:
+        """Senaryo başına ve toplam gecikme özeti"""
+        rows = []
+        everything: List[Tuple[float, bool]] = []
+        for name, samples in self.samples.items():
+            everything.extend(samples)
+            rows.append(self._row(name, samples, elapsed))
+        rows.append(self._row("all", everything, elapsed))
+        return rows
+
+    @staticmethod
+    def _row(name: str, samples: List[Tuple[float, bool]], elapsed: float) -> Dict:
+        return {
+            "name": name,
+            "rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+            "errors": sum(1 for _, ok in samples if not ok),
+            **summarize([seconds for seconds, _ in samples])
+        }
+
+async def drive(url: str, args: argparse.Namespace) -> Tuple[List[Dict], float]:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits) as client:
+        mix = {name: float(weight) for name, weight in parse_pairs(args.mix).items()}
+        driver = LoadDriver(client, mix, args.words, args.seed)
+        await driver.seed(args.seed_prompts)
+        elapsed = await driver.run(args.concurrency, args.duration)
+        return driver.report(elapsed), elapsed
+
+async def fetch_json(url: str) -> Optional[Dict]:
+    try:
+        async with httpx.AsyncClient(timeout=5) as client:
+            return (await client.get(url)).json()
+    except (httpx.HTTPError, ValueError):
+        return None
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="Çalışan uygulama adresi (verilmezse yerel sunucular başlatılır)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0, help="Ölçüm süresi (saniye)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Senaryo ağırlıkları (ad=ağırlık,...)")
+    parser.add_argument("--words", type=int, default=60, help="Oluşturulan promptların kelime sayısı")
+    parser.add_argument("--seed-prompts", type=int, default=20, help="Ölçümden önce oluşturulan prompt sayısı")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=60.0, help="İstek zaman aşımı (saniye)")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Sahte OpenAI ortalama gecikmesi")
+    parser.add_argument("--llm-jitter", type=float, default=0.05)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--app-env", action="append", default=[], help="Uygulama ayarı (AD=DEĞER), tekrarlanabilir")
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    parser.add_argument("--output", default=None, help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON olarak yazdır")
+    parser.add_argument("--provision", action="store_true", help="Yalnızca çevrimdışı verileri indir ve çık")
+    args = parser.parse_args()
+
+    if args.provision:
+        sys.exit(0 if provision() else 1)
+
+    config = {
+        key: getattr(args, key)
+        for key in ("url", "concurrency", "duration", "mix", "words", "seed_prompts", "seed",
+                    "llm_latency", "llm_jitter", "llm_error_rate", "app_env")
+    }
+    if args.url:
+        results, _ = asyncio.run(drive(args.url, args))
+    else:
+        with local_servers(args) as (url, environment):
+            results, _ = asyncio.run(drive(url, args))
+            config["warmup"] = environment["warmup"]
+            config["fake_openai"] = asyncio.run(fetch_json(f"{environment['openai_url']}/stats"))
+
+    document = write_results("load", config, results, args.output)
+    if args.json:
+        print(json.dumps(document, indent=2, ensure_ascii=False))
+        return
+    print_table(results, ["name", "count", "errors", "rps", "p50_ms", "p95_ms", "p99_ms"])
+
+if __name__ == "__main__":
+    main()
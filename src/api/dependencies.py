@@ -0,0 +1,22 @@
+from fastapi import Request
+
+from ..models.llm_client import LLMClient
+from ..services.container import ServiceContainer
+from ..services.prompt_service import PromptService
+from ..services.job_queue import JobQueue
+
+def get_container(request: Request) -> ServiceContainer:
+    """Uygulama ömrü boyunca paylaşılan servis konteynerini döndür"""
+    return request.app.state.services
+
+def get_prompt_service(request: Request) -> PromptService:
+    """Paylaşılan PromptService örneğini döndür"""
+    return get_container(request).prompt_service
+
+def get_job_queue(request: Request) -> JobQueue:
+    """Paylaşılan iş kuyruğunu döndür"""
+    return get_container(request).job_queue
+
+def get_llm_client(request: Request) -> LLMClient:
+    """Paylaşılan LLM istemcisini döndür"""
+    return get_container(request).llm_client
@@ -1,21 +1,41 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 import uvicorn
 import os
 
-from .routes import prompt_routes
+from .routes import prompt_routes, job_routes, token_routes, explanation_routes
+from .middleware import CompressionMiddleware
+from .responses import DefaultJSONResponse
 from ..config.settings import get_settings
-from ..utils.logger import logger
+from ..services.container import ServiceContainer
+from ..utils.logger import logger, enable_file_logging
+from ..utils.instrumentation import REGISTRY, MetricsMiddleware
 
 settings = get_settings()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Paylaşımlı servisleri başlat ve kapanışta havuzları serbest bırak"""
+    # Dosya loglaması yalnızca sunucu sürecinde; LIME işçileri konsola yazar
+    enable_file_logging()
+    logger.info("API başlatılıyor...")
+    app.state.services = ServiceContainer()
+    await app.state.services.start()
+    yield
+    logger.info("API kapatılıyor...")
+    await app.state.services.close()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     docs_url=f"{settings.API_V1_STR}/docs",
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    default_response_class=DefaultJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS ayarları
@@ -28,6 +48,19 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
+# Büyük JSON yanıtları (analiz, geçmiş) için br/gzip
+if settings.RESPONSE_COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.RESPONSE_COMPRESSION_MIN_SIZE,
+        gzip_level=settings.RESPONSE_GZIP_LEVEL,
+        brotli_quality=settings.RESPONSE_BROTLI_QUALITY
+    )
+
+# İstek süresi histogramları (rota şablonu ve durum koduna göre)
+if settings.PROMETHEUS_ENABLED:
+    app.add_middleware(MetricsMiddleware, exclude_paths=["/metrics"])
+
 # Statik dosyalar ve şablonlar
 app.mount("/static", StaticFiles(directory="src/api/static"), name="static")
 templates = Jinja2Templates(directory="src/api/templates")
@@ -37,20 +70,43 @@ async def home(request: Request):
     """Ana sayfa"""
     return templates.TemplateResponse("index.html", {"request": request})
 
+@app.get("/ready")
+async def ready(request: Request):
+    """Hazırlık durumu: ısınma bitene kadar 503 döner"""
+    services = request.app.state.services
+    return JSONResponse(
+        status_code=200 if services.ready else 503,
+        content={"ready": services.ready, "components": services.warmup}
+    )
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metin biçiminde metrikler"""
+    if not settings.PROMETHEUS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrikler devre dışı")
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 # API rotaları
 app.include_router(
     prompt_routes.router,
     prefix=f"{settings.API_V1_STR}/prompts",
     tags=["prompts"]
 )
-
-@app.on_event("startup")
-async def startup_event():
-    logger.info("API başlatılıyor...")
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    logger.info("API kapatılıyor...")
+app.include_router(
+    job_routes.router,
+    prefix=f"{settings.API_V1_STR}/jobs",
+    tags=["jobs"]
+)
+app.include_router(
+    token_routes.router,
+    prefix=f"{settings.API_V1_STR}/tokens",
+    tags=["tokens"]
+)
+app.include_router(
+    explanation_routes.router,
+    prefix=f"{settings.API_V1_STR}/explanations",
+    tags=["explanations"]
+)
 
 if __name__ == "__main__":
     uvicorn.run(
@@ -0,0 +1,112 @@
+from typing import Optional, Sequence
+import gzip
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli isteğe bağlı
+    brotli = None
+
+# Sıkıştırılmayan içerik tipleri; SSE parça parça iletilmeli
+EXCLUDED_MEDIA_TYPES = ("text/event-stream", "image/", "video/", "audio/", "application/zip", "application/gzip")
+
+def negotiate_encoding(accept_encoding: str, brotli_available: bool = brotli is not None) -> Optional[str]:
+    """Accept-Encoding başlığından br veya gzip seç (q=0 olanlar hariç)"""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    candidates = ["br", "gzip"] if brotli_available else ["gzip"]
+    scored = [(accepted.get(name, wildcard), name) for name in candidates]
+    scored = [(quality, name) for quality, name in scored if quality > 0]
+    if not scored:
+        return None
+    # Eşit ağırlıkta br tercih edilir
+    return max(scored, key=lambda pair: (pair[0], pair[1] == "br"))[1]
+
+class CompressionMiddleware:
+    """Yanıtları Accept-Encoding'e göre br/gzip ile sıkıştıran ASGI ara katmanı
+
+    Yalnızca tek parça gövdeli ve `minimum_size` üzerindeki yanıtlar
+    sıkıştırılır; akışlı yanıtlar (SSE) ve zaten kodlanmış gövdeler olduğu
+    gibi iletilir.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        excluded_media_types: Sequence[str] = EXCLUDED_MEDIA_TYPES
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.excluded_media_types = tuple(excluded_media_types)
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def _compressible(self, headers: Headers, body: bytes) -> bool:
+        return (
+            len(body) >= self.minimum_size
+            and "content-encoding" not in headers
+            and not headers.get("content-type", "").startswith(self.excluded_media_types)
+        )
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+
+        async def send_wrapper(message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                # Gövde görülene kadar başlıklar bekletilir
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start.setdefault("headers", []))
+            if message.get("more_body", False) or not self._compressible(headers, body):
+                await send(start)
+                await send(message)
+                return
+
+            compressed = self._compress(body, encoding)
+            if len(compressed) >= len(body):
+                await send(start)
+                await send(message)
+                return
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,145 @@
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Type, Union, get_args, get_origin
+import types
+
+from fastapi import HTTPException, Query
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson isteğe bağlı
+    orjson = None
+
+# orjson kuruluysa tüm JSON yanıtları onunla kodlanır
+DefaultJSONResponse = ORJSONResponse if orjson is not None else JSONResponse
+
+# Alan adı -> alt alan ağacı (None: alanın tamamı)
+FieldTree = Dict[str, Optional["FieldTree"]]
+
+# Model -> {kaynak anahtar: yanıt alanı}; kaynak alan yanıtta boş bırakılır
+Renames = Dict[Type[BaseModel], Dict[str, str]]
+
+class _FieldPlan(NamedTuple):
+    name: str
+    default: Any
+    nested: Optional[Type[BaseModel]]
+    many: bool
+
+def _nested_model(annotation: Any) -> Tuple[Optional[Type[BaseModel]], bool]:
+    """Alan tipinden iç içe modeli ve liste olup olmadığını çıkar"""
+    origin = get_origin(annotation)
+    if origin in (Union, types.UnionType):
+        for arg in get_args(annotation):
+            if arg is not type(None):
+                return _nested_model(arg)
+        return None, False
+    if origin in (list, List):
+        nested, _ = _nested_model(get_args(annotation)[0])
+        return nested, nested is not None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    return None, False
+
+@lru_cache(maxsize=None)
+def _plan(model: Type[BaseModel]) -> Tuple[_FieldPlan, ...]:
+    """Modelin alanlarını bir kez çözümle"""
+    plan = []
+    for name, field in model.model_fields.items():
+        nested, many = _nested_model(field.annotation)
+        default = None if field.is_required() else field.get_default(call_default_factory=True)
+        plan.append(_FieldPlan(name, default, nested, many))
+    return tuple(plan)
+
+def parse_fields(model: Type[BaseModel], fields: Optional[str]) -> Optional[FieldTree]:
+    """"a,b.c" biçimindeki seçimi modele göre doğrulayıp alan ağacına çevir"""
+    if not fields:
+        return None
+    tree: FieldTree = {}
+    for path in filter(None, (part.strip() for part in fields.split(","))):
+        node, current = tree, model
+        names = path.split(".")
+        for depth, name in enumerate(names):
+            plan = {field.name: field for field in _plan(current)}
+            if name not in plan:
+                raise ValueError(f"Geçersiz alan: {path}")
+            last = depth == len(names) - 1
+            if last or plan[name].nested is None:
+                if not last:
+                    raise ValueError(f"Alt alan seçilemez: {path}")
+                node[name] = None
+                break
+            if name in node and node[name] is None:
+                break
+            node = node.setdefault(name, {})
+            current = plan[name].nested
+    return tree
+
+def shape(
+    model: Type[BaseModel],
+    data: Dict,
+    fields: Optional[FieldTree] = None,
+    renames: Optional[Renames] = None,
+    exclude_none: bool = False
+) -> Dict:
+    """Kendi oluşturduğumuz veriyi doğrulamadan yanıt modelinin alanlarına indir
+
+    Pydantic doğrulaması yapılmaz; yalnızca modelde tanımlı alanlar (ve
+    varsa `fields` seçimi) alınır, eksikler varsayılanla doldurulur.
+    Girdi sözlüğü değiştirilmez.
+    """
+    moved = (renames or {}).get(model, {})
+    sources = {target: source for source, target in moved.items()}
+    result = {}
+    for field in _plan(model):
+        if fields is not None and field.name not in fields:
+            continue
+        if field.name in moved:
+            value = field.default
+        elif field.name in sources and sources[field.name] in data:
+            value = data[sources[field.name]]
+        else:
+            value = data.get(field.name, field.default)
+
+        if value is not None and field.nested is not None:
+            subtree = fields.get(field.name) if fields is not None else None
+            if field.many:
+                value = [shape(field.nested, item, subtree, renames, exclude_none) for item in value]
+            else:
+                value = shape(field.nested, value, subtree, renames, exclude_none)
+        if value is None and exclude_none:
+            continue
+        result[field.name] = value
+    return result
+
+def model_response(
+    model: Type[BaseModel],
+    data: Dict,
+    fields: Optional[FieldTree] = None,
+    renames: Optional[Renames] = None,
+    exclude_none: bool = False,
+    status_code: int = 200
+) -> JSONResponse:
+    """Yanıtı response_model doğrulamasını atlayarak doğrudan kodla"""
+    return DefaultJSONResponse(
+        content=shape(model, data, fields, renames, exclude_none),
+        status_code=status_code
+    )
+
+class SparseFields:
+    """`fields=` sorgu parametresini verilen modele göre çözen bağımlılık"""
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+
+    def __call__(
+        self,
+        fields: str | None = Query(
+            default=None,
+            description="Virgülle ayrılmış alanlar; iç içe alanlar için nokta (ör. prompt_id,lime_analysis.confidence_score)"
+        )
+    ) -> Optional[FieldTree]:
+        try:
+            return parse_fields(self.model, fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
@@ -1,32 +1,35 @@
-from fastapi import APIRouter, HTTPException
-from typing import Dict, List
+from fastapi import APIRouter, Depends, HTTPException
+from typing import Dict, List, Optional
 from pydantic import BaseModel
 
+from ...services.prompt_service import PromptService
+from ..dependencies import get_prompt_service
+from ...utils.logger import logger
+
 router = APIRouter()
 
 class TokenAnalysis(BaseModel):
+    iteration: int
     token_importance: Dict[str, float]
-    changes: List[Dict[str, str]]
+    changes: List[Dict]
     explanation: str
     confidence_score: float
+    explainer: str | None = None
+    samples_used: int | None = None
 
 @router.get("/analyze/{prompt_id}")
-async def get_token_analysis(prompt_id: str) -> TokenAnalysis:
+async def get_token_analysis(
+    prompt_id: str,
+    iteration: Optional[int] = None,
+    prompt_service: PromptService = Depends(get_prompt_service)
+) -> TokenAnalysis:
+    """Kayıtlı ya da önbellekteki LIME analizini yeniden hesaplamadan getir"""
     try:
-        # LIME analizi ve token önem skorları hesaplama
-        # Bu kısım LIME servisine bağlanacak
-        return TokenAnalysis(
-            token_importance={"token1": 0.8, "token2": 0.6},
-            changes=[
-                {
-                    "position": 1,
-                    "original": "eski",
-                    "optimized": "yeni",
-                    "type": "replacement"
-                }
-            ],
-            explanation="Token analizi açıklaması",
-            confidence_score=0.85
-        )
+        analysis = await prompt_service.get_token_analysis(prompt_id, iteration)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        logger.error(f"Token analizi getirme hatası: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+        
+    if analysis is None:
+        raise HTTPException(status_code=404, detail="Analiz bulunamadı")
+    return TokenAnalysis(**analysis)
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+
+from ...services.job_queue import JobQueue
+from ..dependencies import get_job_queue
+from ...utils.logger import logger
+
+router = APIRouter()
+
+class JobStageProgress(BaseModel):
+    status: str
+    started_at: str | None = None
+    finished_at: str | None = None
+
+class JobResponse(BaseModel):
+    job_id: str
+    type: str
+    payload: Dict
+    status: str
+    stage: str | None = None
+    progress: Dict[str, JobStageProgress] = {}
+    attempts: int
+    max_attempts: int
+    result: Dict | None = None
+    error: str | None = None
+    created_at: str
+    updated_at: str
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str, queue: JobQueue = Depends(get_job_queue)) -> Dict:
+    """İş durumunu ve aşama ilerlemesini getir"""
+    job = await queue.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"İş bulunamadı: {job_id}")
+    return job
+
+@router.get("", response_model=List[JobResponse])
+async def list_jobs(
+    status: Optional[str] = Query(default=None, pattern="^(queued|running|completed|failed)$"),
+    limit: int = Query(default=50, ge=1, le=200),
+    queue: JobQueue = Depends(get_job_queue)
+) -> List[Dict]:
+    """İşleri durum filtresiyle listele"""
+    try:
+        return await queue.list_jobs(status=status, limit=limit)
+    except Exception as e:
+        logger.error(f"İş listeleme hatası: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,9 +1,19 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
+import json
 from typing import Dict, List
 from pydantic import BaseModel, Field
-from datetime import datetime
+from datetime import date, datetime
 
 from ...services.prompt_service import PromptService
+from ...services.analysis_executor import AnalysisQueueFullError, AnalysisTimeoutError
+from ...services.job_queue import JobQueue
+from ...models.llm_client import TokenLimitExceededError
+from ...utils.visualization import FIGURE_BUILDERS
+from ...database.metrics_store import SUMMARY_DIMENSIONS
+from ..dependencies import get_prompt_service, get_job_queue
+from ..responses import FieldTree, SparseFields, model_response
 from ...config.settings import get_settings
 from ...utils.logger import logger
 
@@ -20,6 +30,36 @@ class LIMEAnalysis(BaseModel):
     changes: List[Dict]
     explanation: str
     confidence_score: float
+    explainer: str | None = None
+    samples_used: int | None = None
+
+class CompressionReport(BaseModel):
+    original_tokens: int
+    compressed_tokens: int
+    tokens_saved: int
+    applied_rules: List[str]
+    within_budget: bool
+
+class SearchCandidate(BaseModel):
+    temperature: float
+    tokens: int
+    token_reduction: float
+    similarity: float
+    score: float
+    accepted: bool
+
+class SearchEpoch(BaseModel):
+    epoch: int
+    best_score: float | None = None
+    candidates: List[SearchCandidate]
+
+class SearchSummary(BaseModel):
+    epochs_run: int
+    candidates_per_epoch: int
+    stop_reason: str
+    best_score: float
+    billed_tokens: int
+    epochs: List[SearchEpoch]
 
 class ModelResponse(BaseModel):
     iteration: int
@@ -33,6 +73,15 @@ class ModelResponse(BaseModel):
     cost_usd: float
     timestamp: str
     lime_analysis: LIMEAnalysis | None = None
+    reused_from: str | None = None
+    compression: CompressionReport | None = None
+    search: SearchSummary | None = None
+
+class SimilarPrompt(BaseModel):
+    prompt_id: str
+    similarity: float
+    original_prompt: str
+    optimized_prompt: str
 
 class PromptResponse(BaseModel):
     prompt_id: str
@@ -42,6 +91,30 @@ class PromptResponse(BaseModel):
     created_at: str
     optimized_prompt: str | None = None
     lime_analysis: LIMEAnalysis | None = None
+    iterations: int | None = None
+    similar_prompts: List[SimilarPrompt] | None = None
+
+class PromptListItem(BaseModel):
+    prompt_id: str
+    original_prompt: str
+    status: str
+    created_at: str
+    model_name: str | None = None
+    optimized_prompt: str | None = None
+    iterations: int | None = None
+    total_tokens: int | None = None
+    total_cost_usd: float | None = None
+    model_responses: List[ModelResponse] | None = None
+    lime_analysis: LIMEAnalysis | None = None
+
+class PromptListResponse(BaseModel):
+    items: List[PromptListItem]
+    next_cursor: str | None = None
+
+class IterationPage(BaseModel):
+    prompt_id: str
+    items: List[ModelResponse]
+    next_cursor: int | None = None
 
 class MetricsResponse(BaseModel):
     prompt_id: str
@@ -51,6 +124,56 @@ class MetricsResponse(BaseModel):
     original_prompt_length: int
     optimized_prompt_length: int | None = None
 
+class MetricsSummaryItem(BaseModel):
+    model: str | None = None
+    day: str | None = None
+    status: str | None = None
+    requests: int
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    cost_usd: float
+
+class MetricsSummaryTotals(BaseModel):
+    requests: int
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    cost_usd: float
+
+class MetricsSummaryResponse(BaseModel):
+    group_by: List[str]
+    source: str
+    items: List[MetricsSummaryItem]
+    totals: MetricsSummaryTotals
+
+class BatchRequest(BaseModel):
+    texts: List[str] = []
+    prompt_ids: List[str] = []
+    concurrency: int | None = Field(default=None, ge=1)
+
+class BatchItemResult(BaseModel):
+    index: int
+    source: str
+    prompt_id: str | None = None
+    status: str
+    optimized_prompt: str | None = None
+    total_tokens: int = 0
+    cost_usd: float = 0.0
+    error: str | None = None
+
+class BatchResponse(BaseModel):
+    items: List[BatchItemResult]
+    succeeded: int
+    failed: int
+    total_tokens: int
+    total_cost_usd: float
+    concurrency: int
+    duration_seconds: float
+
+# format_response ile aynı dönüşüm: optimized_text yanıtta completion_text olarak döner
+RESPONSE_RENAMES = {ModelResponse: {"optimized_text": "completion_text"}}
+
 def format_response(data: Dict) -> Dict:
     """API response modellerine uygun formatta veriyi düzenle"""
     if not data:
@@ -66,43 +189,269 @@ def format_response(data: Dict) -> Dict:
                 
     return data
 
+@router.get("", response_model=PromptListResponse, response_model_exclude_none=True)
+async def list_prompts(
+    status: str | None = None,
+    model: str | None = None,
+    min_cost: float | None = Query(default=None, ge=0),
+    max_cost: float | None = Query(default=None, ge=0),
+    q: str | None = Query(default=None, min_length=1),
+    cursor: str | None = None,
+    limit: int | None = Query(default=None, ge=1, le=settings.PROMPTS_MAX_PAGE_SIZE),
+    include_details: bool = False,
+    fields: FieldTree | None = Depends(SparseFields(PromptListItem)),
+    service: PromptService = Depends(get_prompt_service)
+) -> Response:
+    """Promptları filtrele, metin içinde ara ve imleç tabanlı sayfalarla listele
+
+    Varsayılan olarak model_responses ve lime_analysis alanları gönderilmez;
+    include_details=true ile dahil edilir. fields= öğe alanlarını seçer.
+    """
+    try:
+        page = await service.list_prompts(
+            status=status,
+            model_name=model,
+            min_cost=min_cost,
+            max_cost=max_cost,
+            search=q,
+            cursor=cursor,
+            limit=limit,
+            include_details=include_details
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Prompt listeleme hatası: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+        
+    return model_response(
+        PromptListResponse,
+        page,
+        fields=None if fields is None else {"items": fields, "next_cursor": None},
+        renames=RESPONSE_RENAMES,
+        exclude_none=True
+    )
+
 @router.post("/prompt", response_model=PromptResponse)
-async def create_prompt(prompt: PromptRequest) -> Dict:
+async def create_prompt(
+    prompt: PromptRequest,
+    fields: FieldTree | None = Depends(SparseFields(PromptResponse)),
+    service: PromptService = Depends(get_prompt_service)
+) -> Response:
     """Yeni bir prompt oluştur"""
     try:
-        service = PromptService()
         result = await service.create_prompt(
             text=prompt.text,
             model_name=prompt.model_name,
             temperature=prompt.temperature
         )
-        return format_response(result)
+        return model_response(PromptResponse, result, fields, renames=RESPONSE_RENAMES)
+    except TokenLimitExceededError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         logger.error(f"Prompt oluşturma hatası: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/optimize/{prompt_id}", response_model=PromptResponse)
-async def optimize_prompt(prompt_id: str) -> Dict:
-    """Var olan promptu optimize et"""
+async def optimize_prompt(
+    prompt_id: str,
+    mode: str = Query(default="sync", pattern="^(sync|async)$"),
+    epochs: int | None = Query(default=None, ge=1, le=settings.OPTIMIZATION_MAX_EPOCHS),
+    candidates: int | None = Query(default=None, ge=1, le=settings.OPTIMIZATION_MAX_CANDIDATES),
+    fields: FieldTree | None = Depends(SparseFields(PromptResponse)),
+    service: PromptService = Depends(get_prompt_service),
+    queue: JobQueue = Depends(get_job_queue)
+) -> Response:
+    """Var olan promptu optimize et; mode=async ise işi kuyruğa alıp 202 döndür
+
+    epochs/candidates verilirse her epoch'ta eşzamanlı adaylar üretilir ve
+    LIME yalnızca son kazanan için çalıştırılır.
+    """
+    if mode == "async":
+        job = await queue.enqueue_optimize(prompt_id, epochs=epochs, candidates=candidates)
+        return JSONResponse(status_code=202, content={
+            "job_id": job["job_id"],
+            "status": job["status"],
+            "status_url": f"{settings.API_V1_STR}/jobs/{job['job_id']}"
+        })
+        
     try:
-        service = PromptService()
-        result = await service.optimize_prompt(prompt_id)
-        return format_response(result)
+        result = await service.optimize_prompt(prompt_id, epochs=epochs, candidates=candidates)
+        return model_response(PromptResponse, result, fields, renames=RESPONSE_RENAMES)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except TokenLimitExceededError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except AnalysisQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except AnalysisTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         logger.error(f"Prompt optimizasyon hatası: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def format_sse(event: str, data: Dict) -> str:
+    """Server-Sent Events formatında mesaj oluştur"""
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data), ensure_ascii=False)}\n\n"
+
+@router.get("/optimize/{prompt_id}/stream")
+async def stream_optimize_prompt(
+    prompt_id: str,
+    service: PromptService = Depends(get_prompt_service)
+) -> StreamingResponse:
+    """Promptu optimize et; tamamlama parçalarını ve aşamaları SSE ile ilet"""
+    async def event_stream():
+        try:
+            async for event, data in service.stream_optimize_prompt(prompt_id):
+                if event == "result":
+                    data = format_response(data)
+                yield format_sse(event, data)
+        except ValueError as e:
+            yield format_sse("error", {"status_code": 404, "detail": str(e)})
+        except TokenLimitExceededError as e:
+            yield format_sse("error", {"status_code": 413, "detail": str(e)})
+        except AnalysisQueueFullError as e:
+            yield format_sse("error", {"status_code": 503, "detail": str(e)})
+        except Exception as e:
+            logger.error(f"Akışlı optimizasyon hatası: {str(e)}")
+            yield format_sse("error", {"status_code": 500, "detail": str(e)})
+            
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/batch", response_model=BatchResponse)
+async def optimize_batch(
+    batch: BatchRequest,
+    mode: str = Query(default="sync", pattern="^(sync|async)$"),
+    service: PromptService = Depends(get_prompt_service),
+    queue: JobQueue = Depends(get_job_queue)
+) -> Dict:
+    """Birden fazla metni veya kayıtlı promptu toplu optimize et
+
+    mode=async ise ya da öğe sayısı BATCH_SYNC_MAX_SIZE'ı aşarsa toplu iş
+    kuyruğa alınır ve 202 döner; sonuç /jobs/{job_id} üzerinden izlenir.
+    """
+    try:
+        total = service.check_batch_size(batch.texts, batch.prompt_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+        
+    if mode == "async" or total > settings.BATCH_SYNC_MAX_SIZE:
+        job = await queue.enqueue_batch(batch.texts, batch.prompt_ids, concurrency=batch.concurrency)
+        return JSONResponse(status_code=202, content={
+            "job_id": job["job_id"],
+            "status": job["status"],
+            "status_url": f"{settings.API_V1_STR}/jobs/{job['job_id']}"
+        })
+        
+    try:
+        return await service.optimize_batch(
+            texts=batch.texts,
+            prompt_ids=batch.prompt_ids,
+            concurrency=batch.concurrency
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Toplu optimizasyon hatası: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/metrics/summary", response_model=MetricsSummaryResponse, response_model_exclude_none=True)
+async def get_metrics_summary(
+    group_by: str = Query(default="model,day,status"),
+    start: date | None = None,
+    end: date | None = None,
+    source: str = Query(default="live", pattern="^(live|rollup)$"),
+    service: PromptService = Depends(get_prompt_service)
+) -> Dict:
+    """Tüm promptlar için model, gün ve durum bazında kullanım ve maliyet özeti"""
+    dimensions = [dimension.strip() for dimension in group_by.split(",") if dimension.strip()]
+    invalid = [dimension for dimension in dimensions if dimension not in SUMMARY_DIMENSIONS]
+    if invalid:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Geçersiz gruplama alanı: {invalid}. Geçerli alanlar: {list(SUMMARY_DIMENSIONS)}"
+        )
+        
+    try:
+        return await service.get_metrics_summary(list(dict.fromkeys(dimensions)), start, end, source)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Metrik özeti hatası: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/metrics/{prompt_id}", response_model=MetricsResponse)
-async def get_metrics(prompt_id: str) -> Dict:
+async def get_metrics(
+    prompt_id: str,
+    service: PromptService = Depends(get_prompt_service)
+) -> Dict:
     """Prompt metrikleri getir"""
     try:
-        service = PromptService()
         result = await service.get_metrics(prompt_id)
-        if not result:
-            raise HTTPException(status_code=404, detail=f"Prompt bulunamadı: {prompt_id}")
-        return result
     except Exception as e:
         logger.error(f"Metrik getirme hatası: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+        
+    if not result:
+        raise HTTPException(status_code=404, detail=f"Prompt bulunamadı: {prompt_id}")
+    return result
+
+@router.get("/cache/stats")
+async def get_cache_stats(service: PromptService = Depends(get_prompt_service)) -> Dict:
+    """LLM yanıt önbelleği isabet/ıskalama ve tasarruf istatistikleri"""
+    return service.get_cache_stats()
+
+@router.get("/{prompt_id}/visualizations/{kind}")
+async def get_visualization(
+    prompt_id: str,
+    kind: str,
+    request: Request,
+    iteration: int | None = Query(default=None, ge=1),
+    service: PromptService = Depends(get_prompt_service)
+) -> Response:
+    """LIME analizinin Plotly figürünü isteğe bağlı oluştur (ETag destekli)"""
+    if kind not in FIGURE_BUILDERS:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Bilinmeyen görselleştirme tipi: {kind}. Geçerli tipler: {list(FIGURE_BUILDERS)}"
+        )
+        
+    result = await service.get_visualization(prompt_id, kind, iteration)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Analiz bulunamadı: {prompt_id}")
+        
+    etag, figure = result
+    # iteration verilmezse adres "en son" analizi gösterir; her istekte ETag ile doğrulanmalı
+    cache_control = "private, max-age=3600" if iteration is not None else "private, no-cache"
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=jsonable_encoder(figure), headers=headers)
+
+@router.get("/{prompt_id}/iterations", response_model=IterationPage)
+async def list_iterations(
+    prompt_id: str,
+    cursor: int | None = Query(default=None, ge=0),
+    limit: int | None = Query(default=None, ge=1, le=settings.ITERATIONS_MAX_PAGE_SIZE),
+    fields: FieldTree | None = Depends(SparseFields(ModelResponse)),
+    service: PromptService = Depends(get_prompt_service)
+) -> Response:
+    """Prompt iterasyonlarını imleç tabanlı sayfalarla listele; fields= öğe alanlarını seçer"""
+    try:
+        page = await service.list_iterations(prompt_id, cursor, limit)
+    except Exception as e:
+        logger.error(f"İterasyon listeleme hatası: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+        
+    if page is None:
+        raise HTTPException(status_code=404, detail=f"Prompt bulunamadı: {prompt_id}")
+    return model_response(
+        IterationPage,
+        page,
+        fields=None if fields is None else {"prompt_id": None, "items": fields, "next_cursor": None},
+        renames=RESPONSE_RENAMES
+    )
@@ -0,0 +1,89 @@
+from fastapi import APIRouter, HTTPException, Depends
+from typing import Dict, List
+from pydantic import BaseModel, Field
+import asyncio
+
+from ...models.llm_client import LLMClient
+from ...services.prompt_service import PromptService
+from ...config.settings import get_settings
+from ..dependencies import get_llm_client, get_prompt_service
+from ...utils.logger import logger
+
+router = APIRouter()
+settings = get_settings()
+
+class TokenCountRequest(BaseModel):
+    texts: List[str]
+    models: List[str] = [settings.DEFAULT_MODEL]
+    completion_tokens: int = Field(default=0, ge=0)  # Metin başına öngörülen tamamlama tokenı
+
+class ModelTokenCount(BaseModel):
+    model: str
+    token_counts: List[int]
+    total_tokens: int
+    costs_usd: List[float]
+    total_cost_usd: float
+
+class TokenCountResponse(BaseModel):
+    results: List[ModelTokenCount]
+
+class CompressRequest(BaseModel):
+    text: str
+
+class CompressResponse(BaseModel):
+    text: str
+    original_tokens: int
+    compressed_tokens: int
+    tokens_saved: int
+    applied_rules: List[str]
+    within_budget: bool
+
+@router.post("/count", response_model=TokenCountResponse)
+async def count_tokens(
+    request: TokenCountRequest,
+    llm_client: LLMClient = Depends(get_llm_client)
+) -> Dict:
+    """Metinlerin token sayılarını ve öngörülen maliyetlerini model bazında hesapla"""
+    if len(request.texts) > settings.TOKEN_COUNT_MAX_TEXTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"En fazla {settings.TOKEN_COUNT_MAX_TEXTS} metin gönderilebilir"
+        )
+    unsupported = [model for model in request.models if model not in llm_client.models_config]
+    if unsupported:
+        raise HTTPException(status_code=400, detail=f"Desteklenmeyen modeller: {unsupported}")
+
+    try:
+        results = []
+        for model in request.models:
+            # Kodlama GIL'i bırakan iş parçacıklarında, olay döngüsü dışında yapılır
+            counts = await asyncio.to_thread(llm_client.count_tokens_batch, request.texts, model)
+            costs = [
+                llm_client.calculate_cost(count, request.completion_tokens, model)
+                for count in counts
+            ]
+            results.append({
+                "model": model,
+                "token_counts": counts,
+                "total_tokens": sum(counts),
+                "costs_usd": costs,
+                "total_cost_usd": sum(costs)
+            })
+        return {"results": results}
+    except Exception as e:
+        logger.error(f"Token sayma hatası: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/compress", response_model=CompressResponse)
+async def compress_prompt(
+    request: CompressRequest,
+    prompt_service: PromptService = Depends(get_prompt_service)
+) -> Dict:
+    """Promptu LLM çağırmadan yerel kurallarla sıkıştır ve token tasarrufunu döndür"""
+    if prompt_service.compressor is None:
+        raise HTTPException(status_code=400, detail="Yerel sıkıştırma etkin değil (COMPRESSION_ENABLED)")
+    try:
+        return await asyncio.to_thread(prompt_service.compress_prompt, request.text)
+    except Exception as e:
+        logger.error(f"Sıkıştırma hatası: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,11 +1,38 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+import hashlib
+import json
 
 class LIMESettings(BaseSettings):
     # LIME parametreleri
     num_samples: int = 1000
     kernel_width: float = 0.25
     feature_selection: str = "auto"
+    # Tekrarlanabilir analizler için her çalıştırmada kullanılan tohum
+    random_seed: int = 42
+    
+    # Açıklayıcı seçimi: "lime", "occlusion" veya "auto"
+    # "auto" modunda occlusion_token_threshold üzerindeki promptlar occlusion ile açıklanır
+    explainer: str = "auto"
+    occlusion_token_threshold: int = 200
+    occlusion_window: int = 1
+    
+    # Uyarlamalı örnekleme: pertürbasyonlar artan partilerle üretilir ve
+    # top-k ağırlıklar ile R² skoru tolerans içinde sabitlendiğinde durulur.
+    # Üst sınır num_samples ile max_samples'tan küçük olanıdır; yani açıkken
+    # analiz num_samples'tan pahalı olamaz, yalnızca erken bitebilir.
+    # Açmak örnek sayılarını ve açıklama değerlerini değiştirir, parmak izini
+    # de değiştirdiği için önbellekteki analizler geçersiz olur; bu yüzden
+    # varsayılan kapalıdır, dağıtımlar adaptive_sampling=true ile açar
+    adaptive_sampling: bool = False
+    min_samples: int = 100
+    max_samples: int = 2000
+    sample_growth_factor: float = 2.0
+    convergence_top_k: int = 10
+    convergence_tolerance: float = 0.05
+    r2_tolerance: float = 0.01
+    # Örnekleme için ayrılan süre, Settings.MAX_RESPONSE_TIME oranı olarak
+    sampling_time_budget_ratio: float = 0.5
     
     # Token analiz parametreleri
     importance_threshold: float = 0.1
@@ -32,6 +59,11 @@ class LIMESettings(BaseSettings):
     
     class Config:
         case_sensitive = True
+        
+    def fingerprint(self) -> str:
+        """Analiz sonucunu etkileyen ayarların özeti (önbellek anahtarı için)"""
+        payload = json.dumps(self.model_dump(), sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
 
 @lru_cache()
 def get_lime_settings() -> LIMESettings:
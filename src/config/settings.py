@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from pathlib import Path
 import os
 from dotenv import load_dotenv
 
@@ -15,10 +16,39 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     DEFAULT_MODEL: str = "gpt-3.5-turbo"
     DEFAULT_TEMPERATURE: float = 0.7
+    OPENAI_BASE_URL: str = ""  # Boşsa resmi API; yük testinde benchmarks.fake_openai adresi
+    
+    # OpenAI HTTP Bağlantı Havuzu
+    OPENAI_MAX_CONNECTIONS: int = 100
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    OPENAI_KEEPALIVE_EXPIRY: float = 30.0  # saniye
+    OPENAI_TIMEOUT: float = 60.0  # saniye
+    
+    # LLM Yanıt Önbelleği
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_BACKEND: str = "memory"  # "memory" veya "mongo"
+    LLM_CACHE_MAX_SIZE: int = 1024
+    LLM_CACHE_TTL: int = 3600  # saniye
+    LLM_CACHE_DETERMINISTIC_ONLY: bool = False  # Yalnızca temperature=0 çağrılarını önbellekle
+    
+    # LIME Analiz Önbelleği
+    LIME_CACHE_ENABLED: bool = True
+    LIME_CACHE_BACKEND: str = "mongo"  # "memory" veya "mongo"
+    LIME_CACHE_MAX_SIZE: int = 512
+    LIME_CACHE_TTL: int = 604800  # saniye (7 gün)
     
     # MongoDB Ayarları
     MONGODB_URI: str = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
+    MONGODB_BACKEND: str = "motor"  # "motor" veya "memory" (süreç içi mongomock-motor; yük testi için)
     DATABASE_NAME: str = "prompt_optimizer"
+    MONGODB_MAX_POOL_SIZE: int = 50
+    MONGODB_MIN_POOL_SIZE: int = 5
+    # "embedded": yanıtlar prompt belgesinde, "collection": ayrı iterations koleksiyonunda
+    ITERATIONS_STORAGE: str = "embedded"
+    ITERATIONS_PAGE_SIZE: int = 20
+    ITERATIONS_MAX_PAGE_SIZE: int = 100
+    PROMPTS_PAGE_SIZE: int = 20
+    PROMPTS_MAX_PAGE_SIZE: int = 100
     
     # Uygulama Ayarları
     DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
@@ -26,15 +56,97 @@ class Settings(BaseSettings):
     
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
+    TOKENS_PER_MINUTE: int = 90000
+    
+    # Toplu İşlem Ayarları
+    BATCH_MAX_SIZE: int = 1000
+    BATCH_SYNC_MAX_SIZE: int = 20  # Bu sınırı aşan toplu işlemler iş kuyruğuna alınır
+    BATCH_CONCURRENCY: int = 8
+    BATCH_WRITE_SIZE: int = 100  # Bulk write başına kayıt sayısı
     
     # Token Limitleri
     MAX_PROMPT_TOKENS: int = 4000
     MAX_COMPLETION_TOKENS: int = 1000
+    TOKENIZER_THREADS: int = 4
+    TOKEN_COUNT_MAX_TEXTS: int = 1000
+    
+    # NLTK Verileri (çalışma anında ağdan indirilmez)
+    NLTK_DATA_DIR: str = str(Path(__file__).resolve().parents[2] / "nltk_data")
+    NLTK_AUTO_DOWNLOAD: bool = False
+    
+    # Loglama (kuyruk üzerinden, arka plan iş parçacığında yazılır)
+    LOG_DIR: str = "logs"
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_QUEUE_POLICY: str = "drop"  # Kuyruk dolunca "drop": kaydı düşür, "block": kısa süre bekle
+    LOG_QUEUE_BLOCK_TIMEOUT: float = 0.1  # saniye
+    LOG_ROTATION: str = "size"  # "size" veya "time"
+    LOG_MAX_BYTES: int = 10 * 1024 * 1024
+    LOG_ROTATION_WHEN: str = "midnight"  # Zaman bazlı döndürme aralığı
+    LOG_BACKUP_COUNT: int = 5
+    
+    # Başlangıç Isınması
+    WARMUP_ENABLED: bool = True  # Ağır bileşenleri (NLTK, tiktoken, LIME işçileri) arka planda yükle
+    
+    # Yanıt Sıkıştırma (Accept-Encoding: br, gzip)
+    RESPONSE_COMPRESSION_ENABLED: bool = True
+    RESPONSE_COMPRESSION_MIN_SIZE: int = 1024  # bayt; daha küçük yanıtlar sıkıştırılmaz
+    RESPONSE_GZIP_LEVEL: int = 6
+    RESPONSE_BROTLI_QUALITY: int = 4  # brotli paketi kuruluysa
+    
+    # Prometheus Metrikleri
+    PROMETHEUS_ENABLED: bool = True  # İstek/aşama süreleri ve /metrics uç noktası
     
     # Performans Ayarları
     MAX_RESPONSE_TIME: int = 2  # saniye
     MAX_MEMORY_USAGE: int = 512  # MB
     
+    # Çok Epoch'lu Optimizasyon Döngüsü
+    OPTIMIZATION_EPOCHS: int = 1  # Varsayılan epoch sayısı (1: tek yeniden yazım)
+    OPTIMIZATION_CANDIDATES: int = 1  # Epoch başına eşzamanlı aday sayısı
+    OPTIMIZATION_MAX_EPOCHS: int = 10
+    OPTIMIZATION_MAX_CANDIDATES: int = 8
+    OPTIMIZATION_MIN_TEMPERATURE: float = 0.3  # Adaylar bu aralığa yayılan sıcaklıklarla üretilir
+    OPTIMIZATION_MAX_TEMPERATURE: float = 1.0
+    OPTIMIZATION_SIMILARITY_WEIGHT: float = 0.5  # Skor: ağırlık * benzerlik + (1 - ağırlık) * token azalması
+    OPTIMIZATION_MIN_SIMILARITY: float = 0.2  # Bu benzerliğin altındaki adaylar elenir
+    OPTIMIZATION_MIN_IMPROVEMENT: float = 0.01  # Daha küçük skor artışı ilerleme sayılmaz
+    OPTIMIZATION_PATIENCE: int = 1  # İlerlemesiz bu kadar epoch sonra durulur
+    OPTIMIZATION_TOKEN_BUDGET: int = 0  # Optimizasyon başına token bütçesi (0: sınırsız)
+    OPTIMIZATION_COST_BUDGET: float = 0.0  # Optimizasyon başına USD bütçesi (0: sınırsız)
+    
+    # Yerel Ön Sıkıştırma (LLM çağrısından önce)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_RULES: str = "whitespace,filler,duplicates"  # Sıralı; satır sonları korunur, kayıplı "stopwords" isteğe bağlı
+    COMPRESSION_TOKEN_BUDGET: int = 0  # Sıkıştırılmış metin bu bütçedeyse LLM atlanır (0: kapalı)
+    COMPRESSION_KEY_PHRASES: int = 5  # Korunması gereken anahtar ifade sayısı
+    
+    # Benzer Prompt İndeksi (MinHash/LSH)
+    DEDUP_ENABLED: bool = True
+    DEDUP_OFFER_THRESHOLD: float = 0.8  # Bu benzerliğin üzerindeki önceki optimizasyonlar önerilir
+    DEDUP_REUSE_THRESHOLD: float = 1.0  # Bu benzerliğin üzerinde LLM ve LIME atlanıp sonuç yeniden kullanılır
+    DEDUP_NUM_BANDS: int = 16
+    DEDUP_BAND_SIZE: int = 4
+    DEDUP_MAX_CANDIDATES: int = 50
+    DEDUP_MAX_SUGGESTIONS: int = 5
+    
+    # Metrik Özetleri
+    METRICS_ROLLUPS_ENABLED: bool = False  # Yazım anında günlük özet belgelerini güncelle
+    
+    # Görselleştirme Önbelleği
+    VISUALIZATION_CACHE_SIZE: int = 512
+    
+    # İş Kuyruğu Ayarları
+    JOB_WORKERS: int = 2
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_LEASE_SECONDS: int = 60  # İşçi bu sürede yenilemezse iş yeniden alınır
+    JOB_POLL_INTERVAL: float = 1.0  # saniye
+    
+    # Analiz Yürütücü Ayarları
+    ANALYSIS_EXECUTOR: str = "process"  # "process" veya "thread"
+    ANALYSIS_WORKERS: int = 2
+    ANALYSIS_QUEUE_SIZE: int = 16  # İşçilerin dışında bekleyebilecek görev sayısı
+    ANALYSIS_TIMEOUT: float = 30.0  # saniye
+    
     class Config:
         case_sensitive = True
 
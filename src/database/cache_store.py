@@ -0,0 +1,42 @@
+from typing import Any, Optional
+from datetime import datetime, timedelta
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from ..utils.logger import logger
+
+class MongoCacheStore:
+    """İşçiler arasında paylaşılan, TTL indeksli MongoDB önbellek katmanı"""
+
+    def __init__(self, collection: AsyncIOMotorCollection, ttl: int):
+        self.collection = collection
+        self.ttl = ttl
+
+    async def ensure_indexes(self) -> None:
+        """Süresi dolan kayıtlar için TTL indeksini oluştur"""
+        await self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Süresi dolmamış kaydı getir"""
+        try:
+            document = await self.collection.find_one(
+                {"_id": key, "expires_at": {"$gt": datetime.utcnow()}},
+                {"value": 1}
+            )
+            return document["value"] if document else None
+        except Exception as e:
+            logger.warning(f"Önbellek okuma hatası: {str(e)}")
+            return None
+
+    async def set(self, key: str, value: Any) -> None:
+        """Kaydı TTL ile yaz"""
+        try:
+            await self.collection.replace_one(
+                {"_id": key},
+                {
+                    "value": value,
+                    "expires_at": datetime.utcnow() + timedelta(seconds=self.ttl)
+                },
+                upsert=True
+            )
+        except Exception as e:
+            logger.warning(f"Önbellek yazma hatası: {str(e)}")
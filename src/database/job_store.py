@@ -0,0 +1,158 @@
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from bson import ObjectId
+
+# İşin geçebileceği aşamalar
+JOB_STAGES = ["llm", "lime", "persist"]
+
+class JobStore:
+    """Asenkron optimizasyon işlerinin MongoDB'deki durumu"""
+
+    def __init__(self, collection: AsyncIOMotorCollection):
+        self.jobs = collection
+
+    def _convert(self, document: Optional[Dict]) -> Optional[Dict]:
+        """ObjectId ve tarihleri API'ye uygun hale getir"""
+        if not document:
+            return None
+        document["job_id"] = str(document.pop("_id"))
+        for key, value in document.items():
+            if isinstance(value, datetime):
+                document[key] = value.isoformat()
+        for progress in document.get("progress", {}).values():
+            for key, value in progress.items():
+                if isinstance(value, datetime):
+                    progress[key] = value.isoformat()
+        return document
+
+    async def ensure_indexes(self) -> None:
+        """İş alma ve listeleme sorguları için indeksleri oluştur"""
+        await self.jobs.create_index([("status", ASCENDING), ("available_at", ASCENDING)])
+        await self.jobs.create_index([("status", ASCENDING), ("lease_expires_at", ASCENDING)])
+        await self.jobs.create_index([("created_at", DESCENDING)])
+
+    async def create(self, job_type: str, payload: Dict, max_attempts: int) -> Dict:
+        """Kuyruğa yeni bir iş ekle"""
+        now = datetime.utcnow()
+        document = {
+            "type": job_type,
+            "payload": payload,
+            "status": "queued",
+            "stage": None,
+            "progress": {},
+            "attempts": 0,
+            "max_attempts": max_attempts,
+            "lease_owner": None,
+            "lease_expires_at": None,
+            "available_at": now,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now
+        }
+        result = await self.jobs.insert_one(document)
+        document["_id"] = result.inserted_id
+        return self._convert(document)
+
+    async def claim(self, owner: str, lease_seconds: int) -> Optional[Dict]:
+        """Bekleyen ya da kira süresi dolmuş bir işi atomik olarak al"""
+        now = datetime.utcnow()
+        document = await self.jobs.find_one_and_update(
+            {"$or": [
+                {"status": "queued", "available_at": {"$lte": now}},
+                {"status": "running", "lease_expires_at": {"$lt": now}}
+            ]},
+            {
+                "$set": {
+                    "status": "running",
+                    "lease_owner": owner,
+                    "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("available_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+        if document:
+            document["_id"] = str(document["_id"])
+        return document
+
+    async def extend_lease(self, job_id: str, owner: str, lease_seconds: int) -> bool:
+        """İşçi hâlâ çalışıyorsa kirayı uzat"""
+        now = datetime.utcnow()
+        result = await self.jobs.update_one(
+            {"_id": ObjectId(job_id), "lease_owner": owner, "status": "running"},
+            {"$set": {"lease_expires_at": now + timedelta(seconds=lease_seconds), "updated_at": now}}
+        )
+        return result.modified_count > 0
+
+    async def set_stage(self, job_id: str, owner: str, stage: str) -> None:
+        """Aşama ilerlemesini kaydet; önceki aşamayı tamamlanmış işaretle"""
+        now = datetime.utcnow()
+        update = {
+            "stage": stage,
+            f"progress.{stage}": {"status": "running", "started_at": now},
+            "updated_at": now
+        }
+        index = JOB_STAGES.index(stage)
+        if index > 0:
+            previous = JOB_STAGES[index - 1]
+            update[f"progress.{previous}.status"] = "completed"
+            update[f"progress.{previous}.finished_at"] = now
+        await self.jobs.update_one(
+            {"_id": ObjectId(job_id), "lease_owner": owner},
+            {"$set": update}
+        )
+
+    async def complete(self, job_id: str, owner: str, result: Dict) -> None:
+        """İşi başarıyla tamamla"""
+        now = datetime.utcnow()
+        await self.jobs.update_one(
+            {"_id": ObjectId(job_id), "lease_owner": owner},
+            {"$set": {
+                "status": "completed",
+                "result": result,
+                "error": None,
+                "lease_owner": None,
+                "lease_expires_at": None,
+                f"progress.{JOB_STAGES[-1]}.status": "completed",
+                f"progress.{JOB_STAGES[-1]}.finished_at": now,
+                "updated_at": now
+            }}
+        )
+
+    async def fail(self, job_id: str, owner: str, error: str, retry_at: Optional[datetime] = None) -> None:
+        """İşi hata ile sonlandır ya da yeniden denemek üzere kuyruğa al"""
+        update = {
+            "error": error,
+            "lease_owner": None,
+            "lease_expires_at": None,
+            "updated_at": datetime.utcnow()
+        }
+        if retry_at is not None:
+            update.update({"status": "queued", "available_at": retry_at})
+        else:
+            update["status"] = "failed"
+        await self.jobs.update_one(
+            {"_id": ObjectId(job_id), "lease_owner": owner},
+            {"$set": update}
+        )
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        """İş durumunu getir"""
+        if not ObjectId.is_valid(job_id):
+            return None
+        document = await self.jobs.find_one(
+            {"_id": ObjectId(job_id)},
+            {"lease_owner": 0}
+        )
+        return self._convert(document)
+
+    async def list(self, status: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """İşleri en yeniden eskiye doğru listele"""
+        query = {"status": status} if status else {}
+        cursor = self.jobs.find(query, {"lease_owner": 0}).sort("created_at", DESCENDING).limit(limit)
+        return [self._convert(document) async for document in cursor]
@@ -0,0 +1,97 @@
+from typing import Dict, List, Optional
+from datetime import date, datetime
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ASCENDING
+
+# Özet metriklerin gruplanabileceği boyutlar
+SUMMARY_DIMENSIONS = ("model", "day", "status")
+
+# Her özet satırında toplanan sayaçlar
+SUMMARY_FIELDS = ("requests", "prompt_tokens", "completion_tokens", "total_tokens", "cost_usd")
+
+def summary_group_stages(group_by: List[str]) -> List[Dict]:
+    """(model, day, status, sayaçlar) satırlarını istenen boyutlara göre toplayan aşamalar"""
+    return [
+        {"$group": {
+            "_id": {dimension: f"${dimension}" for dimension in group_by},
+            **{field: {"$sum": f"${field}"} for field in SUMMARY_FIELDS}
+        }},
+        {"$sort": {f"_id.{dimension}": ASCENDING for dimension in group_by} or {"_id": ASCENDING}}
+    ]
+
+def merge_summary_rows(rows: List[Dict], group_by: List[str]) -> List[Dict]:
+    """Ayrı sorgulardan gelen gruplanmış satırları aynı grup anahtarında birleştir"""
+    merged: Dict[tuple, Dict] = {}
+    for row in rows:
+        group = row["_id"] or {}
+        key = tuple(group.get(dimension) for dimension in group_by)
+        if key not in merged:
+            merged[key] = {"_id": row["_id"], **{field: 0 for field in SUMMARY_FIELDS}}
+        for field in SUMMARY_FIELDS:
+            merged[key][field] += row[field]
+    return [merged[key] for key in sorted(merged, key=lambda key: tuple(str(value) for value in key))]
+
+def summarize_rows(rows: List[Dict]) -> Dict:
+    """Gruplanmış satırları ve genel toplamları API biçimine getir"""
+    items = [
+        {**(row["_id"] or {}), **{field: row[field] for field in SUMMARY_FIELDS}}
+        for row in rows
+    ]
+    return {
+        "items": items,
+        "totals": {field: sum(item[field] for item in items) for field in SUMMARY_FIELDS}
+    }
+
+class MetricsRollupStore:
+    """Yazım anında $inc ile güncellenen günlük (gün, model, durum) özetleri"""
+
+    def __init__(self, collection: AsyncIOMotorCollection):
+        self.rollups = collection
+
+    async def ensure_indexes(self) -> None:
+        """Gün aralığı sorguları için indeks oluştur"""
+        await self.rollups.create_index([("day", ASCENDING), ("model", ASCENDING)])
+
+    async def record(
+        self,
+        model: str,
+        status: str,
+        usage: Optional[Dict] = None,
+        at: Optional[datetime] = None
+    ) -> None:
+        """Tek bir isteğin kullanımını ilgili günlük özete ekle"""
+        usage = usage or {}
+        day = (at or datetime.utcnow()).date().isoformat()
+        await self.rollups.update_one(
+            {"_id": f"{day}|{model}|{status}"},
+            {
+                "$inc": {
+                    "requests": 1,
+                    "prompt_tokens": usage.get("prompt_tokens", 0),
+                    "completion_tokens": usage.get("completion_tokens", 0),
+                    "total_tokens": usage.get("total_tokens", 0),
+                    "cost_usd": usage.get("cost_usd", 0.0)
+                },
+                "$set": {"day": day, "model": model, "status": status, "updated_at": datetime.utcnow()}
+            },
+            upsert=True
+        )
+
+    async def summary(
+        self,
+        group_by: List[str],
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> Dict:
+        """Günlük özetleri istenen boyutlara göre topla (bitiş günü dahil)"""
+        day_range = {}
+        if start is not None:
+            day_range["$gte"] = start.isoformat()
+        if end is not None:
+            day_range["$lte"] = end.isoformat()
+            
+        cursor = self.rollups.aggregate([
+            {"$match": {"day": day_range} if day_range else {}},
+            *summary_group_stages(group_by)
+        ])
+        return summarize_rows(await cursor.to_list(length=None))
@@ -0,0 +1,145 @@
+from typing import Dict
+from datetime import datetime
+from pymongo import ReplaceOne, UpdateOne
+import argparse
+import asyncio
+
+from .mongodb import MongoDB
+from ..config.settings import get_settings
+from ..utils.similarity_index import MinHashLSH
+from ..utils.logger import logger
+
+def _created_at(response: Dict) -> datetime:
+    """Yanıt zaman damgasını datetime'a çevir"""
+    try:
+        return datetime.fromisoformat(response["timestamp"])
+    except (KeyError, TypeError, ValueError):
+        return datetime.utcnow()
+
+async def migrate_iterations(db: MongoDB, batch_size: int = 100) -> Dict:
+    """Gömülü model_responses dizilerini iterations koleksiyonuna taşı
+
+    İşlem tekrar çalıştırılabilir: iterasyonlar (prompt_id, iteration)
+    anahtarıyla upsert edilir, model_responses alanı ancak yanıtlar
+    yazıldıktan sonra kaldırılır. Eski kayıtlarda eşzamanlı yazımlardan
+    kalan çakışan numaralar olabileceği için iterasyonlar dizideki sıraya
+    göre yeniden numaralandırılır.
+    """
+    await db.ensure_indexes()
+    prompts = 0
+    iterations = 0
+    
+    cursor = db.prompts.find({"model_responses": {"$exists": True}}, batch_size=batch_size)
+    async for prompt in cursor:
+        responses = [
+            {**response, "iteration": index}
+            for index, response in enumerate(prompt.get("model_responses") or [], start=1)
+        ]
+        for response in responses:
+            (response.get("lime_analysis") or {}).pop("visualizations", None)
+            
+        if responses:
+            await db.iterations.bulk_write([
+                ReplaceOne(
+                    {"prompt_id": prompt["_id"], "iteration": response["iteration"]},
+                    {"prompt_id": prompt["_id"], "created_at": _created_at(response), **response},
+                    upsert=True
+                )
+                for response in responses
+            ], ordered=False)
+            
+        await db.prompts.update_one(
+            {"_id": prompt["_id"]},
+            {
+                "$set": {
+                    **db._summarize_responses(responses),
+                    "model_name": prompt.get("model_name") or (
+                        responses[0].get("model_name", "gpt-3.5-turbo") if responses else None
+                    ),
+                    "latest_response": responses[-1] if responses else None
+                },
+                "$unset": {"model_responses": "", "lime_analysis.visualizations": ""}
+            }
+        )
+        prompts += 1
+        iterations += len(responses)
+        
+    logger.info("İterasyon taşıma tamamlandı", extra={"prompts": prompts, "iterations": iterations})
+    return {"prompts": prompts, "iterations": iterations}
+
+async def backfill_prompt_fields(db: MongoDB) -> int:
+    """Gömülü modda eski kayıtlara listeleme için gereken model_name ve sayaç alanlarını ekle"""
+    responses = {"$ifNull": ["$model_responses", []]}
+    result = await db.prompts.update_many(
+        {"$or": [{"model_name": {"$exists": False}}, {"total_cost_usd": {"$exists": False}}]},
+        [{"$set": {
+            "model_name": {"$ifNull": [
+                "$model_name",
+                {"$ifNull": [{"$arrayElemAt": ["$model_responses.model_name", 0]}, "gpt-3.5-turbo"]}
+            ]},
+            "iterations": {"$ifNull": ["$iterations", {"$size": responses}]},
+            "total_tokens": {"$ifNull": ["$total_tokens", {"$sum": "$model_responses.total_tokens"}]},
+            "total_cost_usd": {"$ifNull": ["$total_cost_usd", {"$sum": "$model_responses.cost_usd"}]}
+        }}]
+    )
+    logger.info("Prompt alanları tamamlandı", extra={"prompts": result.modified_count})
+    return result.modified_count
+
+async def backfill_similarity_bands(db: MongoDB, batch_size: int = 100) -> int:
+    """Bant anahtarı olmayan kayıtlar için benzerlik indeksini oluştur"""
+    settings = get_settings()
+    index = MinHashLSH(num_bands=settings.DEDUP_NUM_BANDS, band_size=settings.DEDUP_BAND_SIZE)
+    cursor = db.prompts.find({"lsh_bands": {"$exists": False}}, {"original_prompt": 1})
+    
+    updated = 0
+    operations = []
+    async for document in cursor:
+        operations.append(UpdateOne(
+            {"_id": document["_id"]},
+            {"$set": {"lsh_bands": index.band_keys(document.get("original_prompt", ""))}}
+        ))
+        if len(operations) >= batch_size:
+            await db.prompts.bulk_write(operations, ordered=False)
+            updated += len(operations)
+            operations = []
+    if operations:
+        await db.prompts.bulk_write(operations, ordered=False)
+        updated += len(operations)
+        
+    logger.info("Benzerlik bantları oluşturuldu", extra={"prompts": updated})
+    return updated
+
+async def _main(batch_size: int, backfill: bool, similarity_bands: bool) -> None:
+    db = MongoDB()
+    try:
+        if similarity_bands:
+            count = await backfill_similarity_bands(db, batch_size)
+            print(f"{count} prompt için benzerlik bantları oluşturuldu")
+            return
+        if backfill:
+            count = await backfill_prompt_fields(db)
+            print(f"{count} prompt güncellendi")
+            return
+        result = await migrate_iterations(db, batch_size)
+        print(f"{result['prompts']} prompt, {result['iterations']} iterasyon taşındı")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="model_responses dizilerini iterations koleksiyonuna taşır. "
+                    "Tamamlandıktan sonra ITERATIONS_STORAGE=collection ayarlanmalıdır."
+    )
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument(
+        "--backfill",
+        action="store_true",
+        help="Taşımadan yalnızca eski kayıtlara model_name ve sayaç alanlarını ekle (gömülü mod)"
+    )
+    parser.add_argument(
+        "--similarity-bands",
+        action="store_true",
+        help="Taşımadan yalnızca eski kayıtlara yakın kopya araması için LSH bantlarını ekle"
+    )
+    args = parser.parse_args()
+    asyncio.run(_main(args.batch_size, args.backfill, args.similarity_bands))
@@ -1,16 +1,82 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, TEXT, ReturnDocument, UpdateOne
 from bson import ObjectId
+from datetime import date, datetime, time, timedelta
+import asyncio
 import os
 from dotenv import load_dotenv
 
+from ..config.settings import get_settings
+from .metrics_store import merge_summary_rows, summarize_rows, summary_group_stages
+
 load_dotenv()
 
+# Optimizasyon sonucu döndürülürken eski kayıtlarda gömülü kalan Plotly figürleri atlanır
+OPTIMIZE_RESULT_PROJECTION = {
+    "lime_analysis.visualizations": 0,
+    "model_responses.lime_analysis.visualizations": 0
+}
+
+# Listelemede varsayılan olarak gönderilmeyen büyük alanlar
+PROMPT_LIST_HEAVY_FIELDS = ("model_responses", "lime_analysis", "latest_response", "lsh_bands", "failed_attempts")
+
+# Prompt başına saklanan son başarısız optimizasyon denemesi sayısı
+FAILED_ATTEMPTS_LIMIT = 50
+
 class MongoDB:
-    def __init__(self):
-        self.client = AsyncIOMotorClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017"))
-        self.db = self.client.prompt_optimizer
+    def __init__(self, client: Optional[AsyncIOMotorClient] = None):
+        settings = get_settings()
+        if client is None:
+            client = self._create_client()
+        if settings.ITERATIONS_STORAGE not in ("embedded", "collection"):
+            raise ValueError(f"Geçersiz iterasyon depolama modu: {settings.ITERATIONS_STORAGE}")
+        self.client = client
+        self.db = self.client[settings.DATABASE_NAME]
         self.prompts = self.db.prompts
+        self.iterations = self.db.iterations
+        self.split_iterations = settings.ITERATIONS_STORAGE == "collection"
+        # mongomock güncelleme hatlarındaki $mergeObjects/$concatArrays ifadelerini desteklemez
+        # (mongomock-motor istemcisi kendini AsyncIOMotorClient gibi gösterir; MRO'da görünür)
+        self.update_pipelines = not any(cls.__module__.startswith("mongomock") for cls in type(client).__mro__)
+
+    @staticmethod
+    def _create_client() -> AsyncIOMotorClient:
+        """MONGODB_BACKEND ayarına göre istemci oluştur"""
+        settings = get_settings()
+        if settings.MONGODB_BACKEND == "memory":
+            # Süreç içi sahte Mongo; veriler kalıcı değildir, yalnızca yük testi ve yerel geliştirme için
+            from mongomock_motor import AsyncMongoMockClient
+            return AsyncMongoMockClient()
+        if settings.MONGODB_BACKEND != "motor":
+            raise ValueError(f"Geçersiz MongoDB arka ucu: {settings.MONGODB_BACKEND}")
+        return AsyncIOMotorClient(
+            os.getenv("MONGODB_URI", "mongodb://localhost:27017"),
+            maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+            minPoolSize=settings.MONGODB_MIN_POOL_SIZE
+        )
+
+    def close(self) -> None:
+        """Bağlantı havuzunu kapat"""
+        self.client.close()
+
+    async def ensure_indexes(self) -> None:
+        """iterations koleksiyonu indekslerini oluştur"""
+        await self.iterations.create_index(
+            [("prompt_id", ASCENDING), ("iteration", ASCENDING)],
+            unique=True
+        )
+        await self.iterations.create_index("created_at")
+        await self.prompts.create_index("model_responses.timestamp")
+        
+        # Listeleme: her filtre için (alan, created_at, _id) anahtar kümesi sıralaması
+        listing_order = [("created_at", DESCENDING), ("_id", DESCENDING)]
+        await self.prompts.create_index(listing_order)
+        await self.prompts.create_index([("status", ASCENDING), *listing_order])
+        await self.prompts.create_index([("model_name", ASCENDING), *listing_order])
+        await self.prompts.create_index([("total_cost_usd", ASCENDING)])
+        await self.prompts.create_index([("original_prompt", TEXT)], default_language="none")
+        await self.prompts.create_index("lsh_bands")
 
     def _convert_objectid(self, document: Dict) -> Dict:
         """ObjectId'yi string'e dönüştür"""
@@ -18,16 +84,60 @@ class MongoDB:
             document["_id"] = str(document["_id"])
         return document
 
+    def _convert_prompt(self, document: Dict) -> Dict:
+        """Prompt belgesini depolama modundan bağımsız API biçimine getir
+
+        Ayrık modda model_responses yalnızca son iterasyonu içerir; tüm geçmiş
+        sayfalı olarak list_iterations ile okunur.
+        """
+        if "model_responses" not in document:
+            latest = document.pop("latest_response", None)
+            document["model_responses"] = [latest] if latest else []
+        document.setdefault("iterations", len(document["model_responses"]))
+        return self._convert_objectid(document)
+
+    @staticmethod
+    def _summarize_responses(responses: List[Dict]) -> Dict:
+        """Yanıt listesi için sayaç alanları"""
+        return {
+            "iterations": len(responses),
+            "total_tokens": sum(response.get("total_tokens", 0) for response in responses),
+            "total_cost_usd": sum(response.get("cost_usd", 0.0) for response in responses)
+        }
+
+    @staticmethod
+    def _iteration_document(prompt_id: ObjectId, response_data: Dict) -> Dict:
+        """iterations koleksiyonuna yazılacak belge"""
+        return {"prompt_id": prompt_id, "created_at": datetime.utcnow(), **response_data}
+
+    def _split_prompt(self, prompt_data: Dict) -> Tuple[Dict, List[Dict]]:
+        """Prompt belgesini ve (ayrık modda) iterasyon belgelerini hazırla"""
+        responses = prompt_data.get("model_responses", [])
+        document = {**prompt_data, **self._summarize_responses(responses)}
+        if not self.split_iterations:
+            return document, []
+
+        document.pop("model_responses", None)
+        document["latest_response"] = responses[-1] if responses else None
+        document.setdefault("_id", ObjectId())
+        return document, [
+            self._iteration_document(document["_id"], response)
+            for response in responses
+        ]
+
     async def create_prompt(self, prompt_data: Dict) -> str:
         """Yeni bir prompt kaydı oluştur"""
-        result = await self.prompts.insert_one(prompt_data)
+        document, iterations = self._split_prompt(prompt_data)
+        result = await self.prompts.insert_one(document)
+        if iterations:
+            await self.iterations.insert_many(iterations)
         return str(result.inserted_id)
 
     async def get_prompt(self, prompt_id: str) -> Optional[Dict]:
         """Prompt ID'ye göre kayıt getir"""
         try:
             result = await self.prompts.find_one({"_id": ObjectId(prompt_id)})
-            return self._convert_objectid(result) if result else None
+            return self._convert_prompt(result) if result else None
         except:
             return None
 
@@ -44,34 +154,477 @@ class MongoDB:
 
     async def add_model_response(self, prompt_id: str, response_data: Dict) -> bool:
         """Prompt kaydına yeni bir model yanıtı ekle"""
-        try:
-            result = await self.prompts.update_one(
+        return await self.append_model_response(prompt_id, response_data, {}) is not None
+
+    def _append_response_pipeline(self, response_data: Dict, update_data: Dict) -> List[Dict]:
+        """Yanıtı iterasyon numarasını sunucuda hesaplayarak ekleyen güncelleme hattı
+
+        Sayaç alanları henüz olmayan eski kayıtlarda değerler gömülü
+        yanıtlardan türetilir.
+        """
+        responses = {"$ifNull": ["$model_responses", []]}
+        iteration = {"$add": [{"$ifNull": ["$iterations", {"$size": responses}]}, 1]}
+        response = {"$mergeObjects": [{"$literal": response_data}, {"iteration": iteration}]}
+        fields = {
+            **{field: {"$literal": value} for field, value in update_data.items()},
+            "iterations": iteration,
+            "total_tokens": {"$add": [
+                {"$ifNull": ["$total_tokens", {"$sum": "$model_responses.total_tokens"}]},
+                response_data.get("total_tokens", 0)
+            ]},
+            "total_cost_usd": {"$add": [
+                {"$ifNull": ["$total_cost_usd", {"$sum": "$model_responses.cost_usd"}]},
+                response_data.get("cost_usd", 0.0)
+            ]}
+        }
+        if self.split_iterations:
+            fields["latest_response"] = response
+        else:
+            fields["model_responses"] = {"$concatArrays": [responses, [response]]}
+        return [{"$set": fields}]
+
+    def _append_response_update(self, document: Dict, response_data: Dict, update_data: Dict) -> Dict:
+        """_append_response_pipeline'ın okunan belge üzerinden Python eşdeğeri"""
+        responses = document.get("model_responses") or []
+        # Sayaç alanı olmayan eski kayıtlarda değer gömülü yanıtlardan türetilir
+        summary = self._summarize_responses(responses)
+        current = {
+            field: document[field] if document.get(field) is not None else summary[field]
+            for field in summary
+        }
+        iteration = current["iterations"] + 1
+        response = {**response_data, "iteration": iteration}
+        fields = {
+            **update_data,
+            "iterations": iteration,
+            "total_tokens": current["total_tokens"] + response_data.get("total_tokens", 0),
+            "total_cost_usd": current["total_cost_usd"] + response_data.get("cost_usd", 0.0)
+        }
+        if self.split_iterations:
+            fields["latest_response"] = response
+        else:
+            fields["model_responses"] = [*responses, response]
+        return {"$set": fields}
+
+    async def _apply_response(
+        self,
+        prompt_id: str,
+        response_data: Dict,
+        update_data: Dict
+    ) -> Optional[Dict]:
+        """Prompt belgesini tek atomik işlemde güncelle ve güncel halini döndür"""
+        if not ObjectId.is_valid(prompt_id):
+            return None
+        if not self.update_pipelines:
+            return await self._apply_response_read_modify_write(ObjectId(prompt_id), response_data, update_data)
+        return await self.prompts.find_one_and_update(
+            {"_id": ObjectId(prompt_id)},
+            self._append_response_pipeline(response_data, update_data),
+            projection=OPTIMIZE_RESULT_PROJECTION,
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _apply_response_read_modify_write(
+        self,
+        object_id: ObjectId,
+        response_data: Dict,
+        update_data: Dict
+    ) -> Optional[Dict]:
+        """Güncelleme hattı desteklenmediğinde (bellek içi arka uç) iyimser kilitle ekle
+
+        Belge okunur, yeni alanlar Python'da hesaplanır ve yalnızca iterasyon
+        sayacı değişmediyse yazılır; araya başka bir ekleme girdiyse yeniden denenir.
+        """
+        while True:
+            document = await self.prompts.find_one({"_id": object_id})
+            if document is None:
+                return None
+            result = await self.prompts.find_one_and_update(
+                {"_id": object_id, "iterations": document.get("iterations")},
+                self._append_response_update(document, response_data, update_data),
+                projection=OPTIMIZE_RESULT_PROJECTION,
+                return_document=ReturnDocument.AFTER
+            )
+            if result is not None:
+                return result
+
+    async def append_model_response(
+        self,
+        prompt_id: str,
+        response_data: Dict,
+        update_data: Dict
+    ) -> Optional[Dict]:
+        """Yanıtı ekle ve alanları güncelle; güncel kaydı yeniden okumadan döndür
+
+        İterasyon numarası sunucuda mevcut sayaçtan hesaplanır, bu yüzden
+        eşzamanlı optimizasyonlar aynı numarayı alamaz. Ayrık modda yanıt,
+        alınan numarayla iterations koleksiyonuna ayrıca yazılır.
+        """
+        result = await self._apply_response(prompt_id, response_data, update_data)
+        if result is None:
+            return None
+        if self.split_iterations:
+            await self.iterations.insert_one(self._iteration_document(
+                result["_id"],
+                {**response_data, "iteration": result["iterations"]}
+            ))
+        return self._convert_prompt(result)
+
+    async def get_analysis(self, prompt_id: str, iteration: Optional[int] = None) -> Optional[Dict]:
+        """Bir iterasyonun (varsayılan: en son analiz edilen) LIME analizini ve metinlerini getir"""
+        if not ObjectId.is_valid(prompt_id):
+            return None
+        if self.split_iterations:
+            query = {"prompt_id": ObjectId(prompt_id)}
+            if iteration is None:
+                query["lime_analysis"] = {"$ne": None}
+            else:
+                query["iteration"] = iteration
+            document = await self.iterations.find_one(
+                query,
+                {"_id": 0, "iteration": 1, "prompt_text": 1, "optimized_text": 1, "lime_analysis": 1, "lime_fingerprint": 1},
+                sort=[("iteration", DESCENDING)]
+            )
+            if not document or not document.get("lime_analysis"):
+                return None
+            return document
+
+        if iteration is None:
+            condition = {"$ne": [{"$ifNull": ["$$response.lime_analysis", None]}, None]}
+        else:
+            condition = {"$eq": ["$$response.iteration", iteration]}
+            
+        cursor = self.prompts.aggregate([
+            {"$match": {"_id": ObjectId(prompt_id)}},
+            {"$project": {
+                "_id": 0,
+                "response": {"$arrayElemAt": [
+                    {"$filter": {
+                        "input": {"$ifNull": ["$model_responses", []]},
+                        "as": "response",
+                        "cond": condition
+                    }},
+                    -1
+                ]}
+            }},
+            {"$project": {
+                "iteration": "$response.iteration",
+                "prompt_text": "$response.prompt_text",
+                "optimized_text": "$response.optimized_text",
+                "lime_analysis": "$response.lime_analysis",
+                "lime_fingerprint": "$response.lime_fingerprint"
+            }}
+        ])
+        documents = await cursor.to_list(length=1)
+        if not documents or not documents[0].get("lime_analysis"):
+            return None
+        return documents[0]
+
+    async def list_iterations(
+        self,
+        prompt_id: str,
+        after: Optional[int] = None,
+        limit: int = 20
+    ) -> Optional[Tuple[List[Dict], Optional[int]]]:
+        """İterasyonları numara sırasıyla sayfalı getir; (sayfa, sonraki imleç) döndür"""
+        if not ObjectId.is_valid(prompt_id):
+            return None
+        object_id = ObjectId(prompt_id)
+        after = after or 0
+        
+        if self.split_iterations:
+            if not await self.prompts.count_documents({"_id": object_id}, limit=1):
+                return None
+            cursor = self.iterations.find(
+                {"prompt_id": object_id, "iteration": {"$gt": after}},
+                {"_id": 0, "prompt_id": 0, "created_at": 0, "lime_analysis.visualizations": 0}
+            ).sort("iteration", ASCENDING).limit(limit + 1)
+            items = await cursor.to_list(length=limit + 1)
+        else:
+            cursor = self.prompts.aggregate([
+                {"$match": {"_id": object_id}},
+                {"$project": {
+                    "_id": 0,
+                    "responses": {"$filter": {
+                        "input": {"$ifNull": ["$model_responses", []]},
+                        "as": "response",
+                        "cond": {"$gt": ["$$response.iteration", after]}
+                    }}
+                }}
+            ])
+            documents = await cursor.to_list(length=1)
+            if not documents:
+                return None
+            items = documents[0]["responses"][:limit + 1]
+            for item in items:
+                (item.get("lime_analysis") or {}).pop("visualizations", None)
+                
+        # Bir fazla okunan kayıt sonraki sayfanın varlığını gösterir
+        next_cursor = items[limit - 1]["iteration"] if len(items) > limit else None
+        return items[:limit], next_cursor
+
+    async def list_prompts(
+        self,
+        status: Optional[str] = None,
+        model_name: Optional[str] = None,
+        min_cost: Optional[float] = None,
+        max_cost: Optional[float] = None,
+        search: Optional[str] = None,
+        after: Optional[Tuple[str, str]] = None,
+        limit: int = 20,
+        include_details: bool = False
+    ) -> Tuple[List[Dict], Optional[Tuple[str, str]]]:
+        """Promptları created_at/_id anahtar kümesiyle, yeniden eskiye sayfalı listele
+
+        after, önceki sayfanın son kaydının (created_at, _id) çiftidir.
+        """
+        conditions = []
+        if status is not None:
+            conditions.append({"status": status})
+        if model_name is not None:
+            conditions.append({"model_name": model_name})
+        cost = {}
+        if min_cost is not None:
+            cost["$gte"] = min_cost
+        if max_cost is not None:
+            cost["$lte"] = max_cost
+        if cost:
+            conditions.append({"total_cost_usd": cost})
+        if search:
+            conditions.append({"$text": {"$search": search}})
+        if after is not None:
+            created_at, last_id = after
+            conditions.append({"$or": [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "_id": {"$lt": ObjectId(last_id)}}
+            ]})
+            
+        if include_details:
+            projection = {"lime_analysis.visualizations": 0, "model_responses.lime_analysis.visualizations": 0}
+        else:
+            projection = {field: 0 for field in PROMPT_LIST_HEAVY_FIELDS}
+            
+        cursor = self.prompts.find(
+            {"$and": conditions} if conditions else {},
+            projection
+        ).sort([("created_at", DESCENDING), ("_id", DESCENDING)]).limit(limit + 1)
+        documents = await cursor.to_list(length=limit + 1)
+        
+        # Bir fazla okunan kayıt sonraki sayfanın varlığını gösterir
+        next_after = None
+        if len(documents) > limit:
+            last = documents[limit - 1]
+            next_after = (last["created_at"], str(last["_id"]))
+        items = [
+            self._convert_prompt(document) if include_details else self._convert_objectid(document)
+            for document in documents[:limit]
+        ]
+        return items, next_after
+
+    async def find_similar_candidates(
+        self,
+        band_keys: List[str],
+        exclude_id: Optional[str] = None,
+        limit: int = 50
+    ) -> List[Dict]:
+        """LSH bant anahtarlarından en az birini paylaşan optimize edilmiş promptları getir"""
+        query = {"lsh_bands": {"$in": band_keys}, "optimized_prompt": {"$exists": True}}
+        if exclude_id is not None and ObjectId.is_valid(exclude_id):
+            query["_id"] = {"$ne": ObjectId(exclude_id)}
+        cursor = self.prompts.find(query, {
+            "original_prompt": 1,
+            "optimized_prompt": 1,
+            "lime_analysis": 1,
+            "lsh_bands": 1
+        }).limit(limit)
+        candidates = await cursor.to_list(length=limit)
+        
+        # Daha çok bant paylaşan aday daha benzerdir
+        keys = set(band_keys)
+        candidates.sort(key=lambda document: -len(keys.intersection(document.get("lsh_bands", []))))
+        return [self._convert_objectid(document) for document in candidates]
+
+    async def set_similarity_bands(self, prompt_id: str, band_keys: List[str]) -> None:
+        """Prompt belgesinin LSH bant anahtarlarını güncelle"""
+        await self.prompts.update_one({"_id": ObjectId(prompt_id)}, {"$set": {"lsh_bands": band_keys}})
+
+    async def get_prompts_for_optimization(self, prompt_ids: List[str]) -> Dict[str, Dict]:
+        """Toplu optimizasyon için promptları yalnızca gereken alanlarla getir"""
+        object_ids = [ObjectId(prompt_id) for prompt_id in prompt_ids if ObjectId.is_valid(prompt_id)]
+        cursor = self.prompts.aggregate([
+            {"$match": {"_id": {"$in": object_ids}}},
+            {"$project": {
+                "original_prompt": 1,
+                "iterations": {"$ifNull": [
+                    "$iterations",
+                    {"$size": {"$ifNull": ["$model_responses", []]}}
+                ]}
+            }}
+        ])
+        return {str(document["_id"]): document async for document in cursor}
+
+    async def create_prompts(self, documents: List[Dict]) -> int:
+        """Birden fazla prompt kaydını tek seferde ekle"""
+        if not documents:
+            return 0
+        prompts, iterations = [], []
+        for document in documents:
+            prompt, prompt_iterations = self._split_prompt(document)
+            prompts.append(prompt)
+            iterations.extend(prompt_iterations)
+        result = await self.prompts.insert_many(prompts, ordered=False)
+        if iterations:
+            await self.iterations.insert_many(iterations, ordered=False)
+        return len(result.inserted_ids)
+
+    async def bulk_add_model_responses(self, updates: List[Tuple[str, Dict, Dict]]) -> int:
+        """(prompt_id, yanıt, güncellenecek alanlar) listesini toplu uygula"""
+        if not updates:
+            return 0
+        if not self.update_pipelines and not self.split_iterations:
+            results = await asyncio.gather(*[
+                self._apply_response(prompt_id, response_data, update_data)
+                for prompt_id, response_data, update_data in updates
+            ])
+            return sum(1 for result in results if result is not None)
+        if self.split_iterations:
+            # Her prompt kendi iterasyon numarasını atomik olarak alır, yanıtlar tek seferde yazılır
+            results = await asyncio.gather(*[
+                self._apply_response(prompt_id, response_data, update_data)
+                for prompt_id, response_data, update_data in updates
+            ])
+            iterations = [
+                self._iteration_document(result["_id"], {**response_data, "iteration": result["iterations"]})
+                for result, (_, response_data, _) in zip(results, updates)
+                if result is not None
+            ]
+            if iterations:
+                await self.iterations.insert_many(iterations, ordered=False)
+            return len(iterations)
+            
+        operations = [
+            UpdateOne(
                 {"_id": ObjectId(prompt_id)},
-                {"$push": {"model_responses": response_data}}
+                self._append_response_pipeline(response_data, update_data)
             )
-            return result.modified_count > 0
-        except:
-            return False
+            for prompt_id, response_data, update_data in updates
+        ]
+        result = await self.prompts.bulk_write(operations, ordered=False)
+        return result.modified_count
 
     async def get_prompt_metrics(self, prompt_id: str) -> Dict:
-        """Prompt için metrik ve istatistikleri getir"""
-        prompt = await self.get_prompt(prompt_id)
-        if not prompt:
+        """Prompt için metrik ve istatistikleri sayaç alanlarından getir"""
+        if not ObjectId.is_valid(prompt_id):
             return {}
-
-        total_tokens = 0
-        total_cost = 0
-        iterations = len(prompt.get("model_responses", []))
-
-        for response in prompt.get("model_responses", []):
-            total_tokens += response.get("total_tokens", 0)
-            total_cost += response.get("cost_usd", 0)
+        # Sayaç alanları olmayan eski kayıtlarda değerler sunucuda gömülü yanıtlardan türetilir
+        cursor = self.prompts.aggregate([
+            {"$match": {"_id": ObjectId(prompt_id)}},
+            {"$project": {
+                "original_prompt": 1,
+                "optimized_prompt": 1,
+                "iterations": {"$ifNull": [
+                    "$iterations",
+                    {"$size": {"$ifNull": ["$model_responses", []]}}
+                ]},
+                "total_tokens": {"$ifNull": ["$total_tokens", {"$sum": "$model_responses.total_tokens"}]},
+                "total_cost_usd": {"$ifNull": ["$total_cost_usd", {"$sum": "$model_responses.cost_usd"}]}
+            }}
+        ])
+        documents = await cursor.to_list(length=1)
+        if not documents:
+            return {}
+        prompt = documents[0]
 
         return {
             "prompt_id": str(prompt["_id"]),
-            "total_tokens": total_tokens,
-            "total_cost_usd": total_cost,
-            "iterations": iterations,
+            "total_tokens": prompt["total_tokens"],
+            "total_cost_usd": prompt["total_cost_usd"],
+            "iterations": prompt["iterations"],
             "original_prompt_length": len(prompt.get("original_prompt", "").split()),
             "optimized_prompt_length": len(prompt.get("optimized_prompt", "").split()) if prompt.get("optimized_prompt") else None
-        } 
\ No newline at end of file
+        }
+
+    async def record_failed_attempt(self, prompt_id: str, attempt: Dict) -> bool:
+        """Başarısız optimizasyon denemesini prompt kaydına ekle (canlı özet için)
+
+        Başarısız denemeler yanıt/iterasyon üretmez; sayaçları etkilememeleri
+        için ayrı, sınırlı bir listede tutulur.
+        """
+        if not ObjectId.is_valid(prompt_id):
+            return False
+        result = await self.prompts.update_one(
+            {"_id": ObjectId(prompt_id)},
+            {"$push": {"failed_attempts": {"$each": [attempt], "$slice": -FAILED_ATTEMPTS_LIMIT}}}
+        )
+        return result.modified_count > 0
+
+    async def get_metrics_summary(
+        self,
+        group_by: List[str],
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> Dict:
+        """Tüm yanıtlardan ve başarısız denemelerden model, gün ve durum bazında kullanım özeti (bitiş günü dahil)
+
+        Durum yanıt/iterasyon kaydındaki `status` alanıdır (eski kayıtlarda
+        completed); başarısız denemeler `failed_attempts` listesinden eklenir.
+        """
+        fields = {
+            "_id": 0,
+            "requests": {"$literal": 1},
+            "status": {"$ifNull": ["$status", "completed"]},
+            "prompt_tokens": {"$ifNull": ["$prompt_tokens", 0]},
+            "completion_tokens": {"$ifNull": ["$completion_tokens", 0]},
+            "total_tokens": {"$ifNull": ["$total_tokens", 0]},
+            "cost_usd": {"$ifNull": ["$cost_usd", 0]},
+            "model": {"$ifNull": ["$model_name", "gpt-3.5-turbo"]}
+        }
+        lower = datetime.combine(start, time.min) if start is not None else None
+        upper = datetime.combine(end + timedelta(days=1), time.min) if end is not None else None
+        # ISO zaman damgaları sözlük sırasıyla karşılaştırılabilir
+        timestamp = {}
+        if lower is not None:
+            timestamp["$gte"] = lower.isoformat()
+        if upper is not None:
+            timestamp["$lt"] = upper.isoformat()
+        
+        if self.split_iterations:
+            created_at = {}
+            if lower is not None:
+                created_at["$gte"] = lower
+            if upper is not None:
+                created_at["$lt"] = upper
+            collection = self.iterations
+            stages = [
+                {"$match": {"created_at": created_at} if created_at else {}},
+                {"$project": {
+                    **fields,
+                    "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}}
+                }}
+            ]
+        else:
+            match = {"model_responses.timestamp": timestamp} if timestamp else {}
+            collection = self.prompts
+            stages = [
+                # İlk eşleşme indeksle aday promptları, ikincisi yanıtları süzer
+                {"$match": match},
+                {"$unwind": "$model_responses"},
+                {"$match": match},
+                {"$replaceRoot": {"newRoot": "$model_responses"}},
+                {"$project": {**fields, "day": {"$substr": ["$timestamp", 0, 10]}}}
+            ]
+            
+        cursor = collection.aggregate([*stages, *summary_group_stages(group_by)])
+        rows = await cursor.to_list(length=None)
+        
+        failed_match = {"failed_attempts.timestamp": timestamp} if timestamp else {}
+        cursor = self.prompts.aggregate([
+            {"$match": {"failed_attempts.0": {"$exists": True}, **failed_match}},
+            {"$unwind": "$failed_attempts"},
+            {"$match": failed_match},
+            {"$replaceRoot": {"newRoot": "$failed_attempts"}},
+            {"$project": {**fields, "day": {"$substr": ["$timestamp", 0, 10]}}},
+            *summary_group_stages(group_by)
+        ])
+        failures = await cursor.to_list(length=None)
+        return summarize_rows(merge_summary_rows(rows + failures, group_by) if failures else rows)
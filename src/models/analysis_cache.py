@@ -0,0 +1,74 @@
+from typing import Dict, Optional
+import hashlib
+import json
+import unicodedata
+
+from ..database.cache_store import MongoCacheStore
+from ..utils.cache import LRUCache
+
+class AnalysisCache:
+    """(orijinal, optimize, LIME ayarları) içerik adresli analiz önbelleği
+
+    Analizler sabit tohumla üretildiği için aynı metin çifti ve aynı ayarlar
+    aynı sonucu verir. Önce süreç içi LRU katmanına, ardından varsa
+    paylaşımlı MongoDB katmanına bakılır.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 512,
+        ttl: int = 604800,
+        store: Optional[MongoCacheStore] = None
+    ):
+        self.memory = LRUCache(max_size=max_size, ttl=ttl)
+        self.store = store
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(original_prompt: str, optimized_prompt: str, fingerprint: str) -> str:
+        """Metin çifti ve ayar parmak izinin özetini oluştur"""
+        payload = json.dumps(
+            {
+                "original": unicodedata.normalize("NFC", original_prompt),
+                "optimized": unicodedata.normalize("NFC", optimized_prompt),
+                "settings": fingerprint
+            },
+            ensure_ascii=False,
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict]:
+        """Önbellekteki analizi getir"""
+        analysis = self.memory.get(key)
+        if analysis is None and self.store is not None:
+            analysis = await self.store.get(key)
+            if analysis is not None:
+                self.shared_hits += 1
+                self.memory.set(key, analysis)
+
+        if analysis is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return analysis
+
+    async def set(self, key: str, analysis: Dict) -> None:
+        """Analizi tüm katmanlara yaz"""
+        self.memory.set(key, analysis)
+        if self.store is not None:
+            await self.store.set(key, analysis)
+
+    def stats(self) -> Dict:
+        """İsabet/ıskalama sayaçları"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self.memory)
+        }
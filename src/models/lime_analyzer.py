@@ -1,13 +1,22 @@
 from typing import Dict, List, Tuple
+import time
 import numpy as np
-from lime.lime_text import LimeTextExplainer
+from scipy import sparse
+import sklearn.metrics
+from lime.lime_text import LimeTextExplainer, IndexedString, TextDomainMapper
+from lime import explanation
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
-import plotly.graph_objects as go
-import plotly.express as px
+from .batch_scorer import BatchScorer
+from .occlusion_explainer import OcclusionExplainer
 from ..utils.text_processing import tokenize_text, preprocess_text
+from ..utils.visualization import build_all_figures
 from ..config.lime_config import get_lime_settings
+from ..config.settings import get_settings
+
+# class_names içinde 'optimized' sınıfının indeksi
+OPTIMIZED_LABEL = 1
 
 class LIMEAnalyzer:
     def __init__(self):
@@ -17,6 +26,7 @@ class LIMEAnalyzer:
             class_names=['original', 'optimized'],
             bow=False
         )
+        self.occlusion_explainer = OcclusionExplainer(window=self.settings.occlusion_window)
         self.vectorizer = TfidfVectorizer(
             tokenizer=tokenize_text,
             stop_words='english',
@@ -25,19 +35,35 @@ class LIMEAnalyzer:
         
     async def analyze_prompt(self, original_prompt: str, optimized_prompt: str) -> Dict:
         """Prompt optimizasyonunu LIME ile analiz et"""
+        return self.analyze(original_prompt, optimized_prompt)
+        
+    def analyze(
+        self,
+        original_prompt: str,
+        optimized_prompt: str,
+        include_visualizations: bool = False
+    ) -> Dict:
+        """Senkron LIME analizi (yürütücü işçilerinde çalıştırılır)"""
         try:
             # Metinleri hazırla
             original_tokens = tokenize_text(original_prompt)
             optimized_tokens = tokenize_text(optimized_prompt)
             
-            # LIME açıklaması oluştur
-            exp = self.explainer.explain_instance(
-                original_prompt,
-                self._prediction_fn,
-                num_features=len(original_tokens),
-                num_samples=self.settings.num_samples,
-                top_labels=1
-            )
+            # Her analiz aynı tohumla başlar; aynı girdi aynı sonucu verir
+            self._reset_random_state()
+            
+            # Seçilen açıklayıcı ile açıklama oluştur
+            explainer_name = self._select_explainer(len(original_tokens))
+            if explainer_name == "occlusion":
+                exp = self.occlusion_explainer.explain_instance(self._index_text(original_prompt))
+            else:
+                exp = self._explain_instance(
+                    original_prompt,
+                    num_features=len(original_tokens),
+                    num_samples=self.settings.num_samples,
+                    top_labels=1,
+                    adaptive=self.settings.adaptive_sampling
+                )
             
             # Token önem skorlarını hesapla
             token_importance = self._calculate_token_importance(exp)
@@ -45,168 +71,190 @@ class LIMEAnalyzer:
             # Değişiklikleri analiz et
             changes = self._analyze_changes(original_tokens, optimized_tokens)
             
-            # Görselleştirmeleri oluştur
-            visualizations = self._create_visualizations(
-                token_importance,
-                changes,
-                original_prompt,
-                optimized_prompt
-            )
-            
-            return {
+            analysis = {
                 "token_importance": token_importance,
                 "changes": changes,
                 "explanation": self._format_explanation(exp, changes),
                 "confidence_score": self._calculate_confidence(exp),
-                "visualizations": visualizations,
-                "metrics": self._calculate_metrics(original_prompt, optimized_prompt)
+                "metrics": self._calculate_metrics(original_prompt, optimized_prompt),
+                "explainer": explainer_name,
+                "samples_used": exp.num_samples
             }
             
+            # Görselleştirmeleri oluştur
+            if include_visualizations:
+                analysis["visualizations"] = self.visualize(analysis)
+                
+            return analysis
+            
         except Exception as e:
             raise Exception(f"LIME analizi sırasında hata: {str(e)}")
         
-    def _prediction_fn(self, texts: List[str]) -> np.ndarray:
-        """LIME için gelişmiş tahmin fonksiyonu"""
-        predictions = []
-        for text in texts:
-            # TF-IDF vektörleştirme
-            features = self.vectorizer.fit_transform([text]).toarray()
-            
-            # Metrikleri hesapla
-            length_score = 1.0 - (len(text.split()) / 100)  # Uzunluk skoru
-            complexity_score = self._calculate_complexity_score(text)
-            clarity_score = self._calculate_clarity_score(text)
-            
-            # Skorları birleştir
-            final_score = (length_score + complexity_score + clarity_score) / 3
-            predictions.append([1 - final_score, final_score])
-            
-        return np.array(predictions)
+    def _reset_random_state(self) -> None:
+        """Pertürbasyon ve yerel model rastgeleliğini ayarlanan tohuma döndür"""
+        random_state = np.random.RandomState(self.settings.random_seed)
+        self.explainer.random_state = random_state
+        self.explainer.base.random_state = random_state
         
-    def _calculate_complexity_score(self, text: str) -> float:
-        """Metin karmaşıklığını hesapla"""
-        words = text.split()
-        avg_word_length = sum(len(word) for word in words) / len(words)
-        return 1.0 - (avg_word_length / 10)  # 10 karakterden uzun kelimeler cezalandırılır
+    def _select_explainer(self, num_tokens: int) -> str:
+        """Ayarlara ve prompt uzunluğuna göre açıklayıcıyı seç"""
+        if self.settings.explainer == "auto":
+            if num_tokens > self.settings.occlusion_token_threshold:
+                return "occlusion"
+            return "lime"
+        if self.settings.explainer not in ("lime", "occlusion"):
+            raise ValueError(f"Geçersiz açıklayıcı: {self.settings.explainer}")
+        return self.settings.explainer
         
-    def _calculate_clarity_score(self, text: str) -> float:
-        """Metin netliğini hesapla"""
-        sentences = text.split('.')
-        avg_sentence_length = sum(len(s.split()) for s in sentences) / len(sentences)
-        return 1.0 - (avg_sentence_length / 20)  # 20 kelimeden uzun cümleler cezalandırılır
+    def _index_text(self, text: str) -> IndexedString:
+        """Metni LIME açıklayıcısıyla aynı şekilde tokenlara ayır"""
+        return IndexedString(
+            text,
+            bow=self.explainer.bow,
+            split_expression=self.explainer.split_expression,
+            mask_string=self.explainer.mask_string
+        )
         
-    def _create_visualizations(
+    def _explain_instance(
         self,
-        token_importance: Dict[str, float],
-        changes: List[Dict],
-        original_prompt: str,
-        optimized_prompt: str
-    ) -> Dict:
-        """Görselleştirmeler oluştur"""
-        return {
-            "token_heatmap": self._create_token_heatmap(token_importance),
-            "changes_sankey": self._create_changes_sankey(changes),
-            "metrics_radar": self._create_metrics_radar(original_prompt, optimized_prompt),
-            "importance_distribution": self._create_importance_distribution(token_importance)
-        }
-        
-    def _create_token_heatmap(self, token_importance: Dict[str, float]) -> Dict:
-        """Token önem skorları ısı haritası"""
-        tokens = list(token_importance.keys())
-        scores = list(token_importance.values())
-        
-        fig = go.Figure(data=go.Heatmap(
-            z=[scores],
-            x=tokens,
-            colorscale='RdYlBu',
-            showscale=True
-        ))
+        text: str,
+        num_features: int,
+        num_samples: int,
+        top_labels: int = 1,
+        adaptive: bool = False
+    ) -> explanation.Explanation:
+        """LimeTextExplainer.explain_instance eşdeğeri, toplu skorlama ile
+
+        Pertürbasyonlar LIME ile aynı rastgele diziden üretilir, ancak metne
+        dönüştürülmeden BatchScorer ile tek matris işleminde puanlanır.
+        Uyarlamalı modda örnekler artan partilerle eklenir ve yerel model
+        her partiden sonra yeniden eğitilir; ağırlıklar yakınsadığında,
+        süre bütçesi dolduğunda veya num_samples/max_samples'tan küçük olana
+        ulaşıldığında durulur; uyarlamalı mod hiçbir zaman num_samples'tan
+        fazla örnek üretmez.
+        """
+        explainer = self.explainer
+        indexed_string = self._index_text(text)
+        domain_mapper = TextDomainMapper(indexed_string)
+        scorer = BatchScorer(indexed_string)
+        doc_size = indexed_string.num_words()
         
-        fig.update_layout(
-            title="Token Önem Skorları Isı Haritası",
-            xaxis_title="Tokenlar",
-            yaxis_title="Önem Skoru",
-            height=200
+        exp = explanation.Explanation(
+            domain_mapper=domain_mapper,
+            class_names=explainer.class_names,
+            random_state=explainer.random_state
         )
         
-        return fig.to_dict()
-        
-    def _create_changes_sankey(self, changes: List[Dict]) -> Dict:
-        """Değişiklikler için Sankey diyagramı"""
-        source = []
-        target = []
-        value = []
+        # İlk satır orijinal metin
+        data = np.ones((1, doc_size))
+        yss = scorer.score(data)
+        distances = np.zeros(1)
+        exp.predict_proba = yss[0]
+        exp.top_labels = list(np.argsort(yss[0])[-top_labels:])
+        exp.top_labels.reverse()
+        # Sonuç her zaman 'optimized' sınıfı için okunur (as_list varsayılanı, occlusion
+        # ile aynı); orijinal metin 'original' sınıfına yakınsa en olası etiket 0 olur
+        labels = [OPTIMIZED_LABEL]
         
-        for change in changes:
-            source.append(change['original'])
-            target.append(change['optimized'])
-            value.append(1)
+        schedule = self._sample_schedule(num_samples) if adaptive else [num_samples]
+        deadline = time.monotonic() + self._sampling_time_budget()
+        previous = None
+        for target in schedule:
+            # Yeni partiyi üret, puanla ve mesafelerini hesapla
+            batch = self._perturb(doc_size, target - len(data))
+            data = np.vstack([data, batch])
+            yss = np.vstack([yss, scorer.score(batch)])
+            distances = np.concatenate([distances, self._distances(batch, doc_size)])
             
-        fig = go.Figure(data=[go.Sankey(
-            node=dict(
-                pad=15,
-                thickness=20,
-                line=dict(color="black", width=0.5),
-                label=list(set(source + target))
-            ),
-            link=dict(
-                source=source,
-                target=target,
-                value=value
-            )
-        )])
-        
-        fig.update_layout(
-            title="Token Değişiklikleri Akış Diyagramı",
-            height=400
-        )
-        
-        return fig.to_dict()
-        
-    def _create_metrics_radar(self, original_prompt: str, optimized_prompt: str) -> Dict:
-        """Metrikler için radar grafik"""
-        metrics = self._calculate_metrics(original_prompt, optimized_prompt)
+            fits = {
+                label: explainer.base.explain_instance_with_data(
+                    data, yss, distances, label, num_features,
+                    feature_selection=explainer.feature_selection
+                )
+                for label in labels
+            }
+            if previous is not None and self._has_converged(previous, fits):
+                break
+            if time.monotonic() >= deadline:
+                break
+            previous = fits
+            
+        for label, fit in fits.items():
+            (exp.intercept[label],
+             exp.local_exp[label],
+             exp.score, exp.local_pred) = fit
+        exp.num_samples = len(data)
+        return exp
         
-        fig = go.Figure()
+    def _perturb(self, doc_size: int, num_rows: int) -> np.ndarray:
+        """LIME ile aynı yöntemle rastgele token maskeleri üret"""
+        random_state = self.explainer.random_state
+        sample = random_state.randint(1, doc_size + 1, num_rows)
+        data = np.ones((num_rows, doc_size))
+        features_range = range(doc_size)
+        for i, size in enumerate(sample):
+            inactive = random_state.choice(features_range, size, replace=False)
+            data[i, inactive] = 0
+        return data
         
-        fig.add_trace(go.Scatterpolar(
-            r=[metrics[key] for key in metrics.keys()],
-            theta=list(metrics.keys()),
-            fill='toself',
-            name='Optimizasyon Metrikleri'
-        ))
+    def _distances(self, batch: np.ndarray, doc_size: int) -> np.ndarray:
+        """Pertürbasyonların orijinal metne kosinüs mesafesi (LIME ölçeğinde)"""
+        sparse_batch = sparse.csr_matrix(batch)
+        original = sparse.csr_matrix(np.ones((1, doc_size)))
+        return sklearn.metrics.pairwise.pairwise_distances(
+            sparse_batch, original, metric='cosine'
+        ).ravel() * 100
         
-        fig.update_layout(
-            polar=dict(
-                radialaxis=dict(
-                    visible=True,
-                    range=[0, 1]
-                )
-            ),
-            showlegend=True,
-            title="Optimizasyon Metrikleri Radar Grafiği"
-        )
+    def _sample_schedule(self, num_samples: int) -> List[int]:
+        """min_samples'tan üst sınıra (num_samples ve max_samples'tan küçüğü) geometrik artan örnek sayıları"""
+        limit = max(min(num_samples, self.settings.max_samples), 2)
+        schedule = []
+        target = max(self.settings.min_samples, 2)
+        while target < limit:
+            schedule.append(target)
+            target = max(int(target * self.settings.sample_growth_factor), target + 1)
+        schedule.append(limit)
+        return schedule
         
-        return fig.to_dict()
+    def _sampling_time_budget(self) -> float:
+        """Örnekleme için saniye cinsinden süre bütçesi"""
+        return get_settings().MAX_RESPONSE_TIME * self.settings.sampling_time_budget_ratio
         
-    def _create_importance_distribution(self, token_importance: Dict[str, float]) -> Dict:
-        """Token önem dağılımı histogramı"""
-        scores = list(token_importance.values())
+    def _has_converged(self, previous: Dict, current: Dict) -> bool:
+        """Ardışık iki yerel modelin top-k ağırlıkları ve R² skoru tolerans içinde mi"""
+        top_k = self.settings.convergence_top_k
+        for label, (_, local_exp, score, _) in current.items():
+            _, previous_exp, previous_score, _ = previous[label]
+            if abs(score - previous_score) > self.settings.r2_tolerance:
+                return False
+            
+            # local_exp mutlak ağırlığa göre azalan sırada döner; eşit ağırlıklı
+            # tokenların sıra değiştirmesi için iki top-k kümesinin birleşimi karşılaştırılır
+            weights = dict(local_exp)
+            previous_weights = dict(previous_exp)
+            features = {f for f, _ in local_exp[:top_k]} | {f for f, _ in previous_exp[:top_k]}
+            scale = max((abs(weights.get(f, 0.0)) for f in features), default=0.0)
+            for feature in features:
+                change = abs(weights.get(feature, 0.0) - previous_weights.get(feature, 0.0))
+                if change > self.settings.convergence_tolerance * scale:
+                    return False
+        return True
         
-        fig = go.Figure(data=[go.Histogram(
-            x=scores,
-            nbinsx=20,
-            name="Önem Skorları"
-        )])
+    def _calculate_complexity_score(self, text: str) -> float:
+        """Metin karmaşıklığını hesapla"""
+        words = text.split()
+        avg_word_length = sum(len(word) for word in words) / len(words)
+        return 1.0 - (avg_word_length / 10)  # 10 karakterden uzun kelimeler cezalandırılır
         
-        fig.update_layout(
-            title="Token Önem Skorları Dağılımı",
-            xaxis_title="Önem Skoru",
-            yaxis_title="Token Sayısı",
-            height=300
-        )
+    def _calculate_clarity_score(self, text: str) -> float:
+        """Metin netliğini hesapla"""
+        sentences = text.split('.')
+        avg_sentence_length = sum(len(s.split()) for s in sentences) / len(sentences)
+        return 1.0 - (avg_sentence_length / 20)  # 20 kelimeden uzun cümleler cezalandırılır
         
-        return fig.to_dict()
+    def visualize(self, analysis: Dict) -> Dict:
+        """Sayısal analizden görselleştirmeleri oluştur"""
+        return build_all_figures(analysis)
         
     def _calculate_metrics(self, original_prompt: str, optimized_prompt: str) -> Dict:
         """Detaylı metrikler hesapla"""
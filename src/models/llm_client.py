@@ -1,28 +1,90 @@
-from typing import Dict, Tuple
-import openai
-from openai import AsyncOpenAI, OpenAIError
-import tiktoken
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional, Tuple
 import os
+import time
 from dotenv import load_dotenv
 
+from .response_cache import ResponseCache
+from . import token_counter
+from ..config.settings import get_settings
+from ..utils.instrumentation import (
+    LLM_ERRORS_TOTAL,
+    LLM_REQUEST_DURATION,
+    LLM_REQUESTS_IN_FLIGHT,
+    record_llm_usage
+)
+
 load_dotenv()
 
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+class TokenLimitExceededError(Exception):
+    """Prompt MAX_PROMPT_TOKENS sınırını aştığında fırlatılır"""
+
+# Tek kullanıcı mesajlı sohbet isteğinin biçim tokenları (mesaj başına 3, rol 1, yanıt başlangıcı 3)
+CHAT_PROMPT_OVERHEAD = 7
+
 class LLMClient:
-    def __init__(self):
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY environment variable is not set")
+    def __init__(self, client: Optional["AsyncOpenAI"] = None, cache: Optional[ResponseCache] = None):
+        # OpenAI SDK içe aktarımı yavaş olduğundan modül yüklenirken değil istemci kurulurken yapılır
+        from openai import OpenAIError
+        self._api_error = OpenAIError
+        if client is None:
+            client = self._create_client()
             
-        self.client = AsyncOpenAI(api_key=api_key)
+        self.client = client
+        self.cache = cache
         self.models_config = {
             "gpt-3.5-turbo": {"cost_per_1k_tokens": 0.0015},
             "gpt-4": {"cost_per_1k_tokens": 0.03},
         }
 
+    @staticmethod
+    def _create_client() -> "AsyncOpenAI":
+        """Keep-alive bağlantı havuzlu OpenAI istemcisi oluştur"""
+        from openai import AsyncOpenAI
+        import httpx
+
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY environment variable is not set")
+            
+        settings = get_settings()
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY
+            ),
+            timeout=settings.OPENAI_TIMEOUT
+        )
+        return AsyncOpenAI(
+            api_key=api_key,
+            base_url=settings.OPENAI_BASE_URL or None,
+            http_client=http_client
+        )
+        
+    async def close(self) -> None:
+        """HTTP bağlantı havuzunu kapat"""
+        await self.client.close()
+
     def count_tokens(self, text: str, model: str = "gpt-3.5-turbo") -> int:
         """Verilen metin için token sayısını hesapla"""
-        encoding = tiktoken.encoding_for_model(model)
-        return len(encoding.encode(text))
+        return token_counter.count_tokens(text, model)
+
+    def count_tokens_batch(self, texts: List[str], model: str = "gpt-3.5-turbo") -> List[int]:
+        """Birden fazla metin için token sayılarını hesapla"""
+        return token_counter.count_tokens_batch(texts, model, get_settings().TOKENIZER_THREADS)
+
+    def check_prompt_tokens(self, prompt: str, model: str) -> int:
+        """OpenAI çağrısından önce prompt token sınırını uygula"""
+        prompt_tokens = self.count_tokens(prompt, model)
+        max_tokens = get_settings().MAX_PROMPT_TOKENS
+        if prompt_tokens > max_tokens:
+            raise TokenLimitExceededError(
+                f"Prompt {prompt_tokens} token içeriyor, sınır {max_tokens}"
+            )
+        return prompt_tokens
 
     def calculate_cost(self, prompt_tokens: int, completion_tokens: int, model: str) -> float:
         """Token kullanımına göre maliyeti hesapla"""
@@ -35,12 +97,25 @@ class LLMClient:
 
     async def call_model(self, prompt: str, model: str = "gpt-3.5-turbo", temperature: float = 0.7) -> Tuple[str, Dict]:
         """Model çağrısı yap ve sonuçları döndür"""
+        start = time.perf_counter()
+        cache_key = None
+        if self.cache is not None and self.cache.is_cacheable(temperature):
+            cache_key = self.cache.make_key(prompt, model, temperature)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                output_text, usage = cached
+                LLM_REQUEST_DURATION.observe(time.perf_counter() - start, model=model, cached="true")
+                # Önbellekten dönen yanıt için ödeme yapılmaz
+                return output_text, {**usage, "cost_usd": 0.0, "cached": True}
+                
+        self.check_prompt_tokens(prompt, model)
         try:
-            response = await self.client.chat.completions.create(
-                model=model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=temperature
-            )
+            with LLM_REQUESTS_IN_FLIGHT.track_inprogress():
+                response = await self.client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=temperature
+                )
             
             usage = {
                 "prompt_tokens": response.usage.prompt_tokens,
@@ -54,19 +129,119 @@ class LLMClient:
             }
             
             output_text = response.choices[0].message.content
-            return output_text, usage
             
-        except OpenAIError as e:
+        except self._api_error as e:
+            LLM_ERRORS_TOTAL.inc(model=model)
             raise Exception(f"OpenAI API hatası: {str(e)}")
         except Exception as e:
+            LLM_ERRORS_TOTAL.inc(model=model)
             raise Exception(f"Model çağrısı başarısız: {str(e)}")
+            
+        LLM_REQUEST_DURATION.observe(time.perf_counter() - start, model=model, cached="false")
+        record_llm_usage(model, usage)
+        if cache_key is not None:
+            await self.cache.set(cache_key, output_text, usage)
+        return output_text, usage
 
-    async def optimize_prompt(self, current_prompt: str) -> Tuple[str, Dict]:
-        """Promptu optimize et"""
-        optimization_prompt = f"""
+    async def stream_model(
+        self,
+        prompt: str,
+        model: str = "gpt-3.5-turbo",
+        temperature: float = 0.7
+    ) -> AsyncIterator[Tuple[Optional[str], Optional[Dict]]]:
+        """Model yanıtını parça parça akışla döndür
+
+        Her parça için (delta, None), akış bitince (None, usage) üretilir.
+        Kullanım sağlayıcıdan `stream_options.include_usage` ile son parçada
+        istenir; sağlayıcı göndermezse tokenlar tiktoken ile tahmin edilir.
+        """
+        start = time.perf_counter()
+        cache_key = None
+        if self.cache is not None and self.cache.is_cacheable(temperature):
+            cache_key = self.cache.make_key(prompt, model, temperature)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                output_text, usage = cached
+                LLM_REQUEST_DURATION.observe(time.perf_counter() - start, model=model, cached="true")
+                yield output_text, None
+                yield None, {**usage, "cost_usd": 0.0, "cached": True}
+                return
+                
+        prompt_tokens = self.check_prompt_tokens(prompt, model) + CHAT_PROMPT_OVERHEAD
+        chunks = []
+        reported = None
+        try:
+            with LLM_REQUESTS_IN_FLIGHT.track_inprogress():
+                stream = await self.client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=temperature,
+                    stream=True,
+                    # SDK 1.3 stream_options parametresini tanımadığından gövdeye eklenir
+                    extra_body={"stream_options": {"include_usage": True}}
+                )
+                async for chunk in stream:
+                    # Kullanım, seçenek içermeyen son parçada gelir
+                    reported = self._chunk_usage(chunk) or reported
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        chunks.append(delta)
+                        yield delta, None
+                    
+        except self._api_error as e:
+            LLM_ERRORS_TOTAL.inc(model=model)
+            raise Exception(f"OpenAI API hatası: {str(e)}")
+        except Exception as e:
+            LLM_ERRORS_TOTAL.inc(model=model)
+            raise Exception(f"Model çağrısı başarısız: {str(e)}")
+        LLM_REQUEST_DURATION.observe(time.perf_counter() - start, model=model, cached="false")
+            
+        output_text = "".join(chunks)
+        if reported is not None:
+            prompt_tokens, completion_tokens = reported
+        else:
+            completion_tokens = self.count_tokens(output_text, model)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "cost_usd": self.calculate_cost(prompt_tokens, completion_tokens, model)
+        }
+        
+        record_llm_usage(model, usage)
+        if cache_key is not None:
+            await self.cache.set(cache_key, output_text, usage)
+        yield None, usage
+
+    @staticmethod
+    def _chunk_usage(chunk) -> Optional[Tuple[int, int]]:
+        """Akış parçasındaki sağlayıcı kullanımını (prompt, completion) olarak döndür
+
+        Eski SDK sürümlerinde `usage` modelde tanımlı olmadığından sözlük olarak gelir.
+        """
+        usage = getattr(chunk, "usage", None)
+        if usage is None:
+            return None
+        if isinstance(usage, dict):
+            return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+        return usage.prompt_tokens, usage.completion_tokens
+
+    @staticmethod
+    def _build_optimization_prompt(current_prompt: str) -> str:
+        """Optimizasyon talimatını oluştur"""
+        return f"""
         Aşağıdaki promptu daha kısa ve net hale getir. 
         Gereksiz kelimeleri çıkar ve maksimum 50 kelime olacak şekilde düzenle:
 
         {current_prompt}
         """
-        return await self.call_model(optimization_prompt) 
\ No newline at end of file
+
+    async def optimize_prompt(self, current_prompt: str, temperature: float = 0.7) -> Tuple[str, Dict]:
+        """Promptu optimize et"""
+        return await self.call_model(self._build_optimization_prompt(current_prompt), temperature=temperature)
+
+    def stream_optimize_prompt(self, current_prompt: str) -> AsyncIterator[Tuple[Optional[str], Optional[Dict]]]:
+        """Promptu optimize et ve yanıtı akışla döndür"""
+        return self.stream_model(self._build_optimization_prompt(current_prompt)) 
\ No newline at end of file
@@ -0,0 +1,83 @@
+from typing import Dict, Optional, Tuple
+import hashlib
+import json
+import unicodedata
+
+from ..database.cache_store import MongoCacheStore
+from ..utils.cache import LRUCache
+
+class ResponseCache:
+    """(prompt, model, temperature) içerik adresli LLM yanıt önbelleği
+
+    Önce süreç içi LRU katmanına, ardından varsa paylaşımlı katmana bakılır.
+    Paylaşımlı katmandan gelen isabetler yerel katmana da yazılır.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: int = 3600,
+        store: Optional[MongoCacheStore] = None,
+        deterministic_only: bool = False
+    ):
+        self.memory = LRUCache(max_size=max_size, ttl=ttl)
+        self.store = store
+        self.deterministic_only = deterministic_only
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.saved_tokens = 0
+        self.saved_cost_usd = 0.0
+
+    @staticmethod
+    def make_key(prompt: str, model: str, temperature: float) -> str:
+        """Normalize edilmiş isteğin özetini oluştur"""
+        normalized = unicodedata.normalize("NFC", prompt.replace("\r\n", "\n").strip())
+        payload = json.dumps(
+            {"prompt": normalized, "model": model, "temperature": float(temperature)},
+            ensure_ascii=False,
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def is_cacheable(self, temperature: float) -> bool:
+        """Bu sıcaklık için önbellek kullanılabilir mi"""
+        return not self.deterministic_only or temperature == 0
+
+    async def get(self, key: str) -> Optional[Tuple[str, Dict]]:
+        """Önbellekteki yanıtı ve orijinal kullanım bilgisini getir"""
+        entry = self.memory.get(key)
+        if entry is None and self.store is not None:
+            entry = await self.store.get(key)
+            if entry is not None:
+                self.shared_hits += 1
+                self.memory.set(key, entry)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.saved_tokens += entry["usage"].get("total_tokens", 0)
+        self.saved_cost_usd += entry["usage"].get("cost_usd", 0.0)
+        return entry["output_text"], entry["usage"]
+
+    async def set(self, key: str, output_text: str, usage: Dict) -> None:
+        """Yanıtı tüm katmanlara yaz"""
+        entry = {"output_text": output_text, "usage": usage}
+        self.memory.set(key, entry)
+        if self.store is not None:
+            await self.store.set(key, entry)
+
+    def stats(self) -> Dict:
+        """İsabet/ıskalama sayaçları ve tasarruf edilen maliyet"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self.memory),
+            "saved_tokens": self.saved_tokens,
+            "saved_cost_usd": self.saved_cost_usd
+        }
@@ -0,0 +1,31 @@
+from typing import TYPE_CHECKING, Iterable, List
+from functools import lru_cache
+
+if TYPE_CHECKING:
+    import tiktoken
+
+# Modeli tanımayan tiktoken sürümleri için varsayılan kodlama
+DEFAULT_ENCODING = "cl100k_base"
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str) -> "tiktoken.Encoding":
+    """Model için tiktoken kodlayıcısını bir kez oluştur ve önbellekle"""
+    import tiktoken
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+
+def warm_up(models: Iterable[str]) -> None:
+    """Kodlayıcıları başlangıçta yükle"""
+    for model in models:
+        get_encoding(model)
+
+def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
+    """Tek bir metnin token sayısı"""
+    return len(get_encoding(model).encode_ordinary(text))
+
+def count_tokens_batch(texts: List[str], model: str = "gpt-3.5-turbo", num_threads: int = 4) -> List[int]:
+    """Birden fazla metnin token sayılarını paralel hesapla"""
+    encoded = get_encoding(model).encode_ordinary_batch(texts, num_threads=num_threads)
+    return [len(tokens) for tokens in encoded]
@@ -0,0 +1,152 @@
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+from functools import lru_cache
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
+import multiprocessing
+import threading
+
+from ..config.settings import get_settings
+from ..utils.logger import logger
+from ..utils.instrumentation import ANALYSIS_DURATION
+
+if TYPE_CHECKING:
+    from ..models.lime_analyzer import LIMEAnalyzer
+
+class AnalysisQueueFullError(Exception):
+    """Analiz kuyruğu dolu olduğunda fırlatılır"""
+
+class AnalysisTimeoutError(Exception):
+    """Analiz görevi zaman aşımına uğradığında fırlatılır"""
+
+# İşçi başına önceden yüklenmiş analizör. Analizörün durumu (rastgele durum,
+# TF-IDF vektörleştirici) paylaşılamaz; thread modunda her iş parçacığı kendi
+# analizörünü tutar, process modunda her süreçte tek iş parçacığı vardır.
+_worker_state = threading.local()
+
+def _init_worker() -> None:
+    """İşçiyi analizör ile ısıt; LIME ve scikit-learn yalnızca işçide yüklenir"""
+    from ..models.lime_analyzer import LIMEAnalyzer
+    _worker_state.analyzer = LIMEAnalyzer()
+
+def _worker_analyzer() -> "LIMEAnalyzer":
+    """Geçerli işçinin analizörü; yoksa oluşturulur"""
+    if getattr(_worker_state, "analyzer", None) is None:
+        _init_worker()
+    return _worker_state.analyzer
+
+def _warm_up() -> bool:
+    """İşçinin başlatıldığından emin ol"""
+    return _worker_analyzer() is not None
+
+def _run_analysis(original_prompt: str, optimized_prompt: str) -> Dict:
+    """İşçi içinde LIME analizini çalıştır"""
+    return _worker_analyzer().analyze(original_prompt, optimized_prompt)
+
+class AnalysisExecutor:
+    """LIME analizlerini olay döngüsü dışında, sınırlı bir kuyrukla çalıştırır"""
+
+    def __init__(
+        self,
+        mode: str = "process",
+        max_workers: int = 2,
+        queue_size: int = 16,
+        timeout: float = 30.0
+    ):
+        if mode not in ("process", "thread"):
+            raise ValueError(f"Geçersiz yürütücü tipi: {mode}")
+
+        self.mode = mode
+        self.max_workers = max_workers
+        self.capacity = max_workers + queue_size
+        self.timeout = timeout
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Çalışan ve kuyrukta bekleyen görev sayısı"""
+        return self._pending
+
+    def _create_executor(self) -> Executor:
+        if self.mode == "thread":
+            return ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="lime-worker",
+                initializer=_init_worker
+            )
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker
+        )
+
+    async def start(self) -> None:
+        """Havuzu oluştur ve işçileri ısıt"""
+        if self._executor is not None:
+            return
+
+        self._executor = self._create_executor()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[
+            loop.run_in_executor(self._executor, _warm_up)
+            for _ in range(self.max_workers)
+        ])
+        logger.info("Analiz yürütücüsü hazır", extra={
+            "mode": self.mode,
+            "workers": self.max_workers
+        })
+
+    def shutdown(self) -> None:
+        """Havuzu kapat"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _release(self, _: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    async def analyze(self, original_prompt: str, optimized_prompt: str) -> Dict:
+        """Analizi havuza gönder ve sonucu bekle"""
+        with ANALYSIS_DURATION.time():
+            return await self._submit(_run_analysis, original_prompt, optimized_prompt)
+
+    async def _submit(self, fn: Callable[..., Dict], *args: Any) -> Dict:
+        """Görevi kapasite ve zaman aşımı sınırlarıyla havuza gönder"""
+        if self._executor is None:
+            await self.start()
+
+        with self._lock:
+            if self._pending >= self.capacity:
+                raise AnalysisQueueFullError(
+                    f"Analiz kuyruğu dolu ({self._pending}/{self.capacity})"
+                )
+            self._pending += 1
+
+        # Slot, görev gerçekten bittiğinde serbest bırakılır; havuz kapanmış
+        # veya bozulmuşsa görev hiç başlamadığı için hemen geri verilir
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            raise AnalysisTimeoutError(f"Analiz {self.timeout} saniyede tamamlanamadı")
+
+@lru_cache()
+def get_analysis_executor() -> AnalysisExecutor:
+    """Süreç genelinde paylaşılan analiz yürütücüsünü döndür"""
+    settings = get_settings()
+    return AnalysisExecutor(
+        mode=settings.ANALYSIS_EXECUTOR,
+        max_workers=settings.ANALYSIS_WORKERS,
+        queue_size=settings.ANALYSIS_QUEUE_SIZE,
+        timeout=settings.ANALYSIS_TIMEOUT
+    )
@@ -0,0 +1,145 @@
+from typing import Awaitable, Callable, Dict, Optional
+import asyncio
+
+from ..models.llm_client import LLMClient
+from ..models.response_cache import ResponseCache
+from ..models.analysis_cache import AnalysisCache
+from ..models import token_counter
+from ..database.mongodb import MongoDB
+from ..database.cache_store import MongoCacheStore
+from ..database.job_store import JobStore
+from ..database.metrics_store import MetricsRollupStore
+from ..config.settings import get_settings
+from .analysis_executor import get_analysis_executor
+from .prompt_service import PromptService
+from .job_queue import JobQueue
+from ..utils.text_processing import ensure_nltk_data
+from ..utils.logger import logger, log_queue_stats
+from ..utils.instrumentation import ANALYSIS_PENDING, LOG_RECORDS_DROPPED
+
+class ServiceContainer:
+    """İşçi başına bir kez oluşturulan paylaşımlı istemciler ve servisler"""
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.db = MongoDB()
+        self.response_cache = self._create_response_cache()
+        self.llm_client = LLMClient(cache=self.response_cache)
+        self.analysis_executor = get_analysis_executor()
+        self.analysis_cache = self._create_analysis_cache()
+        self.metrics_store = (
+            MetricsRollupStore(self.db.db.metrics_daily)
+            if self.settings.METRICS_ROLLUPS_ENABLED else None
+        )
+        self.prompt_service = PromptService(
+            llm_client=self.llm_client,
+            db=self.db,
+            analysis_executor=self.analysis_executor,
+            analysis_cache=self.analysis_cache,
+            metrics_store=self.metrics_store
+        )
+        self.job_queue = JobQueue(
+            JobStore(self.db.db.jobs),
+            self.prompt_service,
+            workers=self.settings.JOB_WORKERS,
+            max_attempts=self.settings.JOB_MAX_ATTEMPTS,
+            lease_seconds=self.settings.JOB_LEASE_SECONDS,
+            poll_interval=self.settings.JOB_POLL_INTERVAL
+        )
+        # Bileşen adı -> "pending" | "running" | "ready" | "failed"
+        self.warmup: Dict[str, str] = {}
+        self._warmup_task: Optional[asyncio.Task] = None
+        # Anlık değerler yalnızca /metrics okunurken hesaplanır
+        ANALYSIS_PENDING.set_function(lambda: self.analysis_executor.pending)
+        LOG_RECORDS_DROPPED.set_function(lambda: log_queue_stats(logger)["dropped"])
+
+    def _create_response_cache(self) -> Optional[ResponseCache]:
+        """Ayarlara göre LLM yanıt önbelleğini oluştur"""
+        if not self.settings.LLM_CACHE_ENABLED:
+            return None
+
+        store = None
+        if self.settings.LLM_CACHE_BACKEND == "mongo":
+            store = MongoCacheStore(self.db.db.llm_cache, ttl=self.settings.LLM_CACHE_TTL)
+
+        return ResponseCache(
+            max_size=self.settings.LLM_CACHE_MAX_SIZE,
+            ttl=self.settings.LLM_CACHE_TTL,
+            store=store,
+            deterministic_only=self.settings.LLM_CACHE_DETERMINISTIC_ONLY
+        )
+
+    def _create_analysis_cache(self) -> Optional[AnalysisCache]:
+        """Ayarlara göre LIME analiz önbelleğini oluştur"""
+        if not self.settings.LIME_CACHE_ENABLED:
+            return None
+
+        store = None
+        if self.settings.LIME_CACHE_BACKEND == "mongo":
+            store = MongoCacheStore(self.db.db.lime_cache, ttl=self.settings.LIME_CACHE_TTL)
+
+        return AnalysisCache(
+            max_size=self.settings.LIME_CACHE_MAX_SIZE,
+            ttl=self.settings.LIME_CACHE_TTL,
+            store=store
+        )
+
+    @property
+    def ready(self) -> bool:
+        """Tüm ısınma adımları tamamlandı mı"""
+        return all(state == "ready" for state in self.warmup.values())
+
+    async def start(self) -> None:
+        """Arka plan kaynaklarını başlat; ağır bileşenler arka planda ısıtılır
+
+        Uygulama ısınma bitmeden istek kabul eder; bileşenler ilk kullanımda
+        da yüklenebilir. Durum `GET /ready` ile izlenir.
+        """
+        steps: Dict[str, Callable[[], Awaitable[None]]] = {
+            "indexes": self._ensure_indexes,
+            "nltk": lambda: asyncio.to_thread(ensure_nltk_data),
+            "tokenizers": lambda: asyncio.to_thread(
+                token_counter.warm_up, list(self.llm_client.models_config)
+            ),
+            "analysis_executor": self.analysis_executor.start,
+            "prompt_service": lambda: asyncio.to_thread(self.prompt_service.warm_up)
+        }
+        await self.job_queue.start()
+        if self.settings.WARMUP_ENABLED:
+            self.warmup = {name: "pending" for name in steps}
+            self._warmup_task = asyncio.create_task(self._warm_up(steps))
+        logger.info("Servis konteyneri başlatıldı")
+
+    async def _warm_up(self, steps: Dict[str, Callable[[], Awaitable[None]]]) -> None:
+        """Isınma adımlarını eşzamanlı çalıştır ve durumlarını kaydet"""
+        async def run(name: str, step: Callable[[], Awaitable[None]]) -> None:
+            self.warmup[name] = "running"
+            try:
+                await step()
+                self.warmup[name] = "ready"
+            except Exception as e:
+                self.warmup[name] = "failed"
+                logger.warning(f"Isınma adımı başarısız ({name}): {str(e)}")
+
+        await asyncio.gather(*[run(name, step) for name, step in steps.items()])
+        logger.info("Isınma tamamlandı", extra={"components": self.warmup})
+
+    async def _ensure_indexes(self) -> None:
+        """Veritabanı ve önbellek indekslerini oluştur"""
+        await self.db.ensure_indexes()
+        if self.metrics_store is not None:
+            await self.metrics_store.ensure_indexes()
+        for cache in (self.response_cache, self.analysis_cache):
+            if cache is not None and cache.store is not None:
+                await cache.store.ensure_indexes()
+
+    async def close(self) -> None:
+        """Bağlantı havuzlarını ve işçileri kapat"""
+        if self._warmup_task is not None:
+            self._warmup_task.cancel()
+            await asyncio.gather(self._warmup_task, return_exceptions=True)
+        await self.job_queue.stop()
+        await self.llm_client.close()
+        self.db.close()
+        self.analysis_executor.shutdown()
+        logger.info("Servis konteyneri kapatıldı")
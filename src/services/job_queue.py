@@ -0,0 +1,168 @@
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+import asyncio
+import os
+import uuid
+
+from ..database.job_store import JobStore
+from ..models.llm_client import TokenLimitExceededError
+from .prompt_service import PromptService, StageCallback
+from ..utils.logger import logger
+
+class JobQueue:
+    """MongoDB destekli, süreç içi işçilerle çalışan optimizasyon iş kuyruğu
+
+    İşler `jobs` koleksiyonunda saklanır. İşçiler işleri kira (lease) ile
+    alır ve çalışırken kirayı yeniler; yeniden başlatma sonrası süresi
+    dolan kiralar başka bir işçi tarafından yeniden alınır.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        service: PromptService,
+        workers: int = 2,
+        max_attempts: int = 3,
+        lease_seconds: int = 60,
+        poll_interval: float = 1.0
+    ):
+        self.store = store
+        self.service = service
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+
+    async def start(self) -> None:
+        """İşçi görevlerini başlat"""
+        await self.store.ensure_indexes()
+        self._tasks = [
+            asyncio.create_task(self._worker_loop(f"{self.owner}-{index}"))
+            for index in range(self.workers)
+        ]
+        logger.info("İş kuyruğu başlatıldı", extra={"workers": self.workers})
+
+    async def stop(self) -> None:
+        """İşçileri durdur; yarım kalan işler kira süresi dolunca yeniden alınır"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def enqueue_optimize(
+        self,
+        prompt_id: str,
+        epochs: Optional[int] = None,
+        candidates: Optional[int] = None
+    ) -> Dict:
+        """Optimizasyon işini kuyruğa ekle"""
+        payload = {"prompt_id": prompt_id, "epochs": epochs, "candidates": candidates}
+        job = await self.store.create("optimize", payload, self.max_attempts)
+        self._wakeup.set()
+        return job
+
+    async def enqueue_batch(
+        self,
+        texts: List[str],
+        prompt_ids: List[str],
+        concurrency: Optional[int] = None
+    ) -> Dict:
+        """Toplu optimizasyon işini kuyruğa ekle
+
+        Yarıda kalan bir toplu iş yeniden çalıştırılırsa tamamlanmış öğeler
+        tekrar kaydedileceğinden toplu işler yalnızca bir kez denenir.
+        """
+        payload = {"texts": texts, "prompt_ids": prompt_ids, "concurrency": concurrency}
+        job = await self.store.create("batch", payload, max_attempts=1)
+        self._wakeup.set()
+        return job
+
+    async def get_job(self, job_id: str) -> Optional[Dict]:
+        """İş durumunu getir"""
+        return await self.store.get(job_id)
+
+    async def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """İşleri durum filtresiyle listele"""
+        return await self.store.list(status=status, limit=limit)
+
+    async def _worker_loop(self, owner: str) -> None:
+        while True:
+            try:
+                job = await self.store.claim(owner, self.lease_seconds)
+            except Exception as e:
+                logger.error(f"İş alma hatası: {str(e)}")
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._process(job, owner)
+
+    async def _heartbeat(self, job_id: str, owner: str) -> None:
+        """İş sürerken kirayı düzenli olarak yenile"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            await self.store.extend_lease(job_id, owner, self.lease_seconds)
+
+    async def _process(self, job: Dict, owner: str) -> None:
+        job_id = job["_id"]
+        if job["attempts"] > job["max_attempts"]:
+            await self.store.fail(job_id, owner, job.get("error") or "Deneme sayısı aşıldı")
+            return
+
+        async def on_stage(stage: str) -> None:
+            await self.store.set_stage(job_id, owner, stage)
+
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, owner))
+        try:
+            if job["type"] == "batch":
+                result = await self._run_batch(job["payload"])
+            else:
+                result = await self._run_optimize(job["payload"], on_stage)
+            await self.store.complete(job_id, owner, result)
+            logger.info("İş tamamlandı", extra={"job_id": job_id})
+
+        except asyncio.CancelledError:
+            raise
+        except (ValueError, TokenLimitExceededError) as e:
+            # Bulunamayan prompt gibi kalıcı hatalar yeniden denenmez
+            await self.store.fail(job_id, owner, str(e))
+        except Exception as e:
+            retry_at = None
+            if job["attempts"] < job["max_attempts"]:
+                retry_at = datetime.utcnow() + timedelta(seconds=2 ** job["attempts"])
+            logger.error(f"İş hatası: {str(e)}", extra={"job_id": job_id, "attempts": job["attempts"]})
+            await self.store.fail(job_id, owner, str(e), retry_at=retry_at)
+        finally:
+            heartbeat.cancel()
+
+    async def _run_optimize(self, payload: Dict, on_stage: StageCallback) -> Dict:
+        result = await self.service.optimize_prompt(
+            payload["prompt_id"],
+            on_stage=on_stage,
+            epochs=payload.get("epochs"),
+            candidates=payload.get("candidates")
+        )
+        latest = result["model_responses"][-1] if result.get("model_responses") else {}
+        return {
+            "prompt_id": result["prompt_id"],
+            "optimized_prompt": result.get("optimized_prompt"),
+            "iteration": latest.get("iteration"),
+            "total_tokens": latest.get("total_tokens"),
+            "cost_usd": latest.get("cost_usd")
+        }
+
+    async def _run_batch(self, payload: Dict) -> Dict:
+        return await self.service.optimize_batch(
+            texts=payload.get("texts"),
+            prompt_ids=payload.get("prompt_ids"),
+            concurrency=payload.get("concurrency")
+        )
@@ -1,24 +1,140 @@
-from typing import Dict, Optional
-from datetime import datetime
+from typing import TYPE_CHECKING, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from datetime import date, datetime
 from bson import ObjectId
+import asyncio
+import base64
+import binascii
+import hashlib
+import json
+import time
 
 from ..models.llm_client import LLMClient
-from ..models.lime_analyzer import LIMEAnalyzer
+from ..models.analysis_cache import AnalysisCache
 from ..database.mongodb import MongoDB
+from ..database.metrics_store import MetricsRollupStore
+from .analysis_executor import AnalysisExecutor, get_analysis_executor
 from ..utils.logger import logger
+from ..utils.singleflight import SingleFlight
+from ..utils.rate_limiter import RateLimiter
+from ..utils.cache import LRUCache
+from ..utils.visualization import build_figure
+from ..utils.similarity_index import MinHashLSH
+from ..utils.compression import PromptCompressor
+from ..utils.instrumentation import (
+    OPTIMIZATIONS_IN_FLIGHT,
+    OPTIMIZE_SLOW_TOTAL,
+    OPTIMIZE_STAGE_DURATION,
+    stage_timer
+)
+from ..utils.text_processing import calculate_similarity
+from ..config.settings import get_settings
+from ..config.lime_config import get_lime_settings
+
+if TYPE_CHECKING:
+    from ..models.lime_analyzer import LIMEAnalyzer
+
+# Optimizasyon talimatı için tahmini ek token sayısı
+OPTIMIZATION_PROMPT_OVERHEAD = 60
+
+# Optimizasyon aşamaları: llm, lime, persist
+StageCallback = Callable[[str], Awaitable[None]]
+
+class _BatchWriter:
+    """Toplu optimizasyon sonuçlarını biriktirip bulk write ile yazar"""
+    
+    def __init__(self, db: MongoDB, write_size: int):
+        self.db = db
+        self.write_size = write_size
+        self._inserts: List[Tuple[Dict, Dict]] = []
+        self._updates: List[Tuple[Tuple[str, Dict, Dict], Dict]] = []
+        
+    def add_insert(self, document: Dict, result: Dict) -> None:
+        self._inserts.append((document, result))
+        
+    def add_update(self, prompt_id: str, response_data: Dict, update_data: Dict, result: Dict) -> None:
+        self._updates.append(((prompt_id, response_data, update_data), result))
+        
+    async def flush_if_full(self) -> None:
+        if len(self._inserts) + len(self._updates) >= self.write_size:
+            await self.flush()
+            
+    async def flush(self) -> None:
+        """Biriken kayıtları yaz; yazılamayan öğeleri başarısız işaretle"""
+        inserts, self._inserts = self._inserts, []
+        updates, self._updates = self._updates, []
+        
+        for write, pending in (
+            (self.db.create_prompts, inserts),
+            (self.db.bulk_add_model_responses, updates)
+        ):
+            if not pending:
+                continue
+            try:
+                await write([operation for operation, _ in pending])
+            except Exception as e:
+                logger.error(f"Toplu yazma hatası: {str(e)}")
+                for _, result in pending:
+                    result["status"] = "failed"
+                    result["error"] = f"Kayıt yazılamadı: {str(e)}"
 
 class PromptService:
-    def __init__(self):
-        self.llm_client = LLMClient()
-        self.db = MongoDB()
-        self.lime_analyzer = LIMEAnalyzer()
+    def __init__(
+        self,
+        llm_client: Optional[LLMClient] = None,
+        db: Optional[MongoDB] = None,
+        analysis_executor: Optional[AnalysisExecutor] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        analysis_cache: Optional[AnalysisCache] = None,
+        metrics_store: Optional[MetricsRollupStore] = None
+    ):
+        self.llm_client = llm_client or LLMClient()
+        self.db = db or MongoDB()
+        self.analysis_executor = analysis_executor or get_analysis_executor()
+        self._inflight = SingleFlight()
+        self.settings = get_settings()
+        self.rate_limiter = rate_limiter or RateLimiter(
+            requests_per_minute=self.settings.RATE_LIMIT_PER_MINUTE,
+            tokens_per_minute=self.settings.TOKENS_PER_MINUTE
+        )
+        self.visualization_cache = LRUCache(max_size=self.settings.VISUALIZATION_CACHE_SIZE)
+        self.analysis_cache = analysis_cache
+        self.lime_fingerprint = get_lime_settings().fingerprint()
+        self.metrics_store = metrics_store
+        self.similarity_index = MinHashLSH(
+            num_bands=self.settings.DEDUP_NUM_BANDS,
+            band_size=self.settings.DEDUP_BAND_SIZE
+        ) if self.settings.DEDUP_ENABLED else None
+        self.compressor = PromptCompressor(
+            rules=[rule.strip() for rule in self.settings.COMPRESSION_RULES.split(",") if rule.strip()],
+            count_tokens=self.llm_client.count_tokens,
+            key_phrases=self.settings.COMPRESSION_KEY_PHRASES
+        ) if self.settings.COMPRESSION_ENABLED else None
+        self._candidate_scorer: Optional["LIMEAnalyzer"] = None
+        
+    @staticmethod
+    def _create_key(text: str, model_name: str, temperature: float) -> str:
+        """Eşzamanlı create isteklerini birleştirmek için normalize anahtar"""
+        normalized = " ".join(text.split())
+        digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        return f"create:{digest}:{model_name}:{temperature}"
         
     async def create_prompt(self, text: str, model_name: str = "gpt-3.5-turbo", temperature: float = 0.7) -> Dict:
+        """Yeni bir prompt oluştur; aynı metin için eşzamanlı istekler tek çalıştırmayı paylaşır"""
+        return await self._inflight.do(
+            self._create_key(text, model_name, temperature),
+            lambda: self._create_prompt(text, model_name, temperature)
+        )
+        
+    async def _create_prompt(self, text: str, model_name: str, temperature: float) -> Dict:
         """Yeni bir prompt oluştur ve ilk model yanıtını al"""
         try:
             # Model yanıtı al
             output_text, usage = await self.llm_client.call_model(text, model_name, temperature)
             
+            # Daha önce optimize edilmiş benzer promptları bul
+            band_keys = self._similarity_bands(text)
+            similar_prompts = await self.find_similar_prompts(text, band_keys)
+            
             # Veritabanı kaydı oluştur
             prompt_data = {
                 "original_prompt": text,
@@ -28,14 +144,18 @@ class PromptService:
                     "model_name": model_name,
                     "completion_text": output_text,
                     **usage,
+                    "status": "completed",
                     "timestamp": datetime.utcnow().isoformat()
                 }],
                 "status": "completed",
+                "model_name": model_name,
+                "lsh_bands": band_keys,
                 "created_at": datetime.utcnow().isoformat()
             }
             
             # Veritabanına kaydet
             prompt_id = await self.db.create_prompt(prompt_data)
+            await self._record_metrics(model_name, "completed", usage)
             
             logger.info(f"Yeni prompt oluşturuldu", extra={
                 "prompt_id": str(prompt_id),
@@ -43,67 +163,843 @@ class PromptService:
                 "tokens": usage["total_tokens"]
             })
             
-            return {"prompt_id": str(prompt_id), **prompt_data}
+            return {"prompt_id": str(prompt_id), **prompt_data, "similar_prompts": similar_prompts}
             
         except Exception as e:
             logger.error(f"Prompt oluşturma hatası: {str(e)}")
             raise
             
-    async def optimize_prompt(self, prompt_id: str) -> Dict:
+    async def optimize_prompt(
+        self,
+        prompt_id: str,
+        on_stage: Optional[StageCallback] = None,
+        epochs: Optional[int] = None,
+        candidates: Optional[int] = None
+    ) -> Dict:
+        """Var olan bir promptu optimize et; aynı prompt için eşzamanlı istekler birleştirilir
+
+        Aşamalar ortak çalıştırmadan yayımlanır; sonradan katılan istekler
+        de `on_stage` ile geçilmiş ve sonraki aşamaları alır.
+        """
+        epochs, candidates = self._search_shape(epochs, candidates)
+        key = f"optimize:{prompt_id}:{epochs}x{candidates}"
+        
+        async def publish(stage: str) -> None:
+            await self._inflight.publish(key, stage)
+            
+        return await self._inflight.do(
+            key,
+            lambda: self._optimize_prompt(prompt_id, publish, epochs, candidates),
+            on_event=on_stage
+        )
+        
+    def _search_shape(self, epochs: Optional[int], candidates: Optional[int]) -> Tuple[int, int]:
+        """Epoch ve aday sayılarını varsayılanlar ve üst sınırlarla belirle"""
+        epochs = epochs or self.settings.OPTIMIZATION_EPOCHS
+        candidates = candidates or self.settings.OPTIMIZATION_CANDIDATES
+        if not 1 <= epochs <= self.settings.OPTIMIZATION_MAX_EPOCHS:
+            raise ValueError(f"Epoch sayısı 1 ile {self.settings.OPTIMIZATION_MAX_EPOCHS} arasında olmalı")
+        if not 1 <= candidates <= self.settings.OPTIMIZATION_MAX_CANDIDATES:
+            raise ValueError(f"Aday sayısı 1 ile {self.settings.OPTIMIZATION_MAX_CANDIDATES} arasında olmalı")
+        return epochs, candidates
+        
+    async def _optimize_prompt(
+        self,
+        prompt_id: str,
+        on_stage: Optional[StageCallback] = None,
+        epochs: int = 1,
+        candidates: int = 1
+    ) -> Dict:
         """Var olan bir promptu optimize et"""
+        start = time.perf_counter()
+        OPTIMIZATIONS_IN_FLIGHT.inc()
         try:
             # Mevcut promptu getir
-            prompt_data = await self.db.get_prompt(prompt_id)
+            with stage_timer("load"):
+                prompt_data = await self.db.get_prompt(prompt_id)
             if not prompt_data:
                 raise ValueError(f"Prompt bulunamadı: {prompt_id}")
                 
             original_prompt = prompt_data["original_prompt"]
+            iteration = prompt_data["iterations"] + 1
             
-            # Optimize et
-            optimized_text, usage = await self.llm_client.optimize_prompt(original_prompt)
-            
-            # LIME analizi yap
-            lime_analysis = await self.lime_analyzer.analyze_prompt(original_prompt, optimized_text)
-            
-            # Yanıtı kaydet
-            response_data = {
-                "iteration": len(prompt_data["model_responses"]) + 1,
-                "prompt_text": original_prompt,
-                "optimized_text": optimized_text,
-                "model_name": "gpt-3.5-turbo",
-                **usage,
-                "timestamp": datetime.utcnow().isoformat(),
-                "lime_analysis": lime_analysis
-            }
+            # Benzer bir promptun önceki optimizasyonunu ara
+            with stage_timer("similar"):
+                band_keys = prompt_data.get("lsh_bands")
+                if band_keys is None and self.similarity_index is not None:
+                    band_keys = self._similarity_bands(original_prompt)
+                    await self.db.set_similarity_bands(prompt_id, band_keys)
+                similar_prompts = await self.find_similar_prompts(original_prompt, band_keys, exclude_id=prompt_id)
+                reusable = self._select_reusable(similar_prompts)
             
-            await self.db.add_model_response(prompt_id, response_data)
-            await self.db.update_prompt(prompt_id, {
-                "optimized_prompt": optimized_text,
-                "lime_analysis": lime_analysis
-            })
+            if reusable is not None:
+                # Neredeyse aynı metin: LLM ve LIME atlanır
+                response_data = self._build_reused_response(original_prompt, reusable, iteration)
+            else:
+                # Optimize et ve LIME analizi yap
+                response_data = await self._run_optimization(
+                    original_prompt,
+                    iteration=iteration,
+                    on_stage=on_stage,
+                    epochs=epochs,
+                    candidates=candidates
+                )
+            if on_stage is not None:
+                await on_stage("persist")
+            with stage_timer("persist"):
+                result = await self._persist_optimization(prompt_id, response_data)
+            result["similar_prompts"] = similar_prompts
+            return result
+            
+        except Exception as e:
+            logger.error(f"Prompt optimizasyon hatası: {str(e)}")
+            if not isinstance(e, ValueError):
+                await self._record_metrics("gpt-3.5-turbo", "failed")
+                await self._record_failure(prompt_id, e)
+            raise
+        finally:
+            OPTIMIZATIONS_IN_FLIGHT.dec()
+            self._observe_total(prompt_id, time.perf_counter() - start)
             
-            logger.info(f"Prompt optimize edildi", extra={
+    def _observe_total(self, prompt_id: str, elapsed: float) -> None:
+        """Toplam süreyi kaydet; MAX_RESPONSE_TIME aşıldıysa uyar"""
+        OPTIMIZE_STAGE_DURATION.observe(elapsed, stage="total")
+        if elapsed > self.settings.MAX_RESPONSE_TIME:
+            OPTIMIZE_SLOW_TOTAL.inc()
+            logger.warning("Optimizasyon yanıt süresi hedefini aştı", extra={
                 "prompt_id": str(prompt_id),
-                "tokens": usage["total_tokens"],
-                "confidence_score": lime_analysis["confidence_score"]
+                "elapsed_seconds": round(elapsed, 3),
+                "max_response_time": self.settings.MAX_RESPONSE_TIME
             })
             
-            # Veritabanından sonucu al ve eksik alanları doldur
-            result = await self.db.get_prompt(prompt_id)
-            if result:
-                result["prompt_id"] = str(result.pop("_id"))
-                # Eksik model_name alanlarını doldur
-                for response in result.get("model_responses", []):
-                    if "model_name" not in response:
-                        response["model_name"] = "gpt-3.5-turbo"
-                    if "lime_analysis" not in response:
-                        response["lime_analysis"] = None
-            return result
+    async def _persist_optimization(self, prompt_id: str, response_data: Dict) -> Dict:
+        """Optimizasyon yanıtını tek atomik işlemde kaydet ve güncel prompt kaydını döndür"""
+        lime_analysis = response_data["lime_analysis"]
+        
+        result = await self.db.append_model_response(prompt_id, response_data, {
+            "optimized_prompt": response_data["optimized_text"],
+            "lime_analysis": lime_analysis
+        })
+        if result is None:
+            raise ValueError(f"Prompt bulunamadı: {prompt_id}")
+        await self._record_metrics(response_data["model_name"], "completed", response_data)
+            
+        logger.info(f"Prompt optimize edildi", extra={
+            "prompt_id": str(prompt_id),
+            "iteration": result["model_responses"][-1]["iteration"],
+            "tokens": response_data["total_tokens"],
+            "confidence_score": lime_analysis["confidence_score"]
+        })
+        
+        # Eksik alanları doldur
+        result["prompt_id"] = str(result.pop("_id"))
+        for response in result.get("model_responses", []):
+            if "model_name" not in response:
+                response["model_name"] = "gpt-3.5-turbo"
+            if "lime_analysis" not in response:
+                response["lime_analysis"] = None
+        return result
+        
+    async def stream_optimize_prompt(self, prompt_id: str) -> AsyncIterator[Tuple[str, Dict]]:
+        """Optimizasyonu (olay, veri) çiftleri olarak akışla ilet
+
+        Önce LLM tamamlama parçaları (delta), ardından aşama olayları (stage),
+        metrikler (metrics) ve en son kaydedilmiş sonuç (result) gönderilir.
+        Aynı prompt için eşzamanlı akışlar tek optimizasyonu paylaşır; sonradan
+        bağlanan istemci olayları baştan alır.
+        """
+        async for event in self._inflight.stream(
+            f"stream:{prompt_id}",
+            lambda: self._stream_optimize_prompt(prompt_id)
+        ):
+            yield event
+            
+    async def _stream_optimize_prompt(self, prompt_id: str) -> AsyncIterator[Tuple[str, Dict]]:
+        """Optimizasyonu olay olarak üret"""
+        prompt_data = await self.db.get_prompt(prompt_id)
+        if not prompt_data:
+            raise ValueError(f"Prompt bulunamadı: {prompt_id}")
+            
+        original_prompt = prompt_data["original_prompt"]
+        compression = self.compress_prompt(original_prompt)
+        if compression is not None:
+            yield "stage", {"stage": "compress", "status": "completed", "compression": compression}
+            
+        if self._skips_llm(compression):
+            optimized_text = compression["text"]
+            usage = self._local_usage()
+            yield "delta", {"text": optimized_text}
+        else:
+            prompt_text = compression["text"] if compression is not None else original_prompt
+            yield "stage", {"stage": "llm", "status": "started"}
+            chunks = []
+            usage: Dict = {}
+            async for delta, final_usage in self.llm_client.stream_optimize_prompt(prompt_text):
+                if final_usage is not None:
+                    usage = final_usage
+                elif delta:
+                    chunks.append(delta)
+                    yield "delta", {"text": delta}
+            optimized_text = "".join(chunks)
+            yield "stage", {"stage": "llm", "status": "completed", "usage": usage}
+        
+        lime_analysis = await self._analyze(original_prompt, optimized_text)
+        yield "stage", {"stage": "lime", "status": "completed"}
+        yield "metrics", {
+            "confidence_score": lime_analysis["confidence_score"],
+            "token_importance": lime_analysis["token_importance"],
+            **lime_analysis["metrics"]
+        }
+        
+        response_data = self._build_response_data(
+            original_prompt,
+            optimized_text,
+            usage,
+            lime_analysis,
+            iteration=prompt_data["iterations"] + 1
+        )
+        response_data["lime_fingerprint"] = self.lime_fingerprint
+        response_data["compression"] = compression
+        result = await self._persist_optimization(prompt_id, response_data)
+        yield "stage", {"stage": "persist", "status": "completed"}
+        yield "result", result
+        
+    @staticmethod
+    def _build_response_data(
+        original_prompt: str,
+        optimized_text: str,
+        usage: Dict,
+        lime_analysis: Dict,
+        iteration: int
+    ) -> Dict:
+        """Yeni iterasyon olarak eklenecek yanıt kaydını oluştur"""
+        return {
+            "iteration": iteration,
+            "prompt_text": original_prompt,
+            "optimized_text": optimized_text,
+            "model_name": "gpt-3.5-turbo",
+            **usage,
+            "status": "completed",
+            "timestamp": datetime.utcnow().isoformat(),
+            "lime_analysis": lime_analysis
+        }
+        
+    async def _run_optimization(
+        self,
+        original_prompt: str,
+        iteration: int,
+        on_stage: Optional[StageCallback] = None,
+        epochs: int = 1,
+        candidates: int = 1
+    ) -> Dict:
+        """LLM optimizasyonu ve LIME analizini çalıştırıp yanıt kaydını oluştur"""
+        async def stage(name: str) -> None:
+            if on_stage is not None:
+                await on_stage(name)
+                
+        # Yerel kurallarla sıkıştır; bütçeye sığıyorsa LLM çağrılmaz
+        with stage_timer("compress"):
+            compression = self.compress_prompt(original_prompt)
+        search = None
+        if self._skips_llm(compression):
+            optimized_text, usage = compression["text"], self._local_usage()
+        else:
+            await stage("llm")
+            prompt_text = compression["text"] if compression is not None else original_prompt
+            with stage_timer("llm"):
+                if epochs == 1 and candidates == 1:
+                    optimized_text, usage = await self.llm_client.optimize_prompt(prompt_text)
+                else:
+                    optimized_text, usage, search = await self._search_candidates(
+                        original_prompt, prompt_text, epochs, candidates
+                    )
+        
+        # LIME analizi yalnızca kazanan aday için yapılır (olay döngüsü dışında)
+        await stage("lime")
+        with stage_timer("lime"):
+            lime_analysis = await self._analyze(original_prompt, optimized_text)
+        
+        response_data = self._build_response_data(original_prompt, optimized_text, usage, lime_analysis, iteration)
+        response_data["lime_fingerprint"] = self.lime_fingerprint
+        response_data["compression"] = compression
+        if search is not None:
+            response_data["search"] = search
+        return response_data
+        
+    @property
+    def candidate_scorer(self) -> "LIMEAnalyzer":
+        """Aday skorlayıcı; scikit-learn ilk kullanımda yüklenir
+
+        Yalnızca hafif metrikler kullanılır, LIME çalıştırılmaz.
+        """
+        if self._candidate_scorer is None:
+            from ..models.lime_analyzer import LIMEAnalyzer
+            self._candidate_scorer = LIMEAnalyzer()
+        return self._candidate_scorer
+        
+    def warm_up(self) -> None:
+        """Metin işleme ve aday skorlayıcıyı ilk istekten önce yükle"""
+        self.compress_prompt("Warm up.")
+        self.candidate_scorer._calculate_semantic_similarity("warm up", "warm up")
+        
+    def _candidate_temperatures(self, candidates: int) -> List[float]:
+        """Adayları çeşitlendirmek için sıcaklıkları aralığa eşit yay"""
+        if candidates == 1:
+            return [self.settings.DEFAULT_TEMPERATURE]
+        low = self.settings.OPTIMIZATION_MIN_TEMPERATURE
+        high = self.settings.OPTIMIZATION_MAX_TEMPERATURE
+        step = (high - low) / (candidates - 1)
+        return [round(low + step * index, 3) for index in range(candidates)]
+        
+    def _score_candidate(self, original_prompt: str, original_tokens: int, candidate: str) -> Dict:
+        """Adayı token azalması ve orijinale anlamsal benzerlikle ucuzca puanla"""
+        tokens = self.llm_client.count_tokens(candidate)
+        reduction = 1.0 - tokens / original_tokens if original_tokens else 0.0
+        try:
+            similarity = self.candidate_scorer._calculate_semantic_similarity(original_prompt, candidate)
+        except ValueError:
+            # Yalnızca stop word içeren metinlerde TF-IDF sözlüğü boş kalır
+            similarity = 0.0
+        weight = self.settings.OPTIMIZATION_SIMILARITY_WEIGHT
+        return {
+            "tokens": tokens,
+            "token_reduction": reduction,
+            "similarity": similarity,
+            "score": weight * similarity + (1 - weight) * reduction,
+            "accepted": similarity >= self.settings.OPTIMIZATION_MIN_SIMILARITY and bool(candidate.strip())
+        }
+        
+    def _budget_exhausted(self, usage: Dict, next_tokens: int = 0) -> bool:
+        """Harcanan (ve sıradaki epoch için öngörülen) kullanım bütçeyi aşıyor mu"""
+        token_budget = self.settings.OPTIMIZATION_TOKEN_BUDGET
+        cost_budget = self.settings.OPTIMIZATION_COST_BUDGET
+        if token_budget and usage["billed_tokens"] + next_tokens > token_budget:
+            return True
+        return bool(cost_budget) and usage["cost_usd"] >= cost_budget
+        
+    async def _search_candidates(
+        self,
+        original_prompt: str,
+        prompt_text: str,
+        epochs: int,
+        candidates: int
+    ) -> Tuple[str, Dict, Dict]:
+        """Her epoch'ta eşzamanlı adaylar üretip en iyisiyle devam et
+
+        Adaylar bir önceki epoch'un kazananından üretilir. Skor artışı
+        OPTIMIZATION_MIN_IMPROVEMENT altında kaldığında (sabır dolunca) ya da
+        token/maliyet bütçesine ulaşıldığında döngü erken durur. Kazanan metin,
+        toplam kullanım ve epoch özeti döndürülür.
+        """
+        original_tokens = self.llm_client.count_tokens(original_prompt)
+        temperatures = self._candidate_temperatures(candidates)
+        usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "cost_usd": 0.0, "billed_tokens": 0}
+        best: Optional[Dict] = None
+        fallback: Optional[Dict] = None
+        history = []
+        stale = 0
+        stop_reason = "max_epochs"
+        current = prompt_text
+        
+        for epoch in range(1, epochs + 1):
+            if epoch > 1 and self._budget_exhausted(
+                usage, candidates * self._estimate_optimization_tokens(current)
+            ):
+                stop_reason = "budget"
+                break
+                
+            results = await asyncio.gather(*[
+                self.llm_client.optimize_prompt(current, temperature=temperature)
+                for temperature in temperatures
+            ], return_exceptions=True)
+            
+            scored = []
+            for temperature, result in zip(temperatures, results):
+                if isinstance(result, BaseException):
+                    logger.warning(f"Aday üretilemedi: {str(result)}", extra={"epoch": epoch})
+                    continue
+                text, candidate_usage = result
+                for key in ("prompt_tokens", "completion_tokens", "total_tokens", "cost_usd"):
+                    usage[key] += candidate_usage.get(key, 0)
+                if not candidate_usage.get("cached"):
+                    usage["billed_tokens"] += candidate_usage.get("total_tokens", 0)
+                scored.append({"text": text, "temperature": temperature, **self._score_candidate(
+                    original_prompt, original_tokens, text
+                )})
+                
+            if not scored:
+                # Hiç aday üretilemediyse ilk hatayı yükselt
+                if best is None and fallback is None:
+                    raise next(result for result in results if isinstance(result, BaseException))
+                stop_reason = "failed"
+                break
+                
+            accepted = [candidate for candidate in scored if candidate["accepted"]]
+            epoch_best = max(accepted, key=lambda candidate: candidate["score"], default=None)
+            most_similar = max(scored, key=lambda candidate: candidate["similarity"])
+            if fallback is None or most_similar["similarity"] > fallback["similarity"]:
+                fallback = most_similar
+                
+            improved = epoch_best is not None and (
+                best is None or epoch_best["score"] >= best["score"] + self.settings.OPTIMIZATION_MIN_IMPROVEMENT
+            )
+            if epoch_best is not None and (best is None or epoch_best["score"] > best["score"]):
+                best = epoch_best
+                current = best["text"]
+            history.append({
+                "epoch": epoch,
+                "best_score": epoch_best["score"] if epoch_best else None,
+                "candidates": [
+                    {key: candidate[key] for key in ("temperature", "tokens", "token_reduction", "similarity", "score", "accepted")}
+                    for candidate in scored
+                ]
+            })
+            
+            stale = 0 if improved else stale + 1
+            if stale >= self.settings.OPTIMIZATION_PATIENCE:
+                stop_reason = "plateau"
+                break
+            if self._budget_exhausted(usage):
+                stop_reason = "budget"
+                break
+                
+        winner = best or fallback
+        billed_tokens = usage.pop("billed_tokens")
+        search = {
+            "epochs_run": len(history),
+            "candidates_per_epoch": candidates,
+            "stop_reason": stop_reason,
+            "best_score": winner["score"],
+            "billed_tokens": billed_tokens,
+            "epochs": history
+        }
+        logger.info("Aday araması tamamlandı", extra={
+            "epochs": len(history),
+            "candidates": candidates,
+            "stop_reason": stop_reason,
+            "tokens": usage["total_tokens"]
+        })
+        return winner["text"], usage, search
+        
+    def compress_prompt(self, text: str) -> Optional[Dict]:
+        """Promptu yerel kurallarla sıkıştır ve token tasarrufunu raporla"""
+        if self.compressor is None:
+            return None
+        budget = self.settings.COMPRESSION_TOKEN_BUDGET or None
+        compression = self.compressor.compress(text, token_budget=budget)
+        if compression["tokens_saved"] > 0:
+            logger.info("Prompt yerel olarak sıkıştırıldı", extra={
+                "tokens_saved": compression["tokens_saved"],
+                "rules": compression["applied_rules"]
+            })
+        return compression
+        
+    @staticmethod
+    def _skips_llm(compression: Optional[Dict]) -> bool:
+        return compression is not None and compression["within_budget"]
+        
+    @staticmethod
+    def _local_usage() -> Dict:
+        """Yalnızca yerel çalışan optimizasyonun kullanım kaydı"""
+        return {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "cost_usd": 0.0}
+        
+    def _similarity_bands(self, text: str) -> List[str]:
+        """Benzerlik indeksi için metnin LSH bant anahtarları"""
+        if self.similarity_index is None:
+            return []
+        return self.similarity_index.band_keys(text)
+        
+    async def find_similar_prompts(
+        self,
+        text: str,
+        band_keys: Optional[List[str]] = None,
+        exclude_id: Optional[str] = None
+    ) -> List[Dict]:
+        """Eşik üzerindeki benzer promptların önceki optimizasyonlarını getir
+
+        Adaylar LSH bant indeksinden alınır ve calculate_similarity ile
+        doğrulanır; sonuç benzerliğe göre azalan sıradadır.
+        """
+        if self.similarity_index is None:
+            return []
+        band_keys = band_keys if band_keys is not None else self._similarity_bands(text)
+        if not band_keys:
+            return []
             
+        try:
+            candidates = await self.db.find_similar_candidates(
+                band_keys,
+                exclude_id=exclude_id,
+                limit=self.settings.DEDUP_MAX_CANDIDATES
+            )
         except Exception as e:
-            logger.error(f"Prompt optimizasyon hatası: {str(e)}")
-            raise
+            logger.warning(f"Benzer prompt araması başarısız: {str(e)}")
+            return []
+            
+        matches = []
+        for candidate in candidates:
+            similarity = calculate_similarity(text, candidate["original_prompt"])
+            if similarity >= self.settings.DEDUP_OFFER_THRESHOLD:
+                matches.append({
+                    "prompt_id": candidate["_id"],
+                    "similarity": similarity,
+                    "original_prompt": candidate["original_prompt"],
+                    "optimized_prompt": candidate["optimized_prompt"],
+                    "lime_analysis": candidate.get("lime_analysis")
+                })
+        matches.sort(key=lambda match: -match["similarity"])
+        return matches[:self.settings.DEDUP_MAX_SUGGESTIONS]
+        
+    def _select_reusable(self, similar_prompts: List[Dict]) -> Optional[Dict]:
+        """Yeniden kullanım eşiğini geçen ve analizi olan en benzer eşleşme"""
+        for match in similar_prompts:
+            if match["similarity"] >= self.settings.DEDUP_REUSE_THRESHOLD and match["lime_analysis"]:
+                return match
+        return None
+        
+    def _build_reused_response(self, original_prompt: str, match: Dict, iteration: int) -> Dict:
+        """Benzer promptun optimizasyonundan maliyetsiz yanıt kaydı oluştur"""
+        response_data = self._build_response_data(
+            original_prompt,
+            match["optimized_prompt"],
+            self._local_usage(),
+            match["lime_analysis"],
+            iteration
+        )
+        response_data["reused_from"] = match["prompt_id"]
+        logger.info("Benzer promptun optimizasyonu yeniden kullanıldı", extra={
+            "reused_from": match["prompt_id"],
+            "similarity": match["similarity"]
+        })
+        return response_data
+        
+    def _analysis_key(self, original_prompt: str, optimized_text: str) -> str:
+        return AnalysisCache.make_key(original_prompt, optimized_text, self.lime_fingerprint)
+        
+    async def _analyze(self, original_prompt: str, optimized_text: str) -> Dict:
+        """LIME analizini önbellekten getir; yoksa bir kez hesaplayıp önbelleğe yaz"""
+        if self.analysis_cache is None:
+            return await self.analysis_executor.analyze(original_prompt, optimized_text)
+            
+        key = self._analysis_key(original_prompt, optimized_text)
+        cached = await self.analysis_cache.get(key)
+        if cached is not None:
+            return cached
+            
+        async def compute() -> Dict:
+            analysis = await self.analysis_executor.analyze(original_prompt, optimized_text)
+            await self.analysis_cache.set(key, analysis)
+            return analysis
+            
+        # Aynı metin çifti için eşzamanlı analizler tek hesaplamayı paylaşır
+        return await self._inflight.do(f"analyze:{key}", compute)
+        
+    async def get_token_analysis(self, prompt_id: str, iteration: Optional[int] = None) -> Optional[Dict]:
+        """Bir iterasyonun analizini yeniden hesaplamadan getir
+
+        Önce analiz önbelleğine bakılır; bulunamazsa kayıtlı analiz döndürülür.
+        Kayıtlı analiz önbelleğe yalnızca güncel LIME ayarlarıyla hesaplandıysa
+        (`lime_fingerprint` eşleşiyorsa) yazılır; eski ayarlarla hesaplanmış,
+        benzer prompttan devralınmış ya da eski biçimli kayıtlar yazılmaz.
+        """
+        stored = await self.db.get_analysis(prompt_id, iteration)
+        if stored is None:
+            return None
+            
+        analysis = None
+        if self.analysis_cache is not None and stored.get("optimized_text") is not None:
+            key = self._analysis_key(stored["prompt_text"], stored["optimized_text"])
+            analysis = await self.analysis_cache.get(key)
+            if analysis is None and stored.get("lime_fingerprint") == self.lime_fingerprint:
+                await self.analysis_cache.set(key, stored["lime_analysis"])
+                
+        return {"iteration": stored["iteration"], **(analysis or stored["lime_analysis"])}
+        
+    def _estimate_optimization_tokens(self, original_prompt: str, calls: int = 1) -> int:
+        """Hız bütçesi için optimizasyon çağrısının token tahmini"""
+        prompt_tokens = self.llm_client.count_tokens(original_prompt)
+        completion_tokens = min(prompt_tokens, self.settings.MAX_COMPLETION_TOKENS)
+        return (prompt_tokens + OPTIMIZATION_PROMPT_OVERHEAD + completion_tokens) * calls
+        
+    def check_batch_size(self, texts: List[str], prompt_ids: List[str]) -> int:
+        """Toplu işlemin öğe sayısını doğrula ve döndür (yinelenen ID'ler bir kez sayılır)"""
+        total = len(texts) + len(set(prompt_ids))
+        if total == 0:
+            raise ValueError("Toplu işlem için en az bir metin veya prompt ID gerekli")
+        if total > self.settings.BATCH_MAX_SIZE:
+            raise ValueError(f"Toplu işlem en fazla {self.settings.BATCH_MAX_SIZE} öğe içerebilir")
+        return total
+
+    async def optimize_batch(
+        self,
+        texts: Optional[List[str]] = None,
+        prompt_ids: Optional[List[str]] = None,
+        concurrency: Optional[int] = None
+    ) -> Dict:
+        """Metin ve prompt ID listesini sınırlı eşzamanlılık ve hız bütçesiyle optimize et
+
+        Metinler yeni prompt kaydı olarak, prompt ID'leri mevcut kayda yeni
+        iterasyon olarak eklenir. Kayıtlar bulk write ile toplu yazılır.
+        """
+        texts = texts or []
+        # Aynı ID iki kez işlenirse iterasyon numaraları çakışır
+        prompt_ids = list(dict.fromkeys(prompt_ids or []))
+        total = self.check_batch_size(texts, prompt_ids)
+            
+        # LIME kuyruğunu taşırmamak için eşzamanlılığı yürütücü kapasitesiyle sınırla
+        concurrency = min(
+            concurrency or self.settings.BATCH_CONCURRENCY,
+            self.analysis_executor.capacity
+        )
+        started_at = time.monotonic()
+        stored_prompts = await self.db.get_prompts_for_optimization(prompt_ids)
+        writer = _BatchWriter(self.db, self.settings.BATCH_WRITE_SIZE)
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        items = [("text", text) for text in texts] + [("prompt_id", pid) for pid in prompt_ids]
+        
+        async def run(index: int, source: str, value: str) -> Dict:
+            async with semaphore:
+                return await self._optimize_batch_item(index, source, value, stored_prompts, writer)
+                
+        results = await asyncio.gather(*[
+            run(index, source, value) for index, (source, value) in enumerate(items)
+        ])
+        await writer.flush()
+        await asyncio.gather(*[
+            self._record_metrics("gpt-3.5-turbo", item["status"], item) for item in results
+        ])
+        
+        completed = [item for item in results if item["status"] == "completed"]
+        summary = {
+            "items": results,
+            "succeeded": len(completed),
+            "failed": len(results) - len(completed),
+            "total_tokens": sum(item["total_tokens"] for item in completed),
+            "total_cost_usd": sum(item["cost_usd"] for item in completed),
+            "concurrency": concurrency,
+            "duration_seconds": time.monotonic() - started_at
+        }
+        logger.info("Toplu optimizasyon tamamlandı", extra={
+            "items": total,
+            "succeeded": summary["succeeded"],
+            "failed": summary["failed"],
+            "tokens": summary["total_tokens"]
+        })
+        return summary
+        
+    async def _optimize_batch_item(
+        self,
+        index: int,
+        source: str,
+        value: str,
+        stored_prompts: Dict[str, Dict],
+        writer: "_BatchWriter"
+    ) -> Dict:
+        """Toplu işlemdeki tek bir öğeyi optimize et ve yazma kuyruğuna ekle"""
+        result = {
+            "index": index,
+            "source": source,
+            "prompt_id": value if source == "prompt_id" else None,
+            "status": "failed",
+            "optimized_prompt": None,
+            "total_tokens": 0,
+            "cost_usd": 0.0,
+            "error": None
+        }
+        try:
+            if source == "prompt_id":
+                prompt = stored_prompts.get(value)
+                if prompt is None:
+                    raise ValueError(f"Prompt bulunamadı: {value}")
+                original_prompt = prompt["original_prompt"]
+                iteration = prompt["iterations"] + 1
+            else:
+                original_prompt = value
+                iteration = 1
+                
+            # Döngü açıksa istek ve token bütçesi en kötü durum çağrı sayısıyla ayrılır
+            calls = self.settings.OPTIMIZATION_EPOCHS * self.settings.OPTIMIZATION_CANDIDATES
+            estimated_tokens = self._estimate_optimization_tokens(original_prompt, calls=calls)
+            await self.rate_limiter.acquire(estimated_tokens, requests=calls)
+            response_data = await self._run_optimization(
+                original_prompt,
+                iteration,
+                epochs=self.settings.OPTIMIZATION_EPOCHS,
+                candidates=self.settings.OPTIMIZATION_CANDIDATES
+            )
+            actual_tokens = 0 if response_data.get("cached") else response_data["total_tokens"]
+            self.rate_limiter.record_usage(estimated_tokens, actual_tokens)
             
+            result.update({
+                "status": "completed",
+                "optimized_prompt": response_data["optimized_text"],
+                "total_tokens": response_data["total_tokens"],
+                "cost_usd": response_data["cost_usd"]
+            })
+            update_data = {
+                "optimized_prompt": response_data["optimized_text"],
+                "lime_analysis": response_data["lime_analysis"]
+            }
+            if source == "prompt_id":
+                writer.add_update(value, response_data, update_data, result)
+            else:
+                object_id = ObjectId()
+                result["prompt_id"] = str(object_id)
+                writer.add_insert({
+                    "_id": object_id,
+                    "original_prompt": original_prompt,
+                    "model_responses": [response_data],
+                    "status": "completed",
+                    "model_name": "gpt-3.5-turbo",
+                    "lsh_bands": self._similarity_bands(original_prompt),
+                    "created_at": datetime.utcnow().isoformat(),
+                    **update_data
+                }, result)
+            await writer.flush_if_full()
+            
+        except Exception as e:
+            logger.error(f"Toplu optimizasyon öğe hatası: {str(e)}", extra={"index": index})
+            result["status"] = "failed"
+            result["error"] = str(e)
+            if source == "prompt_id" and not isinstance(e, ValueError):
+                await self._record_failure(value, e)
+            
+        return result
+        
+    async def get_visualization(
+        self,
+        prompt_id: str,
+        kind: str,
+        iteration: Optional[int] = None
+    ) -> Optional[Tuple[str, Dict]]:
+        """Kayıtlı analizden figürü isteğe bağlı oluştur; (ETag, figür) döndür
+
+        İterasyonlar kaydedildikten sonra değişmediği için (prompt, iterasyon,
+        tip) üçlüsü figürü tek başına belirler ve ETag olarak kullanılır.
+        """
+        analysis = await self.db.get_analysis(prompt_id, iteration)
+        if analysis is None:
+            return None
+            
+        etag = f'"{prompt_id}-{analysis["iteration"]}-{kind}"'
+        figure = self.visualization_cache.get(etag)
+        if figure is None:
+            figure = build_figure(kind, analysis["lime_analysis"])
+            self.visualization_cache.set(etag, figure)
+        return etag, figure
+        
+    @staticmethod
+    def _encode_cursor(after: Optional[Tuple[str, str]]) -> Optional[str]:
+        """(created_at, _id) çiftini opak imlece çevir"""
+        if after is None:
+            return None
+        return base64.urlsafe_b64encode(json.dumps(after).encode("utf-8")).decode("ascii")
+        
+    @staticmethod
+    def _decode_cursor(cursor: Optional[str]) -> Optional[Tuple[str, str]]:
+        """Opak imleci (created_at, _id) çiftine çevir"""
+        if not cursor:
+            return None
+        try:
+            created_at, last_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        except (binascii.Error, UnicodeError, ValueError, TypeError):
+            raise ValueError("Geçersiz imleç")
+        if not isinstance(created_at, str) or not ObjectId.is_valid(last_id):
+            raise ValueError("Geçersiz imleç")
+        return created_at, last_id
+        
+    async def list_prompts(
+        self,
+        status: Optional[str] = None,
+        model_name: Optional[str] = None,
+        min_cost: Optional[float] = None,
+        max_cost: Optional[float] = None,
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        include_details: bool = False
+    ) -> Dict:
+        """Promptları filtreleyip imleç tabanlı sayfalarla listele"""
+        limit = min(limit or self.settings.PROMPTS_PAGE_SIZE, self.settings.PROMPTS_MAX_PAGE_SIZE)
+        items, next_after = await self.db.list_prompts(
+            status=status,
+            model_name=model_name,
+            min_cost=min_cost,
+            max_cost=max_cost,
+            search=search,
+            after=self._decode_cursor(cursor),
+            limit=limit,
+            include_details=include_details
+        )
+        for item in items:
+            item["prompt_id"] = item.pop("_id")
+        return {"items": items, "next_cursor": self._encode_cursor(next_after)}
+        
+    async def list_iterations(
+        self,
+        prompt_id: str,
+        cursor: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Optional[Dict]:
+        """Prompt iterasyonlarını imleç tabanlı sayfalarla getir"""
+        limit = min(limit or self.settings.ITERATIONS_PAGE_SIZE, self.settings.ITERATIONS_MAX_PAGE_SIZE)
+        page = await self.db.list_iterations(prompt_id, after=cursor, limit=limit)
+        if page is None:
+            return None
+        items, next_cursor = page
+        for item in items:
+            item.setdefault("model_name", "gpt-3.5-turbo")
+            item.setdefault("lime_analysis", None)
+        return {"prompt_id": prompt_id, "items": items, "next_cursor": next_cursor}
+        
+    def get_cache_stats(self) -> Dict:
+        """LLM yanıt ve LIME analiz önbelleği istatistiklerini getir"""
+        cache = self.llm_client.cache
+        stats = {"enabled": False} if cache is None else {"enabled": True, **cache.stats()}
+        stats["analysis"] = (
+            {"enabled": False} if self.analysis_cache is None
+            else {"enabled": True, **self.analysis_cache.stats()}
+        )
+        return stats
+        
+    async def _record_metrics(self, model_name: str, status: str, usage: Optional[Dict] = None) -> None:
+        """Günlük özetler açıksa kullanımı kaydet; hata optimizasyonu etkilemez"""
+        if self.metrics_store is None:
+            return
+        try:
+            await self.metrics_store.record(model_name, status, usage)
+        except Exception as e:
+            logger.warning(f"Metrik özeti güncellenemedi: {str(e)}")
+            
+    async def _record_failure(self, prompt_id: str, error: Exception, model_name: str = "gpt-3.5-turbo") -> None:
+        """Başarısız denemeyi canlı özet için prompt kaydına yaz; hata optimizasyonu etkilemez"""
+        try:
+            await self.db.record_failed_attempt(prompt_id, {
+                "status": "failed",
+                "model_name": model_name,
+                "error": str(error),
+                "timestamp": datetime.utcnow().isoformat()
+            })
+        except Exception as e:
+            logger.warning(f"Başarısız deneme kaydedilemedi: {str(e)}")
+            
+    async def get_metrics_summary(
+        self,
+        group_by: List[str],
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        source: str = "live"
+    ) -> Dict:
+        """Model, gün ve durum bazında kullanım ve maliyet özeti"""
+        if source == "rollup":
+            if self.metrics_store is None:
+                raise ValueError("Günlük özetler etkin değil (METRICS_ROLLUPS_ENABLED)")
+            summary = await self.metrics_store.summary(group_by, start, end)
+        else:
+            summary = await self.db.get_metrics_summary(group_by, start, end)
+        return {"group_by": group_by, "source": source, **summary}
+        
     async def get_metrics(self, prompt_id: str) -> Dict:
         """Prompt metrikleri getir"""
         try:
@@ -0,0 +1,44 @@
+from typing import Any, Hashable, Optional
+from collections import OrderedDict
+import time
+
+class LRUCache:
+    """Boyut ve TTL ile sınırlı, süreç içi LRU önbellek"""
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Anahtarı getir, süresi dolmuşsa sil"""
+        item = self._data.get(key)
+        if item is None:
+            return None
+
+        expires_at, value = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Anahtarı kaydet, kapasite aşılırsa en eskisini çıkar"""
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """Anahtarı sil"""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Önbelleği temizle"""
+        self._data.clear()
@@ -0,0 +1,209 @@
+from typing import Callable, Dict, List, Optional
+import re
+
+from .text_processing import (
+    tokenize_text,
+    preprocess_text,
+    remove_stopwords,
+    extract_key_phrases,
+    split_sentences,
+    detokenize
+)
+
+# Yalnızca nezaket kalıpları (büyük/küçük harf duyarsız, kelime sınırlı). "just",
+# "very", "if possible" gibi anlamı değiştirebilen kelimeler bilerek yok.
+# Cümle başında isteği yumuşatan kalıplar; ardından gelen fiille cümle sürer
+LEADING_PHRASES = [
+    "i would like to ask you to",
+    "i would like you to",
+    "i want you to",
+    "could you please",
+    "can you please",
+    "would you please",
+    "please",
+    "kindly",
+    "lütfen"
+]
+# Cümle sonuna virgülle eklenen ya da tek başına cümle olan nezaket ifadeleri
+TRAILING_PHRASES = [
+    "thank you in advance",
+    "thanks in advance",
+    "thank you very much",
+    "thank you",
+    "thanks",
+    "if you don't mind",
+    "please",
+    "lütfen",
+    "rica ediyorum",
+    "şimdiden teşekkürler",
+    "teşekkür ederim",
+    "teşekkürler"
+]
+FILLER_PHRASES = list(dict.fromkeys(LEADING_PHRASES + TRAILING_PHRASES))
+
+def _alternation(phrases: List[str]) -> str:
+    return "|".join(re.escape(phrase) for phrase in phrases)
+
+# Cümle/satır başı; ifadeden sonra cümle sürmeli ("Please summarize" -> "Summarize")
+LEADING_PATTERN = re.compile(
+    r"(^|[.!?][ \t]+|\n[ \t]*)(?:" + _alternation(LEADING_PHRASES) + r")\b,?[ \t]+([^\W\d_])",
+    re.IGNORECASE
+)
+# ", thanks." gibi virgülle eklenmiş kapanış ya da yalnızca ifadeden oluşan cümle
+TRAILING_PATTERN = re.compile(
+    r",[ \t]*(?:" + _alternation(TRAILING_PHRASES) + r")\b(?=[ \t]*(?:[.!?]|\n|$))"
+    r"|(?:^|(?<=[.!?])[ \t]+|(?<=\n))[ \t]*(?:" + _alternation(TRAILING_PHRASES) + r")\b"
+    r"(?:[.!]+(?=\s|$)|(?=[ \t]*(?:\n|$)))",
+    re.IGNORECASE
+)
+# Tırnak içi metin ve kod hiçbir zaman değiştirilmez; istenen çıktının parçası olabilir
+QUOTED_PATTERN = re.compile(
+    r"```.*?```|`[^`\n]*`|\"[^\"\n]*\"|“[^”\n]*”|‘[^’\n]*’|(?<!\w)'[^'\n]*'(?!\w)",
+    re.DOTALL
+)
+# Korunan bölümlerin yerine geçici olarak konan işaret
+_PLACEHOLDER = "\x00{}\x00"
+FILLER_WORDS = {word for phrase in FILLER_PHRASES for word in preprocess_text(phrase).split()}
+
+# Stop word listesinde olsa da anlamı tersine çeviren kelimeler korunur
+NEGATIONS = {"no", "nor", "not", "never", "n't", "don't", "doesn't", "didn't", "isn't", "aren't", "won't", "can't"}
+
+def _tidy(text: str) -> str:
+    """Silme sonrası kalan boşluk ve noktalama artıklarını düzelt; satır sonları korunur"""
+    text = re.sub(r"(?<=\S)[ \t]+", " ", text)
+    text = re.sub(r"[ \t]+(?=\n|$)", "", text)
+    text = re.sub(r"(?<=\S) ([,.;:!?])", r"\1", text)
+    text = re.sub(r"([,;:])(?=[,.;:!?])", "", text)
+    text = re.sub(r"(^|[.!?] |\n[ \t]*)[,;:] ?", r"\1", text)
+    return text.strip(" ,;:\n")
+
+def normalize_whitespace(text: str) -> str:
+    """Satır içi yinelenen boşlukları teke indir
+
+    Satır sonları ve satır başı girintileri (liste, kod bloğu, örnekler)
+    korunur; yalnızca satır sonundaki boşluklar ve baştaki/sondaki boş
+    satırlar atılır.
+    """
+    text = re.sub(r"(?<=\S)[ \t]+", " ", text)
+    text = re.sub(r"[ \t]+(?=\n|$)", "", text)
+    return text.strip("\n")
+
+def remove_filler_phrases(text: str) -> str:
+    """Cümle başı ve sonundaki nezaket ifadelerini kaldır
+
+    Cümlenin ortasındaki, iki nokta sonrasındaki ya da tırnak/kod içindeki
+    ifadeler isteğin konusu olabileceğinden korunur ("Translate the word
+    please", "Reply with exactly: thanks", "prints 'Thank you'").
+    """
+    spans: List[str] = []
+
+    def protect(match: re.Match) -> str:
+        spans.append(match.group(0))
+        return _PLACEHOLDER.format(len(spans) - 1)
+
+    masked = QUOTED_PATTERN.sub(protect, text)
+    # Baştaki ifade silinince ardından gelen kelime büyük harfle başlar
+    stripped = LEADING_PATTERN.sub(lambda m: m.group(1) + m.group(2).upper(), masked)
+    stripped = TRAILING_PATTERN.sub("", stripped)
+    if stripped == masked:
+        return text
+    # Yalnızca nezaket ifadesinden oluşan satırlar tamamen atılır
+    stripped = "\n".join(
+        line for before, line in zip(masked.split("\n"), stripped.split("\n"))
+        if line.strip() or not before.strip()
+    )
+    return _tidy(re.sub(r"\x00(\d+)\x00", lambda m: spans[int(m.group(1))], stripped))
+
+def remove_duplicate_sentences(text: str) -> str:
+    """Aynı içeriğe sahip tekrar eden cümleleri kaldır
+
+    Satır yapısı korunur; ``` blokları içindeki satırlara dokunulmaz.
+    """
+    seen = set()
+    lines = []
+    in_code = False
+    for line in text.split("\n"):
+        if line.lstrip().startswith("```"):
+            in_code = not in_code
+        if in_code or line.lstrip().startswith("```"):
+            lines.append(line)
+            continue
+        indent = line[:len(line) - len(line.lstrip())]
+        sentences = []
+        for sentence in split_sentences(line) if line.strip() else []:
+            key = preprocess_text(sentence)
+            if key and key in seen:
+                continue
+            seen.add(key)
+            sentences.append(sentence.strip())
+        # Tamamen tekrar olan satır atılır, boş satırlar (paragraflar) kalır
+        if sentences or not line.strip():
+            lines.append(indent + " ".join(sentences))
+    return "\n".join(lines)
+
+def drop_stopwords(text: str) -> str:
+    """Olumsuzluk kelimeleri dışındaki stop word'leri kaldır (kayıplı)"""
+    tokens = tokenize_text(text)
+    removed = set(tokens) - set(remove_stopwords(tokens))
+    kept = [token for token in tokens if token not in removed or token.lower() in NEGATIONS]
+    return _tidy(detokenize(kept))
+
+COMPRESSION_RULES: Dict[str, Callable[[str], str]] = {
+    "whitespace": normalize_whitespace,
+    "filler": remove_filler_phrases,
+    "duplicates": remove_duplicate_sentences,
+    "stopwords": drop_stopwords
+}
+
+class PromptCompressor:
+    """Promptu LLM çağrısından önce kural tabanlı, deterministik olarak sıkıştırır
+
+    Kurallar verilen sırayla uygulanır. Bir kural metni boşaltırsa ya da
+    orijinalin anahtar ifadelerinden birini düşürürse çıktısı yok sayılır.
+    Token sayıları verilen sayıcıyla (tiktoken) ölçülür.
+    """
+
+    def __init__(
+        self,
+        rules: List[str],
+        count_tokens: Callable[[str], int],
+        key_phrases: int = 5
+    ):
+        unknown = [rule for rule in rules if rule not in COMPRESSION_RULES]
+        if unknown:
+            raise ValueError(f"Bilinmeyen sıkıştırma kuralları: {unknown}")
+        self.rules = rules
+        self.count_tokens = count_tokens
+        self.key_phrases = key_phrases
+
+    def _protected_terms(self, text: str) -> set:
+        """Sıkıştırmadan sonra da metinde kalması gereken anahtar ifadeler"""
+        return {
+            phrase for phrase in extract_key_phrases(text, self.key_phrases)
+            if phrase not in FILLER_WORDS
+        }
+
+    def compress(self, text: str, token_budget: Optional[int] = None) -> Dict:
+        """Kuralları uygula; sıkıştırılmış metni ve token tasarrufunu döndür"""
+        protected = self._protected_terms(text)
+        current = text
+        applied = []
+        for name in self.rules:
+            candidate = COMPRESSION_RULES[name](current)
+            if not candidate.strip() or candidate == current:
+                continue
+            if not protected <= set(tokenize_text(preprocess_text(candidate))):
+                continue
+            current = candidate
+            applied.append(name)
+
+        original_tokens = self.count_tokens(text)
+        compressed_tokens = self.count_tokens(current) if applied else original_tokens
+        return {
+            "text": current,
+            "original_tokens": original_tokens,
+            "compressed_tokens": compressed_tokens,
+            "tokens_saved": original_tokens - compressed_tokens,
+            "applied_rules": applied,
+            "within_budget": token_budget is not None and compressed_tokens <= token_budget
+        }
@@ -0,0 +1,290 @@
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from contextlib import contextmanager
+import threading
+import time
+
+# Saniye cinsinden varsayılan histogram sınırları
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    """Etiket değerlerine göre tutulan tek bir Prometheus metriği"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} etiketleri {self.labelnames} olmalı: {sorted(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+class Counter(_Metric):
+    """Yalnızca artan sayaç"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Sayaç azaltılamaz")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+class Gauge(_Metric):
+    """Artıp azalabilen anlık değer; isteğe bağlı olarak okuma anında hesaplanır"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._function: Optional[Callable[[], float]] = None
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Değeri her okumada verilen fonksiyondan al (etiketsiz gauge için)"""
+        self._function = function
+
+    @contextmanager
+    def track_inprogress(self, **labels: str) -> Iterator[None]:
+        """Blok süresince değeri bir artır"""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def samples(self) -> List[str]:
+        if self._function is not None:
+            try:
+                return [f"{self.name} {_format_value(self._function())}"]
+            except Exception:
+                return []
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+class Histogram(_Metric):
+    """Kümülatif kovalı süre dağılımı"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # Etiket -> (kova sayıları, toplam, adet)
+        self._values: Dict[LabelValues, Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self._values[key] = (counts, total + value, count + 1)
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Blok süresini gözlemle"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = [(key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items()]
+        lines = []
+        for key, (counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+class MetricsRegistry:
+    """Metrikleri toplar ve Prometheus metin biçiminde sunar"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metrik zaten kayıtlı: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "http_request_duration_seconds",
+    "HTTP istek süresi (rota şablonu ve duruma göre)",
+    ("method", "route", "status")
+))
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "http_requests_in_flight",
+    "İşlenmekte olan HTTP istekleri"
+))
+OPTIMIZE_STAGE_DURATION = REGISTRY.register(Histogram(
+    "optimize_stage_duration_seconds",
+    "Optimizasyon aşamalarının süresi",
+    ("stage",)
+))
+OPTIMIZE_SLOW_TOTAL = REGISTRY.register(Counter(
+    "optimize_slow_total",
+    "MAX_RESPONSE_TIME süresini aşan optimizasyonlar"
+))
+OPTIMIZATIONS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "optimizations_in_flight",
+    "Devam eden optimizasyonlar"
+))
+LLM_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "llm_request_duration_seconds",
+    "LLM çağrı süresi (önbellekten dönenler dahil)",
+    ("model", "cached")
+))
+LLM_REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "llm_requests_in_flight",
+    "Devam eden LLM çağrıları"
+))
+LLM_TOKENS_TOTAL = REGISTRY.register(Counter(
+    "llm_tokens_total",
+    "Faturalanan LLM tokenları",
+    ("model", "kind")
+))
+LLM_COST_USD_TOTAL = REGISTRY.register(Counter(
+    "llm_cost_usd_total",
+    "LLM maliyeti (USD)",
+    ("model",)
+))
+LLM_ERRORS_TOTAL = REGISTRY.register(Counter(
+    "llm_errors_total",
+    "Başarısız LLM çağrıları",
+    ("model",)
+))
+ANALYSIS_DURATION = REGISTRY.register(Histogram(
+    "analysis_duration_seconds",
+    "LIME analizi süresi (kuyrukta bekleme dahil)"
+))
+ANALYSIS_PENDING = REGISTRY.register(Gauge(
+    "analysis_pending",
+    "Analiz yürütücüsünde çalışan ve bekleyen görevler"
+))
+LOG_RECORDS_DROPPED = REGISTRY.register(Gauge(
+    "log_records_dropped",
+    "Log kuyruğu dolduğu için düşürülen kayıtlar"
+))
+
+def stage_timer(stage: str):
+    """Optimizasyon aşaması için süre ölçer"""
+    return OPTIMIZE_STAGE_DURATION.time(stage=stage)
+
+def record_llm_usage(model: str, usage: Dict) -> None:
+    """LLM kullanımını token ve maliyet sayaçlarına ekle; önbellek isabetleri faturalanmaz"""
+    if usage.get("cached"):
+        return
+    LLM_TOKENS_TOTAL.inc(usage.get("prompt_tokens", 0), model=model, kind="prompt")
+    LLM_TOKENS_TOTAL.inc(usage.get("completion_tokens", 0), model=model, kind="completion")
+    LLM_COST_USD_TOTAL.inc(usage.get("cost_usd", 0.0), model=model)
+
+class MetricsMiddleware:
+    """İstek sürelerini rota şablonu ve durum koduna göre ölçen ASGI ara katmanı
+
+    Rota, FastAPI'nin eşleşmeden sonra kapsama yazdığı şablondan alınır;
+    böylece yol parametreleri etiket sayısını büyütmez.
+    """
+
+    def __init__(self, app, exclude_paths: Sequence[str] = ()):
+        self.app = app
+        self.exclude_paths = set(exclude_paths)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status["code"])
+            )
@@ -1,44 +1,178 @@
 import logging
+import logging.handlers
+import atexit
 import json
+import multiprocessing
+import os
+import queue
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 import sys
 
+from ..config.settings import get_settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson isteğe bağlı
+    orjson = None
+
+# LogRecord'un kendi alanları; geri kalanlar `extra=` ile verilmiştir
+RESERVED_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+def _dumps(data: Dict[str, Any]) -> str:
+    """JSON'a çevir; orjson kuruluysa onu kullan"""
+    if orjson is not None:
+        return orjson.dumps(data, default=str).decode("utf-8")
+    return json.dumps(data, default=str, ensure_ascii=False)
+
 class CustomJSONFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
         log_data: Dict[str, Any] = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.utcfromtimestamp(record.created).isoformat(),
             "level": record.levelname,
             "message": record.getMessage(),
             "module": record.module,
             "function": record.funcName,
             "line": record.lineno
         }
-        
-        if hasattr(record, "extra"):
-            log_data.update(record.extra)
-            
+
+        # `extra=` alanları kayda doğrudan öznitelik olarak eklenir
+        for key, value in record.__dict__.items():
+            if key not in RESERVED_ATTRS and key not in log_data:
+                log_data[key] = value
+
         if record.exc_info:
             log_data["exception"] = self.formatException(record.exc_info)
-            
-        return json.dumps(log_data)
+
+        return _dumps(log_data)
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """Kayıtları sınırlı kuyruğa yazan, G/Ç yapmayan handler
+
+    Kuyruk dolduğunda "drop" politikasında kayıt düşürülür, "block"
+    politikasında en fazla `block_timeout` saniye beklenir.
+    """
+
+    def __init__(self, log_queue: queue.Queue, policy: str = "drop", block_timeout: float = 0.1):
+        if policy not in ("drop", "block"):
+            raise ValueError(f"Geçersiz log kuyruğu politikası: {policy}")
+        super().__init__(log_queue)
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Kuyruk süreç içinde kaldığından kayıt kopyalanmaz; biçimlendirme
+        # dinleyici iş parçacığında yapılır. Yalnızca mesaj şimdi sabitlenir.
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if self.policy == "block":
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+def _is_child_process() -> bool:
+    """LIME veya uvicorn işçisi gibi bir alt süreçte miyiz
+
+    parent_process() spawn ile başlatılan süreçte modüller içe aktarılırken
+    henüz atanmamıştır; süreç adı ise o sırada ayarlanmış olur.
+    """
+    return multiprocessing.current_process().name != "MainProcess"
+
+# Logger adı -> kuyruğu tüketen dinleyici
+_listeners: Dict[str, logging.handlers.QueueListener] = {}
+
+def _create_console_handler() -> logging.Handler:
+    """Konsol handler'ı; alt süreçler (LIME işçileri, uvicorn işçileri) stderr'e yazar"""
+    stream = sys.stdout if not _is_child_process() else sys.stderr
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(CustomJSONFormatter())
+    return handler
+
+def _create_file_handler(path: str) -> logging.Handler:
+    """Boyut veya zaman bazlı dönen dosya handler'ı"""
+    settings = get_settings()
+    if settings.LOG_ROTATION == "time":
+        handler = logging.handlers.TimedRotatingFileHandler(
+            path,
+            when=settings.LOG_ROTATION_WHEN,
+            backupCount=settings.LOG_BACKUP_COUNT,
+            encoding="utf-8",
+            utc=True
+        )
+    else:
+        handler = logging.handlers.RotatingFileHandler(
+            path,
+            maxBytes=settings.LOG_MAX_BYTES,
+            backupCount=settings.LOG_BACKUP_COUNT,
+            encoding="utf-8"
+        )
+    handler.setFormatter(CustomJSONFormatter())
+    return handler
 
 def setup_logger(name: str = "prompt_optimizer") -> logging.Logger:
-    """Yapılandırılmış logger oluştur"""
+    """Yapılandırılmış logger oluştur
+
+    Çağıran yalnızca kaydı kuyruğa ekler; JSON biçimlendirme ve konsol
+    yazımı arka plandaki QueueListener iş parçacığında yapılır. Dosya
+    handler'ı içe aktarmada değil, sunucu başlarken `enable_file_logging`
+    ile eklenir; böylece işçi süreçleri aynı dosyayı döndürmeye çalışmaz.
+    """
+    settings = get_settings()
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
-    
-    # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(CustomJSONFormatter())
-    logger.addHandler(console_handler)
-    
-    # File handler
-    file_handler = logging.FileHandler(f"logs/{name}.log")
-    file_handler.setFormatter(CustomJSONFormatter())
-    logger.addHandler(file_handler)
-    
+    logger.propagate = False
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    queue_handler = BoundedQueueHandler(
+        log_queue,
+        policy=settings.LOG_QUEUE_POLICY,
+        block_timeout=settings.LOG_QUEUE_BLOCK_TIMEOUT
+    )
+    logger.addHandler(queue_handler)
+
+    listener = logging.handlers.QueueListener(log_queue, _create_console_handler(), respect_handler_level=True)
+    listener.start()
+    _listeners[name] = listener
+    # Çıkışta kuyrukta kalan kayıtlar yazılır
+    atexit.register(listener.stop)
+
     return logger
 
+def enable_file_logging(name: str = "prompt_optimizer") -> Optional[str]:
+    """Logger'a dönen dosya handler'ı ekle ve dosya yolunu döndür
+
+    Sunucu sürecinde (lifespan başlangıcı) bir kez çağrılır. Çok işçili
+    uvicorn gibi alt süreçlerde her süreç kendi dosyasına (`ad.<pid>.log`)
+    yazar; dönen dosyalar süreçler arasında paylaşılmaz.
+    """
+    listener = _listeners.get(name)
+    if listener is None:
+        return None
+    for handler in listener.handlers:
+        if isinstance(handler, logging.FileHandler):
+            return handler.baseFilename
+
+    settings = get_settings()
+    os.makedirs(settings.LOG_DIR, exist_ok=True)
+    filename = f"{name}.log" if not _is_child_process() else f"{name}.{os.getpid()}.log"
+    handler = _create_file_handler(os.path.join(settings.LOG_DIR, filename))
+    # Dinleyici handler demetini her kayıtta baştan okur
+    listener.handlers = (*listener.handlers, handler)
+    return handler.baseFilename
+
+def log_queue_stats(logger: logging.Logger) -> Dict[str, int]:
+    """Log kuyruğundaki bekleyen ve düşürülen kayıt sayıları"""
+    for handler in logger.handlers:
+        if isinstance(handler, BoundedQueueHandler):
+            return {"queued": handler.queue.qsize(), "dropped": handler.dropped}
+    return {"queued": 0, "dropped": 0}
+
 # Global logger instance
-logger = setup_logger() 
\ No newline at end of file
+logger = setup_logger()
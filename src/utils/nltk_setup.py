@@ -0,0 +1,41 @@
+"""NLTK verilerini ayarlardaki dizine tek seferde indirir
+
+Ağ erişimi olan bir ortamda (ör. imaj derlemesi) çalıştırılır; uygulama
+çalışırken indirme yapmaz.
+
+Kullanım:
+    python -m src.utils.nltk_setup [--dir nltk_data]
+"""
+from typing import Dict, Optional
+import argparse
+import os
+
+from ..config.settings import get_settings
+from .text_processing import NLTK_RESOURCES
+
+def provision(data_dir: Optional[str] = None) -> Dict[str, bool]:
+    """Gerekli NLTK kaynaklarını dizine indir; kaynak başına sonucu döndür"""
+    import nltk
+    data_dir = data_dir or get_settings().NLTK_DATA_DIR
+    os.makedirs(data_dir, exist_ok=True)
+    return {
+        resource: bool(nltk.download(resource, download_dir=data_dir, quiet=True))
+        for resource in NLTK_RESOURCES
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="NLTK verilerini yerel dizine indirir")
+    parser.add_argument("--dir", default=None, help="Hedef dizin (varsayılan: NLTK_DATA_DIR)")
+    args = parser.parse_args()
+
+    data_dir = args.dir or get_settings().NLTK_DATA_DIR
+    results = provision(data_dir)
+    for resource, ok in results.items():
+        print(f"{resource}: {'tamam' if ok else 'indirilemedi'}")
+
+    # Kurulan verilerin kullanılabildiğini doğrula
+    os.environ["NLTK_DATA_DIR"] = data_dir
+    get_settings.cache_clear()
+    from .text_processing import ensure_nltk_data
+    ensure_nltk_data()
+    print(f"NLTK verileri hazır: {data_dir}")
@@ -0,0 +1,75 @@
+from typing import Deque, Tuple
+from collections import deque
+import asyncio
+import time
+
+class RateLimiter:
+    """Dakika başına istek ve token bütçesine uyan asenkron sınırlayıcı
+
+    Kayan 60 saniyelik pencerede yapılan istekleri ve harcanan tokenları
+    tutar. Bütçe doluysa en eski kayıt pencereden çıkana kadar bekletir.
+    Bekleyenler geliş sırasına göre (FIFO) hizmet alır.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, period: float = 60.0):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.period = period
+        self._requests: Deque[float] = deque()
+        self._tokens: Deque[Tuple[float, int]] = deque()
+        self._used_tokens = 0
+        self._lock = asyncio.Lock()
+
+    def _prune(self, now: float) -> None:
+        while self._requests and self._requests[0] <= now - self.period:
+            self._requests.popleft()
+        while self._tokens and self._tokens[0][0] <= now - self.period:
+            self._used_tokens -= self._tokens.popleft()[1]
+
+    def _wait_time(self, tokens: int, requests: int, now: float) -> float:
+        """Bütçe uygunsa 0, değilse beklenecek süre"""
+        waits = []
+        excess_requests = len(self._requests) + requests - self.requests_per_minute
+        if excess_requests > 0 and self._requests:
+            # Yeterli istek hakkı serbest kalana kadar beklenecek kayıt;
+            # tek başına sınırı aşan grup, pencere boşaldığında geçebilir
+            index = min(excess_requests, len(self._requests)) - 1
+            waits.append(self._requests[index] + self.period - now)
+        # Tek başına bütçeyi aşan istek, pencere boşaldığında geçebilir
+        if self._used_tokens + tokens > self.tokens_per_minute and self._tokens:
+            # Yeterli token serbest kalana kadar beklenecek kayıt
+            excess = self._used_tokens + tokens - self.tokens_per_minute
+            for timestamp, used in self._tokens:
+                excess -= used
+                if excess <= 0:
+                    waits.append(timestamp + self.period - now)
+                    break
+            else:
+                waits.append(self._tokens[-1][0] + self.period - now)
+        return max(waits, default=0.0)
+
+    async def acquire(self, tokens: int = 0, requests: int = 1) -> None:
+        """`requests` istek ve tahmini token sayısı için bütçe ayır
+
+        Birden fazla model çağrısı yapacak işler (ör. epoch x aday döngüsü)
+        çağrı sayısını `requests` ile bildirir.
+        """
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._prune(now)
+                wait = self._wait_time(tokens, requests, now)
+                if wait <= 0:
+                    self._requests.extend([now] * requests)
+                    self._record(now, tokens)
+                    return
+                await asyncio.sleep(wait)
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Tahmini token sayısını gerçekleşen kullanıma göre düzelt"""
+        self._record(time.monotonic(), actual_tokens - estimated_tokens)
+
+    def _record(self, now: float, tokens: int) -> None:
+        if tokens:
+            self._tokens.append((now, tokens))
+            self._used_tokens += tokens
@@ -0,0 +1,55 @@
+from typing import List
+import hashlib
+import numpy as np
+
+from .text_processing import preprocess_text, tokenize_text
+
+# 2^61 - 1 Mersenne asalı
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+
+def shingles(text: str) -> set:
+    """calculate_similarity ile aynı token kümesi (küçük harf, noktalama yok)"""
+    return set(tokenize_text(preprocess_text(text)))
+
+class MinHashLSH:
+    """Token kümeleri için MinHash imzası ve LSH bant anahtarları
+
+    İki metnin aynı bant anahtarını paylaşma olasılığı, token kümelerinin
+    Jaccard benzerliği arttıkça hızla artar. Bant anahtarları prompt
+    belgesinde çok anahtarlı indeksle saklandığından aday arama koleksiyon
+    boyutundan bağımsız tek bir indeks sorgusudur.
+    """
+
+    def __init__(self, num_bands: int = 16, band_size: int = 4, seed: int = 1):
+        self.num_bands = num_bands
+        self.band_size = band_size
+        self.num_perm = num_bands * band_size
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 32, self.num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, self.num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """Metnin MinHash imzası (boş metinde boş dizi)"""
+        tokens = shingles(text)
+        if not tokens:
+            return np.empty(0, dtype=np.uint64)
+        hashes = np.array([
+            int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest(), "little")
+            for token in tokens
+        ], dtype=np.uint64)
+        # (a * x + b) mod p; her permütasyon için en küçük değer
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return permuted.min(axis=0)
+
+    def band_keys(self, text: str) -> List[str]:
+        """İmzanın her bandı için indekslenecek anahtarlar"""
+        signature = self.signature(text)
+        if signature.size == 0:
+            return []
+        return [
+            f"{band}:" + hashlib.blake2b(
+                signature[band * self.band_size:(band + 1) * self.band_size].tobytes(),
+                digest_size=8
+            ).hexdigest()
+            for band in range(self.num_bands)
+        ]
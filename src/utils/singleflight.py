@@ -0,0 +1,126 @@
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional
+import asyncio
+
+from .logger import logger
+
+# İş sırasında yayımlanan olayları (ör. aşama adı) alan geri çağrı
+EventCallback = Callable[[Any], Awaitable[None]]
+
+class SingleFlight:
+    """Aynı anahtarla eşzamanlı gelen çağrıları tek bir çalıştırmada birleştirir
+
+    İlk çağrı (lider) işi bir görev olarak başlatır; aynı anahtarla gelen
+    diğer çağrılar (takipçiler) yeni iş başlatmak yerine bu görevi bekler.
+    Sonuç ya da hata tüm bekleyenlere iletilir. Bir bekleyenin iptal edilmesi
+    işi durdurmaz; yalnızca son bekleyen de iptal edilirse iş iptal edilir.
+    Paylaşılan sonuç nesnesi tüm çağıranlara aynen döner.
+
+    İş `publish` ile ara olaylar yayımlayabilir; olaylar `on_event` veren
+    tüm bekleyenlere iletilir, sonradan katılanlara önceki olaylar sırayla
+    yeniden gönderilir.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, "_Call"] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Anahtar için devam eden bir iş var mı"""
+        return key in self._calls
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[Any]],
+        on_event: Optional[EventCallback] = None
+    ) -> Any:
+        """Anahtar için işi çalıştır veya devam eden işin sonucunu bekle"""
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call()
+            self._calls[key] = call
+            call.task = asyncio.ensure_future(fn())
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+
+        call.waiters += 1
+        try:
+            if on_event is not None:
+                # Katılmadan önce yayımlanan olaylar sırayla yeniden gönderilir;
+                # tekrar sırasında yayımlananlar da yakalanana kadar devam edilir
+                replayed = 0
+                while replayed < len(call.events):
+                    await _notify(on_event, call.events[replayed])
+                    replayed += 1
+                call.listeners.append(on_event)
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if not call.task.done() and call.waiters == 1:
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+            if on_event is not None and on_event in call.listeners:
+                call.listeners.remove(on_event)
+
+    async def publish(self, key: Hashable, event: Any) -> None:
+        """Devam eden işin olayını kaydet ve dinleyenlere ilet"""
+        call = self._calls.get(key)
+        if call is None:
+            return
+        call.events.append(event)
+        for listener in list(call.listeners):
+            await _notify(listener, event)
+
+    async def stream(self, key: Hashable, fn: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        """Aynı anahtarlı eşzamanlı akışları tek üreticide birleştir
+
+        Lider `fn()` akışını tüketip her öğeyi yayımlar; tüm aboneler (sonradan
+        katılanlar baştan itibaren) aynı öğeleri sırayla alır. Üreticinin
+        hatası tüm abonelere iletilir.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def produce() -> None:
+            async for item in fn():
+                await self.publish(key, item)
+
+        async def forward(item: Any) -> None:
+            queue.put_nowait(item)
+
+        waiter = asyncio.ensure_future(self.do(key, produce, on_event=forward))
+        try:
+            while True:
+                getter = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait({getter, waiter}, return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    yield getter.result()
+                    continue
+                getter.cancel()
+                while not queue.empty():
+                    yield queue.get_nowait()
+                # Üreticinin hatası varsa burada yükselir
+                waiter.result()
+                return
+        finally:
+            if not waiter.done():
+                waiter.cancel()
+                await asyncio.gather(waiter, return_exceptions=True)
+
+    def _forget(self, key: Hashable, call: "_Call") -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+async def _notify(listener: EventCallback, event: Any) -> None:
+    """Dinleyici hatası ortak işi durdurmaz"""
+    try:
+        await listener(event)
+    except Exception as e:
+        logger.warning(f"Olay dinleyicisi başarısız: {str(e)}")
+
+class _Call:
+    """Devam eden tek bir iş, bekleyen sayısı ve yayımlanan olaylar"""
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+        self.events: List[Any] = []
+        self.listeners: List[EventCallback] = []
@@ -1,23 +1,73 @@
 from typing import List
+from collections import Counter
+from functools import lru_cache
 import re
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-
-# NLTK gerekli dosyaları indir
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+
+from ..config.settings import get_settings
+
+# word_tokenize eski NLTK sürümlerinde punkt, yenilerinde punkt_tab kullanır
+NLTK_RESOURCES = ("punkt", "punkt_tab", "stopwords")
+
+_nltk_ready = False
+
+def ensure_nltk_data() -> None:
+    """NLTK'yi ilk kullanımda yükle ve verilerini ayarlardaki dizinden bul
+
+    Ağdan indirme yalnızca NLTK_AUTO_DOWNLOAD açıksa yapılır; aksi halde
+    eksik veri için `python -m src.utils.nltk_setup` önerilir.
+    """
+    global _nltk_ready
+    if _nltk_ready:
+        return
+        
+    import nltk
+    settings = get_settings()
+    if settings.NLTK_DATA_DIR not in nltk.data.path:
+        nltk.data.path.insert(0, settings.NLTK_DATA_DIR)
+        
+    try:
+        _check_nltk_data()
+    except LookupError:
+        if not settings.NLTK_AUTO_DOWNLOAD:
+            raise LookupError(
+                f"NLTK verileri {settings.NLTK_DATA_DIR} dizininde bulunamadı; "
+                "`python -m src.utils.nltk_setup` ile kurun"
+            )
+        for resource in NLTK_RESOURCES:
+            nltk.download(resource, download_dir=settings.NLTK_DATA_DIR, quiet=True)
+        _check_nltk_data()
+    _nltk_ready = True
+
+def _check_nltk_data() -> None:
+    """Tokenizer ve stop word verilerine erişilebildiğini doğrula"""
+    from nltk.tokenize import word_tokenize
+    from nltk.corpus import stopwords
+    word_tokenize("ok.")
+    stopwords.words("english")
+
+@lru_cache(maxsize=None)
+def _stopword_set(language: str) -> frozenset:
+    ensure_nltk_data()
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words(language))
 
 def tokenize_text(text: str) -> List[str]:
     """Metni tokenlara ayır"""
+    ensure_nltk_data()
+    from nltk.tokenize import word_tokenize
     return word_tokenize(text)
 
+def split_sentences(text: str) -> List[str]:
+    """Metni cümlelere ayır"""
+    ensure_nltk_data()
+    from nltk.tokenize import sent_tokenize
+    return sent_tokenize(text)
+
+def detokenize(tokens: List[str]) -> str:
+    """Tokenları metne geri birleştir"""
+    from nltk.tokenize.treebank import TreebankWordDetokenizer
+    return TreebankWordDetokenizer().detokenize(tokens)
+
 def preprocess_text(text: str) -> str:
     """Metni ön işlemden geçir"""
     # Küçük harfe çevir
@@ -33,7 +83,7 @@ def preprocess_text(text: str) -> str:
 
 def remove_stopwords(tokens: List[str], language: str = 'english') -> List[str]:
     """Stop word'leri kaldır"""
-    stop_words = set(stopwords.words(language))
+    stop_words = _stopword_set(language)
     return [token for token in tokens if token.lower() not in stop_words]
 
 def calculate_similarity(text1: str, text2: str) -> float:
@@ -55,8 +105,7 @@ def extract_key_phrases(text: str, top_n: int = 5) -> List[str]:
     tokens = remove_stopwords(tokens)
     
     # Basit frekans bazlı anahtar kelime çıkarımı
-    freq_dist = nltk.FreqDist(tokens)
-    return [word for word, _ in freq_dist.most_common(top_n)]
+    return [word for word, _ in Counter(tokens).most_common(top_n)]
 
 def analyze_prompt_structure(prompt: str) -> dict:
     """Prompt yapısını analiz et"""
@@ -69,7 +118,7 @@ def analyze_prompt_structure(prompt: str) -> dict:
         "avg_word_length": sum(len(word) for word in words) / len(words) if words else 0,
         "key_phrases": extract_key_phrases(prompt),
         "has_question_mark": "?" in prompt,
-        "sentence_count": len(nltk.sent_tokenize(prompt))
+        "sentence_count": len(split_sentences(prompt))
     }
 
 def highlight_differences(original: str, optimized: str) -> dict:
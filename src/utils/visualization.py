@@ -0,0 +1,121 @@
+from typing import Callable, Dict, List
+
+# plotly.js "RdYlBu" isimli renk skalasını tanımadığından açık liste kullanılır
+RDYLBU_COLORSCALE = [
+    [0.0, "rgb(165,0,38)"],
+    [0.1, "rgb(215,48,39)"],
+    [0.2, "rgb(244,109,67)"],
+    [0.3, "rgb(253,174,97)"],
+    [0.4, "rgb(254,224,144)"],
+    [0.5, "rgb(255,255,191)"],
+    [0.6, "rgb(224,243,248)"],
+    [0.7, "rgb(171,217,233)"],
+    [0.8, "rgb(116,173,209)"],
+    [0.9, "rgb(69,117,180)"],
+    [1.0, "rgb(49,54,149)"]
+]
+
+def token_heatmap(analysis: Dict) -> Dict:
+    """Token önem skorları ısı haritası"""
+    token_importance = analysis.get("token_importance", {})
+    return {
+        "data": [{
+            "type": "heatmap",
+            "z": [list(token_importance.values())],
+            "x": list(token_importance.keys()),
+            "colorscale": RDYLBU_COLORSCALE,
+            "showscale": True
+        }],
+        "layout": {
+            "title": {"text": "Token Önem Skorları Isı Haritası"},
+            "xaxis": {"title": {"text": "Tokenlar"}},
+            "yaxis": {"title": {"text": "Önem Skoru"}},
+            "height": 200
+        }
+    }
+
+def changes_sankey(analysis: Dict) -> Dict:
+    """Değişiklikler için Sankey diyagramı"""
+    labels: List[str] = []
+    indexes: Dict[str, int] = {}
+
+    def node(label: str) -> int:
+        if label not in indexes:
+            indexes[label] = len(labels)
+            labels.append(label)
+        return indexes[label]
+
+    source, target, value = [], [], []
+    for change in analysis.get("changes", []):
+        source.append(node(str(change["original"])))
+        target.append(node(str(change["optimized"])))
+        value.append(1)
+
+    return {
+        "data": [{
+            "type": "sankey",
+            "node": {
+                "pad": 15,
+                "thickness": 20,
+                "line": {"color": "black", "width": 0.5},
+                "label": labels
+            },
+            "link": {"source": source, "target": target, "value": value}
+        }],
+        "layout": {
+            "title": {"text": "Token Değişiklikleri Akış Diyagramı"},
+            "height": 400
+        }
+    }
+
+def metrics_radar(analysis: Dict) -> Dict:
+    """Metrikler için radar grafik"""
+    metrics = analysis.get("metrics", {})
+    return {
+        "data": [{
+            "type": "scatterpolar",
+            "r": list(metrics.values()),
+            "theta": list(metrics.keys()),
+            "fill": "toself",
+            "name": "Optimizasyon Metrikleri"
+        }],
+        "layout": {
+            "polar": {"radialaxis": {"visible": True, "range": [0, 1]}},
+            "showlegend": True,
+            "title": {"text": "Optimizasyon Metrikleri Radar Grafiği"}
+        }
+    }
+
+def importance_distribution(analysis: Dict) -> Dict:
+    """Token önem dağılımı histogramı"""
+    return {
+        "data": [{
+            "type": "histogram",
+            "x": list(analysis.get("token_importance", {}).values()),
+            "nbinsx": 20,
+            "name": "Önem Skorları"
+        }],
+        "layout": {
+            "title": {"text": "Token Önem Skorları Dağılımı"},
+            "xaxis": {"title": {"text": "Önem Skoru"}},
+            "yaxis": {"title": {"text": "Token Sayısı"}},
+            "height": 300
+        }
+    }
+
+FIGURE_BUILDERS: Dict[str, Callable[[Dict], Dict]] = {
+    "token_heatmap": token_heatmap,
+    "changes_sankey": changes_sankey,
+    "metrics_radar": metrics_radar,
+    "importance_distribution": importance_distribution
+}
+
+def build_figure(kind: str, analysis: Dict) -> Dict:
+    """Sayısal LIME analizinden Plotly figür JSON'u oluştur"""
+    if kind not in FIGURE_BUILDERS:
+        raise ValueError(f"Bilinmeyen görselleştirme tipi: {kind}")
+    return FIGURE_BUILDERS[kind](analysis)
+
+def build_all_figures(analysis: Dict) -> Dict[str, Dict]:
+    """Tüm görselleştirmeleri oluştur"""
+    return {kind: builder(analysis) for kind, builder in FIGURE_BUILDERS.items()}